@@ -1,23 +1,505 @@
-"""Entry point for `python -m yad2_scraper`."""
+"""Entry point for `python -m yad2_scraper`.
+
+Only argparse and config are imported up front. Each mode imports
+the modules it runs (httpx, bs4, sqlite3, ...) when it starts, so --help,
+usage errors and replays don't pay for the ones they never use.
+"""
 
 from __future__ import annotations
 
 import argparse
 import logging
+import signal
 import sys
+import time
+from contextlib import AbstractContextManager, ExitStack, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, TypeGuard
+
+from yad2_scraper.config import (
+    CACHE_TTL,
+    CHECKPOINT_FILE,
+    DAEMON_SCHEDULE,
+    DEFAULT_SEARCH_PARAMS,
+    DETAIL_CACHE_FILE,
+    ENRICH_CONCURRENCY,
+    ENRICH_REQUESTS_PER_SECOND,
+    ENRICH_TIME_BUDGET,
+    FEED_AD_TYPES,
+    INCREMENTAL_STOP_AFTER,
+    MAX_REQUESTS_PER_SECOND,
+    NEWEST_FIRST_PARAMS,
+    OUTPUT_DIR,
+    OUTPUT_FORMATS,
+    PARTITION_MAX_RESULTS,
+    RATE_STATE_FILE,
+    REQUESTS_PER_SECOND,
+    SQLITE_FILE,
+    TOKEN_INDEX_FILE,
+)
 
-from yad2_scraper.exporter import export_csv
-from yad2_scraper.fetcher import BotDetectedError, Fetcher
-from yad2_scraper.models import CarListing
-from yad2_scraper.parser import parse_listings
+if TYPE_CHECKING:
+    from yad2_scraper.adaptive import AdaptiveRateLimiter
+    from yad2_scraper.batch import ProfileResult, SearchProfile
+    from yad2_scraper.cache import ResponseCache
+    from yad2_scraper.checkpoint import Checkpoint
+    from yad2_scraper.enrich import Enricher
+    from yad2_scraper.exporter import ListingWriter
+    from yad2_scraper.identities import IdentityPool
+    from yad2_scraper.incremental import EarlyStop
+    from yad2_scraper.parsepool import ParsePool
+    from yad2_scraper.pipeline import Pipeline
+    from yad2_scraper.ratelimit import RateLimiter
+    from yad2_scraper.store import SqliteStore
 
 log = logging.getLogger("yad2_scraper")
 
 
+def _open_writer(
+    parser: argparse.ArgumentParser, fmt: str, path: Path | None = None
+) -> ListingWriter:
+    from yad2_scraper.exporter import open_writer
+
+    try:
+        return open_writer(fmt, path)
+    except ImportError as e:
+        parser.error(str(e))
+
+
+def _is_store(writer: ListingWriter) -> TypeGuard[SqliteStore]:
+    """isinstance(writer, SqliteStore), without importing sqlite3 for other formats."""
+    store = sys.modules.get("yad2_scraper.store")
+    return store is not None and isinstance(writer, store.SqliteStore)
+
+
+def _load_checkpoint(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> tuple[ListingWriter, Checkpoint | None]:
+    """Open the output and checkpoint for this run, resuming if asked to.
+
+    Parquet output isn't checkpointed: its rows only reach the disk as
+    whole row groups, and a finished file can't be appended to. Nor are
+    --incremental runs: they page newest first, so their page numbers
+    don't match the default search a --resume would continue.
+    """
+    from yad2_scraper.checkpoint import Checkpoint
+    from yad2_scraper.exporter import default_output_path
+
+    if args.resume and args.format == "parquet":
+        parser.error("--resume is not supported with --format parquet")
+    if args.resume and args.output:
+        parser.error("--output cannot be combined with --resume (the checkpoint names it)")
+    if not args.resume:
+        writer = _open_writer(parser, args.format, args.output)
+        if args.format == "parquet" or args.incremental:
+            return writer, None
+        path = args.checkpoint or writer.path.parent / CHECKPOINT_FILE
+        checkpoint = Checkpoint(
+            path=path,
+            params=dict(DEFAULT_SEARCH_PARAMS),
+            output_path=str(writer.path),
+            output_format=args.format,
+        )
+        return writer, checkpoint
+
+    path = args.checkpoint or default_output_path().parent / CHECKPOINT_FILE
+    try:
+        checkpoint = Checkpoint.load(path)
+    except FileNotFoundError:
+        parser.error(f"no checkpoint to resume at {path}")
+    except ValueError as e:
+        parser.error(str(e))
+    if checkpoint.params != DEFAULT_SEARCH_PARAMS:
+        parser.error(f"checkpoint {path} was written for different search params")
+
+    log.info(
+        "Resuming from page %d (%d pages done, %d listings seen) into %s",
+        checkpoint.next_page,
+        len(checkpoint.completed_pages),
+        len(checkpoint.seen_tokens),
+        checkpoint.output_path,
+    )
+    writer = _open_writer(parser, checkpoint.output_format, Path(checkpoint.output_path))
+    return writer, checkpoint
+
+
+def _load_early_stop(parser: argparse.ArgumentParser, args: argparse.Namespace) -> EarlyStop | None:
+    if not args.incremental:
+        return None
+    if args.concurrency > 1:
+        parser.error("--incremental pages in order and can't be combined with --concurrency")
+    if args.resume:
+        parser.error("--incremental cannot be combined with --resume")
+    if args.stop_after < 1:
+        parser.error("--stop-after must be at least 1")
+    from yad2_scraper.exporter import default_output_path
+    from yad2_scraper.incremental import EarlyStop, TokenIndex
+
+    path = args.token_index or default_output_path().parent / TOKEN_INDEX_FILE
+    try:
+        index = TokenIndex.load(path)
+    except ValueError as e:
+        parser.error(str(e))
+    log.info("Incremental run: %d known listings in %s", len(index), path)
+    return EarlyStop(index, args.stop_after)
+
+
+def _response_cache(args: argparse.Namespace) -> ResponseCache | None:
+    if args.cache_dir is None:
+        return None
+    from yad2_scraper.cache import ResponseCache
+
+    return ResponseCache(args.cache_dir, args.cache_ttl)
+
+
+def _adaptive_limiter(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> AdaptiveRateLimiter | None:
+    """The --adaptive limiter, starting from the rate learned by earlier runs."""
+    if not args.adaptive:
+        return None
+    if args.replay is not None:
+        parser.error("--adaptive cannot be combined with --replay")
+    from yad2_scraper.adaptive import AdaptiveRateLimiter, RateState
+    from yad2_scraper.exporter import default_output_path
+
+    path = args.rate_state or default_output_path().parent / RATE_STATE_FILE
+    try:
+        state = RateState.load(path)
+    except ValueError as e:
+        parser.error(str(e))
+    log.info("Adaptive rate control: starting at %.3f req/s (state in %s)", state.rate, path)
+    return AdaptiveRateLimiter(state)
+
+
+def _identity_pool(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> IdentityPool | None:
+    if args.identities is None:
+        return None
+    if args.adaptive:
+        parser.error("--adaptive cannot be combined with --identities")
+    from yad2_scraper.identities import load_identities
+
+    try:
+        identities = load_identities(args.identities)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    log.info("Spreading requests over %d identities from %s", len(identities), args.identities)
+    return identities
+
+
+def _enricher(parser: argparse.ArgumentParser, args: argparse.Namespace) -> Enricher | None:
+    """The --enrich stage, with a fetcher and request budget of its own."""
+    if args.enrich is None:
+        return None
+    for flag, value in (
+        ("--replay", args.replay),
+        ("--batch", args.batch),
+        ("--partition", args.partition),
+        ("--daemon", args.daemon),
+    ):
+        if value:
+            parser.error(f"--enrich cannot be combined with {flag}")
+    ad_types = set(filter(None, args.enrich.split(",")))
+    if args.enrich != "all" and (not ad_types or ad_types - set(FEED_AD_TYPES)):
+        parser.error(f"--enrich takes 'all' or ad types from {', '.join(FEED_AD_TYPES)}")
+    if args.enrich_rps <= 0:
+        parser.error("--enrich-rps must be positive")
+    if args.enrich_concurrency < 1:
+        parser.error("--enrich-concurrency must be at least 1")
+    if args.enrich_time < 0:
+        parser.error("--enrich-time cannot be negative")
+    from yad2_scraper.enrich import DetailCache, Enricher
+    from yad2_scraper.exporter import default_output_path
+    from yad2_scraper.fetcher import Fetcher
+    from yad2_scraper.ratelimit import RateLimiter
+
+    path = args.detail_cache or default_output_path().parent / DETAIL_CACHE_FILE
+    try:
+        cache = DetailCache.load(path)
+    except ValueError as e:
+        parser.error(str(e))
+    rps = args.enrich_rps
+    if rps > MAX_REQUESTS_PER_SECOND:
+        log.warning(
+            "Clamping --enrich-rps %.2f/s to the %.2f/s politeness limit",
+            rps,
+            MAX_REQUESTS_PER_SECOND,
+        )
+        rps = MAX_REQUESTS_PER_SECOND
+    log.info(
+        "Enriching %s listings from detail pages at %.2f req/s (%d cached in %s)",
+        args.enrich,
+        rps,
+        len(cache),
+        path,
+    )
+    return Enricher(
+        Fetcher(limiter=RateLimiter(rps)),
+        cache,
+        select=None if args.enrich == "all" else lambda listing: listing.ad_type in ad_types,
+        concurrency=args.enrich_concurrency,
+        time_budget=args.enrich_time,
+    )
+
+
+def _parse_pool(args: argparse.Namespace) -> AbstractContextManager[ParsePool | None]:
+    if not args.parse_workers:
+        return nullcontext()
+    from yad2_scraper.parsepool import ParsePool
+
+    return ParsePool(args.parse_workers)
+
+
+async def _run_concurrent(
+    args: argparse.Namespace,
+    pipeline: Pipeline,
+    cache: ResponseCache | None,
+    limiter: RateLimiter | None,
+    identities: IdentityPool | None,
+) -> None:
+    from yad2_scraper.fetcher import AsyncFetcher
+    from yad2_scraper.pipeline import run_concurrent
+
+    async with AsyncFetcher(
+        args.concurrency, args.rps, limiter=limiter, cache=cache, identities=identities
+    ) as fetcher:
+        with _parse_pool(args) as parse_pool:
+            await run_concurrent(fetcher, pipeline, args.max_pages, parse_pool)
+
+
+def _run_batch(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    cache: ResponseCache | None,
+    limiter: RateLimiter | None,
+    identities: IdentityPool | None,
+) -> None:
+    """Scrape every profile in ``args.batch`` over one fetcher.
+
+    Exits 1 if a full batch wrote nothing; an interrupted one keeps what it wrote.
+    """
+    for flag, value in (
+        ("--resume", args.resume),
+        ("--incremental", args.incremental),
+        ("--replay", args.replay),
+    ):
+        if value:
+            parser.error(f"{flag} cannot be combined with --batch")
+    from yad2_scraper.batch import load_profiles, run_batch, run_batch_concurrent
+    from yad2_scraper.exporter import profile_output_path
+    from yad2_scraper.fetcher import AsyncFetcher, Fetcher
+
+    try:
+        profiles = load_profiles(args.batch)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    log.info("Batch of %d profiles from %s", len(profiles), args.batch)
+
+    def open_profile_writer(profile: SearchProfile) -> ListingWriter:
+        return _open_writer(
+            parser, args.format, profile_output_path(profile.name, args.format, args.output)
+        )
+
+    # Filled in as each profile finishes, so an interrupt keeps what was written
+    results: list[ProfileResult] = []
+    interrupted = False
+    try:
+        if args.concurrency > 1:
+            import asyncio
+
+            async def run() -> None:
+                async with AsyncFetcher(
+                    args.concurrency, args.rps, limiter=limiter, cache=cache, identities=identities
+                ) as fetcher:
+                    with _parse_pool(args) as parse_pool:
+                        await run_batch_concurrent(
+                            fetcher,
+                            profiles,
+                            open_profile_writer,
+                            args.max_pages,
+                            args.record,
+                            parse_pool,
+                            results,
+                        )
+
+            asyncio.run(run())
+        else:
+            with Fetcher(limiter=limiter, cache=cache, identities=identities) as fetcher:
+                run_batch(
+                    fetcher, profiles, open_profile_writer, args.max_pages, args.record, results
+                )
+    except KeyboardInterrupt:
+        interrupted = True
+
+    written = sum(result.written for result in results)
+    if interrupted:
+        log.info(
+            "Interrupted — keeping %d listings written across %d profiles", written, len(results)
+        )
+        return
+    if not written:
+        log.warning("No listings scraped — nothing to export")
+        sys.exit(1)
+    log.info("Done — wrote %d listings across %d profiles", written, len(results))
+
+
+def _run_partitioned(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    cache: ResponseCache | None,
+    limiter: RateLimiter | None,
+    identities: IdentityPool | None,
+) -> None:
+    """Split the search into small sub-queries and scrape them all into one output."""
+    for flag, value in (
+        ("--resume", args.resume),
+        ("--incremental", args.incremental),
+        ("--replay", args.replay),
+        ("--record", args.record),
+        ("--max-pages", args.max_pages is not None),
+    ):
+        if value:
+            parser.error(f"{flag} cannot be combined with --partition")
+    if args.partition_size < 1:
+        parser.error("--partition-size must be at least 1")
+    from yad2_scraper.fetcher import AsyncFetcher, BotDetectedError, Fetcher
+    from yad2_scraper.partition import (
+        plan_partitions,
+        plan_partitions_async,
+        run_partitions,
+        run_partitions_concurrent,
+    )
+
+    writer = _open_writer(parser, args.format, args.output)
+    pipelines: list[Pipeline] = []
+    params = dict(DEFAULT_SEARCH_PARAMS)
+    try:
+        if args.concurrency > 1:
+            import asyncio
+
+            async def run() -> list[Pipeline]:
+                async with AsyncFetcher(
+                    args.concurrency, args.rps, limiter=limiter, cache=cache, identities=identities
+                ) as fetcher:
+                    partitions = await plan_partitions_async(fetcher, params, args.partition_size)
+                    log.info("Planned %d sub-queries", len(partitions))
+                    with _parse_pool(args) as parse_pool:
+                        return await run_partitions_concurrent(
+                            fetcher, partitions, writer, parse_pool
+                        )
+
+            pipelines = asyncio.run(run())
+        else:
+            with Fetcher(limiter=limiter, cache=cache, identities=identities) as fetcher:
+                partitions = plan_partitions(fetcher, params, args.partition_size)
+                log.info("Planned %d sub-queries", len(partitions))
+                pipelines = run_partitions(fetcher, partitions, writer)
+    except (BotDetectedError, ValueError) as e:
+        log.error("Stopping while planning partitions: %s", e)
+    except KeyboardInterrupt:
+        log.info("Interrupted — keeping %d listings written so far", writer.written)
+    finally:
+        if _is_store(writer):
+            # Together the sub-queries cover the whole search
+            writer.complete = bool(pipelines) and all(p.complete for p in pipelines)
+        writer.close()
+
+    duplicates = sum(pipeline.stats.duplicates for pipeline in pipelines)
+    if duplicates:
+        log.info("Removed %d duplicate listings (by token)", duplicates)
+    if not writer.written:
+        log.warning("No listings scraped — nothing to export")
+        sys.exit(1)
+    log.info("Done — wrote %d listings to %s", writer.written, writer.path)
+
+
+def _stop_on_sigterm(signum: int, frame: object) -> None:
+    raise KeyboardInterrupt
+
+
+def _run_daemon(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    cache: ResponseCache | None,
+    limiter: RateLimiter | None,
+    identities: IdentityPool | None,
+) -> None:
+    """Scrape the --batch profiles (or the default search) on their schedules until stopped."""
+    for flag, value in (
+        ("--resume", args.resume),
+        ("--replay", args.replay),
+        ("--record", args.record),
+        ("--partition", args.partition),
+        ("--token-index", args.token_index),
+        ("--concurrency", args.concurrency > 1),
+    ):
+        if value:
+            parser.error(f"{flag} cannot be combined with --daemon")
+    if args.stop_after < 1:
+        parser.error("--stop-after must be at least 1")
+    if args.max_runs is not None and args.max_runs < 1:
+        parser.error("--max-runs must be at least 1")
+    from yad2_scraper.batch import SearchProfile, load_profiles
+    from yad2_scraper.daemon import Job, run_daemon
+    from yad2_scraper.exporter import default_output_path, profile_output_path
+    from yad2_scraper.fetcher import Fetcher
+    from yad2_scraper.incremental import TokenIndex
+    from yad2_scraper.schedule import CronSchedule
+
+    try:
+        profiles = (
+            load_profiles(args.batch)
+            if args.batch is not None
+            else [SearchProfile("cars", dict(DEFAULT_SEARCH_PARAMS))]
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    directory = args.output or default_output_path().parent
+    jobs = []
+    for profile in profiles:
+        try:
+            schedule = CronSchedule.parse(profile.schedule or args.schedule)
+            index = TokenIndex.load(directory / f"yad2_{profile.name}_{TOKEN_INDEX_FILE}")
+        except ValueError as e:
+            parser.error(f"profile {profile.name}: {e}")
+        jobs.append(Job(profile, schedule, index))
+
+    def open_profile_writer(profile: SearchProfile) -> ListingWriter:
+        return _open_writer(
+            parser, args.format, profile_output_path(profile.name, args.format, directory)
+        )
+
+    log.info("Daemon started with %d profiles, writing to %s", len(jobs), directory)
+    # docker stop and systemd send SIGTERM: finish like Ctrl-C, with outputs closed
+    previous = signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    try:
+        with Fetcher(limiter=limiter, cache=cache, identities=identities) as fetcher:
+            run_daemon(
+                fetcher,
+                jobs,
+                open_profile_writer,
+                args.max_pages,
+                args.stop_after,
+                max_runs=args.max_runs,
+            )
+    except KeyboardInterrupt:
+        log.info("Daemon stopped")
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+    for job in jobs:
+        log.info(
+            "Profile %s: %d runs, %d listings written", job.profile.name, job.runs, job.written
+        )
+
+
 def main(argv: list[str] | None = None) -> None:
     parser = argparse.ArgumentParser(
         prog="yad2-scraper",
-        description="Scrape used car listings from yad2.co.il and export to CSV.",
+        description="Scrape used car listings from yad2.co.il into CSV, Parquet or SQLite.",
     )
     parser.add_argument(
         "--max-pages",
@@ -25,6 +507,257 @@ def main(argv: list[str] | None = None) -> None:
         default=None,
         help="Maximum number of pages to scrape (default: all)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Pages to fetch in parallel after page 1 (default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=REQUESTS_PER_SECOND,
+        help=(
+            f"Global request budget per second when --concurrency > 1 "
+            f"(default: {REQUESTS_PER_SECOND})"
+        ),
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help=(
+            "Output format (default: csv). parquet needs pyarrow; sqlite upserts "
+            "into one database that repeat runs update in place"
+        ),
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help=f"Output file (default: timestamped file, or {SQLITE_FILE}, in {OUTPUT_DIR}/)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the run recorded in the checkpoint file",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help=f"Checkpoint file (default: {CHECKPOINT_FILE} in the output directory)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Cache fetched pages (gzip) in this directory and reuse them across runs",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=CACHE_TTL,
+        help=f"Seconds before a cached page is revalidated (default: {CACHE_TTL:.0f})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Sort newest first and stop once pages only repeat known, unchanged listings",
+    )
+    parser.add_argument(
+        "--stop-after",
+        type=int,
+        default=INCREMENTAL_STOP_AFTER,
+        metavar="N",
+        help=(
+            "With --incremental, stop after N pages in a row with nothing new or changed "
+            f"(default: {INCREMENTAL_STOP_AFTER})"
+        ),
+    )
+    parser.add_argument(
+        "--token-index",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help=f"Known-listing index for --incremental (default: {OUTPUT_DIR}/{TOKEN_INDEX_FILE})",
+    )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help=(
+            "Run every search profile in a TOML (or YAML) file over one connection, "
+            "one file per profile; --output then names the output directory"
+        ),
+    )
+    parser.add_argument(
+        "--partition",
+        action="store_true",
+        help=(
+            "Split the search into year/price sub-queries of at most --partition-size "
+            "results and scrape them all (in parallel with --concurrency)"
+        ),
+    )
+    parser.add_argument(
+        "--partition-size",
+        type=int,
+        default=PARTITION_MAX_RESULTS,
+        metavar="N",
+        help=f"Target results per sub-query for --partition (default: {PARTITION_MAX_RESULTS})",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help=(
+            "Stay running and scrape the --batch profiles (or the default search) "
+            "incrementally on their cron schedules over one warm connection"
+        ),
+    )
+    parser.add_argument(
+        "--schedule",
+        default=DAEMON_SCHEDULE,
+        metavar="CRON",
+        help=(
+            "Cron expression for --daemon profiles without a schedule of their own "
+            f"(default: {DAEMON_SCHEDULE!r}, hourly)"
+        ),
+    )
+    parser.add_argument(
+        "--max-runs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Stop --daemon after N scheduled runs (default: run until stopped)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help=(
+            "Adjust the request rate to the site's responses: speed up while pages come "
+            "back quickly, slow down sharply on a bot redirect or latency spike "
+            "(replaces --rps and the default delays)"
+        ),
+    )
+    parser.add_argument(
+        "--rate-state",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Where --adaptive keeps the learned rate between runs "
+            f"(default: {RATE_STATE_FILE} in the output directory)"
+        ),
+    )
+    parser.add_argument(
+        "--identities",
+        type=Path,
+        default=None,
+        metavar="FILE",
+        help=(
+            "Spread requests over the client identities (proxy, headers, cookies, rate) "
+            "in a TOML file, quarantining any that gets a bot redirect"
+        ),
+    )
+    parser.add_argument(
+        "--enrich",
+        nargs="?",
+        const="all",
+        default=None,
+        metavar="AD_TYPES",
+        help=(
+            "Fetch each listing's detail page for the fields the search results leave "
+            "empty (financing, commitments, listing source); optionally only for "
+            f"comma-separated ad types ({', '.join(FEED_AD_TYPES)})"
+        ),
+    )
+    parser.add_argument(
+        "--enrich-rps",
+        type=float,
+        default=ENRICH_REQUESTS_PER_SECOND,
+        metavar="RATE",
+        help=(
+            "Detail-page requests per second, on top of the search pages "
+            f"(default: {ENRICH_REQUESTS_PER_SECOND})"
+        ),
+    )
+    parser.add_argument(
+        "--enrich-concurrency",
+        type=int,
+        default=ENRICH_CONCURRENCY,
+        metavar="N",
+        help=f"Detail pages to fetch in parallel (default: {ENRICH_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--enrich-time",
+        type=float,
+        default=ENRICH_TIME_BUDGET,
+        metavar="SECONDS",
+        help=(
+            "Stop fetching detail pages after this long and write the remaining "
+            f"listings without them (default: {ENRICH_TIME_BUDGET:.0f})"
+        ),
+    )
+    parser.add_argument(
+        "--detail-cache",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Detail fields kept between runs, refetched only when a listing changes "
+            f"(default: {DETAIL_CACHE_FILE} in the output directory)"
+        ),
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "With --concurrency > 1, parse pages in N worker processes so parsing "
+            "doesn't hold up fetching (default: 0, parse in the main process)"
+        ),
+    )
+    archive_group = parser.add_mutually_exclusive_group()
+    archive_group.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Save every fetched page body (gzip) to DIR",
+    )
+    archive_group.add_argument(
+        "--replay",
+        type=Path,
+        default=None,
+        metavar="DIR",
+        help="Parse and export pages recorded with --record instead of fetching",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help="Also write the run's stage timings and counters to PATH as JSON",
+    )
+    parser.add_argument(
+        "--metrics-listen",
+        default=None,
+        metavar="[HOST:]PORT",
+        help="Serve Prometheus metrics at /metrics while the scrape runs (host default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Keep Prometheus metrics in PATH (e.g. yad2.prom) for node_exporter's "
+            "textfile collector, rewritten every few seconds"
+        ),
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -44,70 +777,154 @@ def main(argv: list[str] | None = None) -> None:
     # Explicitly set our logger level (basicConfig may be a no-op if handlers exist)
     log.setLevel(level)
 
-    all_listings: list[CarListing] = []
-    total_pages: int | None = None
+    from yad2_scraper.metrics import METRICS
+
+    METRICS.reset()
+    started = time.perf_counter()
+    with _metrics_exporters(parser, args):
+        try:
+            _run(parser, args)
+        finally:
+            _report_metrics(args, time.perf_counter() - started)
+
+
+def _metrics_exporters(parser: argparse.ArgumentParser, args: argparse.Namespace) -> ExitStack:
+    """Start the Prometheus endpoint and/or textfile writer asked for on the command line."""
+    exporters = ExitStack()
+    if args.metrics_listen is None and args.metrics_textfile is None:
+        return exporters
+    from yad2_scraper.prometheus import MetricsServer, TextfileExporter, parse_listen
+
+    if args.metrics_listen is not None:
+        try:
+            host, port = parse_listen(args.metrics_listen)
+            exporters.enter_context(MetricsServer(host, port))
+        except (ValueError, OSError) as e:
+            parser.error(f"--metrics-listen: {e}")
+    if args.metrics_textfile is not None:
+        exporters.enter_context(TextfileExporter(args.metrics_textfile))
+    return exporters
+
 
+def _report_metrics(args: argparse.Namespace, wall: float) -> None:
+    """Log the stage timing table and write --metrics-file, if anything was measured."""
+    from yad2_scraper.metrics import METRICS
+
+    if not METRICS:
+        return
+    log.info("Stage timings (%.2fs wall):\n%s", wall, METRICS.summary(wall))
+    if args.metrics_file is not None:
+        METRICS.write_json(
+            args.metrics_file,
+            wall,
+            finished_at=datetime.now().isoformat(timespec="seconds"),
+            options={key: value for key, value in vars(args).items() if value is not None},
+        )
+        log.info("Wrote metrics to %s", args.metrics_file)
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Everything after option parsing; exits via parser.error or sys.exit(1) on failure."""
+    if args.parse_workers < 0:
+        parser.error("--parse-workers cannot be negative")
+    if args.parse_workers and args.concurrency < 2:
+        parser.error("--parse-workers needs --concurrency > 1")
+
+    if args.batch is not None and args.partition:
+        parser.error("--partition cannot be combined with --batch")
+
+    identities = _identity_pool(parser, args)
+    limiter = _adaptive_limiter(parser, args)
+    # Built before the search fetcher, whose rate limiter gauges should win
+    enricher = _enricher(parser, args)
     try:
-        with Fetcher() as fetcher:
-            page = 1
-            while True:
-                # Stop if we've hit the user-specified page limit
-                if args.max_pages is not None and page > args.max_pages:
-                    log.info("Reached --max-pages limit (%d)", args.max_pages)
-                    break
-
-                # Stop if we've gone past the last page (known after first fetch)
-                if total_pages is not None and page > total_pages:
-                    log.info("Reached last page (%d)", total_pages)
-                    break
-
-                log.info("Fetching page %d ...", page)
-
-                try:
-                    html = fetcher.fetch_page(page)
-                except BotDetectedError as e:
-                    log.error("Stopping: %s", e)
-                    break
-
-                try:
-                    result = parse_listings(html)
-                except ValueError as e:
-                    log.error("Parse error on page %d: %s", page, e)
-                    break
-
-                all_listings.extend(result.listings)
-                log.info(
-                    "Page %d: %d listings (running total: %d)",
-                    page,
-                    len(result.listings),
-                    len(all_listings),
-                )
+        if args.daemon:
+            _run_daemon(parser, args, _response_cache(args), limiter, identities)
+        elif args.partition:
+            _run_partitioned(parser, args, _response_cache(args), limiter, identities)
+        elif args.batch is not None:
+            _run_batch(parser, args, _response_cache(args), limiter, identities)
+        else:
+            _run_single(parser, args, limiter, identities, enricher)
+    finally:
+        if enricher is not None:
+            enricher.close()  # waits for running detail fetches
+            enricher.fetcher.close()
+        if limiter is not None:
+            limiter.save()
+            log.info(
+                "Adaptive rate control: saved %.3f req/s to %s", limiter.rate, limiter.state.path
+            )
 
-                # Learn total pages from the first successful parse
-                if total_pages is None and result.total_pages > 0:
-                    total_pages = result.total_pages
-                    log.info(
-                        "Pagination: %d pages, %d total results",
-                        result.total_pages,
-                        result.total_results,
-                    )
 
-                # If a page returned zero listings, we've likely passed the end
-                if not result.listings:
-                    log.info("Empty page %d — stopping", page)
-                    break
+def _run_single(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    limiter: RateLimiter | None,
+    identities: IdentityPool | None,
+    enricher: Enricher | None = None,
+) -> None:
+    """One scrape (or replay) of the default search into one output."""
+    from yad2_scraper.archive import PageArchive
+    from yad2_scraper.fetcher import Fetcher
+    from yad2_scraper.pipeline import Pipeline, run_replay, run_sequential
 
-                page += 1
+    early_stop = _load_early_stop(parser, args)
+    if args.replay is not None:
+        if args.resume:
+            parser.error("--resume cannot be combined with --replay")
+        writer, checkpoint = _open_writer(parser, args.format, args.output), None
+    else:
+        writer, checkpoint = _load_checkpoint(parser, args)
+    recorder = PageArchive(args.record) if args.record else None
+    pipeline = Pipeline(
+        writer,
+        checkpoint=checkpoint,
+        recorder=recorder,
+        early_stop=early_stop,
+        enricher=enricher,
+    )
+    cache = _response_cache(args)
+
+    try:
+        if args.replay is not None:
+            run_replay(PageArchive(args.replay), pipeline, args.max_pages)
+        elif args.concurrency > 1:
+            import asyncio
 
+            asyncio.run(_run_concurrent(args, pipeline, cache, limiter, identities))
+        else:
+            params = {**DEFAULT_SEARCH_PARAMS, **NEWEST_FIRST_PARAMS} if early_stop else None
+            with Fetcher(
+                limiter=limiter, cache=cache, params=params, identities=identities
+            ) as fetcher:
+                run_sequential(fetcher, pipeline, args.max_pages)
     except KeyboardInterrupt:
-        log.info("Interrupted — exporting %d listings collected so far", len(all_listings))
+        log.info("Interrupted — keeping %d listings written so far", writer.written)
+    finally:
+        if _is_store(writer):
+            # Only a run that saw every page can tell which listings are gone
+            writer.complete = pipeline.complete
+        writer.close()
+        if early_stop is not None:
+            early_stop.index.save()
+
+    if pipeline.stats.duplicates:
+        log.info("Removed %d duplicate listings (by token)", pipeline.stats.duplicates)
+
+    if cache is not None:
+        log.info(
+            "Response cache: %d hits, %d revalidated, %d misses",
+            cache.hits,
+            cache.revalidated,
+            cache.misses,
+        )
 
-    if not all_listings:
+    if not writer.written:
         log.warning("No listings scraped — nothing to export")
         sys.exit(1)
 
-    output_path = export_csv(all_listings)
-    log.info("Done — %s", output_path)
+    log.info("Done — wrote %d listings to %s", writer.written, writer.path)
 
 
 if __name__ == "__main__":
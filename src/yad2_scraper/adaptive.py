@@ -0,0 +1,169 @@
+"""AIMD rate control for --adaptive: speed up while pages come back fast, back off hard when not.
+
+The fixed DELAY_MIN..DELAY_MAX pace is a guess. AdaptiveRateLimiter
+starts from the rate learned by earlier runs and adjusts it after every
+response. Each fast 200 (or 304) adds ADAPTIVE_INCREASE req/s. A bot
+redirect or a latency spike multiplies the rate by ADAPTIVE_DECREASE. The
+rate at the last redirect is kept as a ceiling that is only probed slowly
+afterwards, and MAX_REQUESTS_PER_SECOND caps everything.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from yad2_scraper.config import (
+    ADAPTIVE_DECREASE,
+    ADAPTIVE_INCREASE,
+    ADAPTIVE_JITTER,
+    ADAPTIVE_LATENCY_SPIKE,
+    ADAPTIVE_MIN_RATE,
+    ADAPTIVE_PROBE_SLOWDOWN,
+    ADAPTIVE_START_RATE,
+    MAX_REQUESTS_PER_SECOND,
+)
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.ratelimit import FakeClock, RateLimiter
+
+log = logging.getLogger(__name__)
+
+# Mean latency is an exponentially weighted average; spikes are only judged
+# once it has seen enough responses to mean something
+_LATENCY_WEIGHT = 0.2
+_LATENCY_WARMUP = 5
+
+
+@dataclass
+class RateState:
+    """The learned request rate, persisted between runs."""
+
+    path: Path
+    rate: float = ADAPTIVE_START_RATE
+    ceiling: float | None = None  # rate when the last bot redirect arrived
+    updated_at: str | None = None
+
+    @classmethod
+    def load(cls, path: Path) -> RateState:
+        """Read the state, or start from ADAPTIVE_START_RATE if there is none yet.
+
+        Raises ValueError if the file exists but can't be used.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                payload = json.load(f)
+            ceiling = payload.get("ceiling")
+            state = cls(
+                path=path,
+                rate=float(payload["rate"]),
+                ceiling=None if ceiling is None else float(ceiling),
+                updated_at=payload.get("updated_at"),
+            )
+        except FileNotFoundError:
+            return cls(path)
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError) as e:
+            raise ValueError(f"Corrupt rate state {path}: {e}") from e
+        if state.rate <= 0:
+            raise ValueError(f"Corrupt rate state {path}: rate must be positive")
+        return state
+
+    def save(self) -> None:
+        """Write to a temp file in the same directory, then rename over the old one."""
+        self.updated_at = datetime.now().isoformat(timespec="seconds")
+        payload = {"rate": self.rate, "ceiling": self.ceiling, "updated_at": self.updated_at}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """RateLimiter whose rate follows response feedback (AIMD), starting from ``state``.
+
+    Jitter is a fixed fraction of the current interval rather than a fixed
+    number of seconds. After a cut, further spikes and redirects are ignored
+    for one interval at the new rate, because those requests were sent at
+    the old one. Call save() to persist the learned rate.
+    """
+
+    def __init__(
+        self,
+        state: RateState,
+        min_rate: float = ADAPTIVE_MIN_RATE,
+        max_rate: float = MAX_REQUESTS_PER_SECOND,
+        *,
+        clock: FakeClock | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        if not 0 < min_rate <= max_rate:
+            raise ValueError("need 0 < min_rate <= max_rate")
+        self.state = state
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        super().__init__(self._clamp(state.rate), clock=clock, rng=rng)
+        self.jitter = ADAPTIVE_JITTER / self.rate
+        self.mean_latency: float | None = None
+        self._responses = 0
+        self._hold_until = float("-inf")
+
+    def _clamp(self, rate: float) -> float:
+        return min(self.max_rate, max(self.min_rate, rate))
+
+    def _set_rate(self, rate: float) -> None:
+        self.rate = self._clamp(rate)
+        self.jitter = ADAPTIVE_JITTER / self.rate
+        self.state.rate = self.rate
+
+    def _cut(self, reason: str) -> bool:
+        """Multiplicative decrease; returns False while holding after the previous cut."""
+        now = self._clock()
+        if now < self._hold_until:
+            return False
+        previous = self.rate
+        self._set_rate(previous * ADAPTIVE_DECREASE)
+        self._hold_until = now + 1.0 / self.rate
+        METRICS.count("rate_limiter.decreases")
+        log.warning("Slowing down from %.3f to %.3f req/s: %s", previous, self.rate, reason)
+        return True
+
+    def on_response(self, latency: float) -> None:
+        mean = self.mean_latency
+        self._responses += 1
+        self.mean_latency = latency if mean is None else mean + _LATENCY_WEIGHT * (latency - mean)
+        if (
+            mean is not None
+            and self._responses > _LATENCY_WARMUP
+            and latency > ADAPTIVE_LATENCY_SPIKE * mean
+        ):
+            self._cut(f"latency spike ({latency:.2f}s against a {mean:.2f}s mean)")
+            return
+
+        step = ADAPTIVE_INCREASE
+        # Climb back quickly to halfway between the cut rate and the rate that
+        # got blocked, then probe slowly
+        ceiling = self.state.ceiling
+        if ceiling is not None and self.rate >= ceiling * (1 + ADAPTIVE_DECREASE) / 2:
+            step /= ADAPTIVE_PROBE_SLOWDOWN
+        self._set_rate(self.rate + step)
+
+    def on_block(self) -> None:
+        blocked_at = self.rate
+        if self._cut("bot-detection redirect"):
+            self.state.ceiling = blocked_at
+            self.save()  # remembered even if the run dies here
+
+    def save(self) -> None:
+        self.state.rate = self.rate
+        self.state.save()
+        log.debug("Saved learned rate %.3f req/s to %s", self.rate, self.state.path)
@@ -0,0 +1,42 @@
+"""Record raw page bodies to disk and replay them without the network."""
+
+from __future__ import annotations
+
+import gzip
+import re
+from pathlib import Path
+
+_PAGE_FILE_RE = re.compile(r"^page_(\d+)\.html\.gz$")
+
+
+class PageArchive:
+    """Directory of gzip-compressed page bodies, one file per page number."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+
+    def path_for(self, page: int) -> Path:
+        return self.directory / f"page_{page:04d}.html.gz"
+
+    def save(self, page: int, html: str | bytes) -> Path:
+        """Store a page body exactly as fetched (text is saved as UTF-8)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = html.encode("utf-8") if isinstance(html, str) else html
+        path = self.path_for(page)
+        # Level 6 keeps recording cheap next to the request it follows
+        path.write_bytes(gzip.compress(data, compresslevel=6))
+        return path
+
+    def load(self, page: int) -> bytes:
+        """Return the raw body bytes; the parser accepts them as-is."""
+        return gzip.decompress(self.path_for(page).read_bytes())
+
+    def pages(self) -> list[int]:
+        """Archived page numbers in ascending order."""
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            int(m.group(1))
+            for p in self.directory.iterdir()
+            if (m := _PAGE_FILE_RE.match(p.name)) is not None
+        )
@@ -0,0 +1,176 @@
+"""Run many named search profiles over one client, one limiter and one deduper."""
+
+from __future__ import annotations
+
+import logging
+import re
+import tomllib
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from yad2_scraper.archive import PageArchive
+from yad2_scraper.config import DEFAULT_SEARCH_PARAMS
+from yad2_scraper.exporter import ListingWriter, TokenDeduper
+from yad2_scraper.fetcher import AsyncFetcher, Fetcher
+from yad2_scraper.pipeline import Pipeline, ScrapeStats, run_concurrent, run_sequential
+
+if TYPE_CHECKING:
+    from yad2_scraper.parsepool import ParsePool
+
+log = logging.getLogger(__name__)
+
+_PROFILE_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass
+class SearchProfile:
+    name: str
+    params: dict[str, str]
+    schedule: str | None = None  # cron expression, used by --daemon
+
+
+@dataclass
+class ProfileResult:
+    profile: SearchProfile
+    path: Path
+    stats: ScrapeStats
+    written: int
+
+
+def _read_profile_file(path: Path) -> Any:
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ValueError(
+                f"{path}: YAML profiles need PyYAML (pip install 'yad2-scraper[yaml]')"
+            ) from e
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def load_profiles(path: Path) -> list[SearchProfile]:
+    """Read search profiles from a TOML (or YAML) file.
+
+    The file has a ``profiles`` table of name -> query params, plus an
+    optional ``defaults`` table merged under every profile (DEFAULT_SEARCH_PARAMS
+    if absent). Values may be strings or numbers. A ``schedule`` key, in a
+    profile or the defaults, is a cron expression for --daemon rather than a
+    query param. Raises ValueError if the file can't be parsed or doesn't
+    have that shape.
+    """
+    try:
+        data = _read_profile_file(path)
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"{path}: {e}") from e
+    except ValueError:
+        raise
+    except Exception as e:  # yaml.YAMLError without importing yaml here
+        raise ValueError(f"{path}: {e}") from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("profiles"), dict):
+        raise ValueError(f"{path}: expected a 'profiles' table of named searches")
+    defaults = data.get("defaults", DEFAULT_SEARCH_PARAMS)
+    if not isinstance(defaults, dict):
+        raise ValueError(f"{path}: 'defaults' must be a table")
+
+    profiles = []
+    for name, params in data["profiles"].items():
+        if not _PROFILE_NAME_RE.match(str(name)):
+            raise ValueError(f"{path}: profile name {name!r} must be letters, digits, _ or -")
+        if not isinstance(params, dict):
+            raise ValueError(f"{path}: profile {name!r} must be a table of query params")
+        merged = {**defaults, **params}
+        schedule = merged.pop("schedule", None)
+        if schedule is not None and not isinstance(schedule, str):
+            raise ValueError(f"{path}: schedule of profile {name!r} must be a string")
+        params = {str(k): str(v) for k, v in merged.items()}
+        profiles.append(SearchProfile(str(name), params, schedule))
+    if not profiles:
+        raise ValueError(f"{path}: no profiles defined")
+    return profiles
+
+
+class _Batch:
+    """Per-profile pipeline setup shared by the sequential and concurrent runners."""
+
+    def __init__(
+        self,
+        open_writer: Callable[[SearchProfile], ListingWriter],
+        record_dir: Path | None,
+        results: list[ProfileResult] | None,
+    ) -> None:
+        self.open_writer = open_writer
+        self.record_dir = record_dir
+        # One seen-set for the whole batch: overlapping searches don't repeat rows
+        self.deduper = TokenDeduper()
+        self.results = results if results is not None else []
+
+    def pipeline(self, profile: SearchProfile) -> Pipeline:
+        log.info("Profile %s: %s", profile.name, profile.params)
+        recorder = PageArchive(self.record_dir / profile.name) if self.record_dir else None
+        return Pipeline(self.open_writer(profile), deduper=self.deduper, recorder=recorder)
+
+    def finish(self, profile: SearchProfile, pipeline: Pipeline) -> None:
+        # A SQLite store is never marked complete here: listings claimed by an
+        # earlier profile never reach it, and would look removed.
+        pipeline.sink.close()
+        result = ProfileResult(profile, pipeline.sink.path, pipeline.stats, pipeline.sink.written)
+        self.results.append(result)
+        log.info(
+            "Profile %s: %d listings (%d already seen) -> %s",
+            profile.name,
+            result.written,
+            pipeline.stats.duplicates,
+            result.path,
+        )
+
+
+def run_batch(
+    fetcher: Fetcher,
+    profiles: list[SearchProfile],
+    open_writer: Callable[[SearchProfile], ListingWriter],
+    max_pages: int | None = None,
+    record_dir: Path | None = None,
+    results: list[ProfileResult] | None = None,
+) -> list[ProfileResult]:
+    """Scrape each profile in turn through views of one fetcher.
+
+    Each profile's result is appended to ``results`` (if given) as soon as
+    it finishes, so a caller interrupted mid-batch still has the earlier
+    profiles' results, and the partial one's.
+    """
+    batch = _Batch(open_writer, record_dir, results)
+    for profile in profiles:
+        pipeline = batch.pipeline(profile)
+        try:
+            run_sequential(fetcher.for_search(profile.params), pipeline, max_pages)
+        finally:
+            batch.finish(profile, pipeline)
+    return batch.results
+
+
+async def run_batch_concurrent(
+    fetcher: AsyncFetcher,
+    profiles: list[SearchProfile],
+    open_writer: Callable[[SearchProfile], ListingWriter],
+    max_pages: int | None = None,
+    record_dir: Path | None = None,
+    parse_pool: ParsePool | None = None,
+    results: list[ProfileResult] | None = None,
+) -> list[ProfileResult]:
+    """Like run_batch, fetching each profile's pages concurrently."""
+    batch = _Batch(open_writer, record_dir, results)
+    for profile in profiles:
+        pipeline = batch.pipeline(profile)
+        try:
+            await run_concurrent(
+                fetcher.for_search(profile.params), pipeline, max_pages, parse_pool
+            )
+        finally:
+            batch.finish(profile, pipeline)
+    return batch.results
@@ -0,0 +1,181 @@
+"""On-disk HTTP response cache with TTL, LRU size cap and revalidation."""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from yad2_scraper.config import CACHE_MAX_BYTES
+
+log = logging.getLogger(__name__)
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form used as the cache key: lowercase host, sorted query."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)), safe=",")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, query, ""))
+
+
+@dataclass
+class CacheEntry:
+    """A cached page body plus the validators needed to revalidate it."""
+
+    text: str
+    stored_at: float
+    etag: str | None = None
+    last_modified: str | None = None
+    fresh: bool = True
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class ResponseCache:
+    """Gzip-compressed page bodies on disk, one body/metadata pair per URL.
+
+    Entries older than ``ttl`` seconds are returned as stale so the caller
+    can revalidate them with If-None-Match / If-Modified-Since. When the
+    directory grows past ``max_bytes`` the least recently used entries
+    (by body mtime, bumped on every hit) are evicted. The directory is
+    scanned once for its size and again only when evicting; puts keep a
+    running total in between.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl: float,
+        max_bytes: int = CACHE_MAX_BYTES,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._size: int | None = None  # bytes of bodies on disk, once scanned
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(normalize_url(url).encode()).hexdigest()
+        return self.directory / f"{key}.html.gz", self.directory / f"{key}.json"
+
+    def _touch(self, body_path: Path) -> None:
+        now = self._clock()
+        os.utime(body_path, (now, now))
+
+    def get(self, url: str) -> CacheEntry | None:
+        """Return the cached entry (fresh or stale), or None on a miss."""
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            entry = CacheEntry(
+                text=gzip.decompress(body_path.read_bytes()).decode("utf-8"),
+                stored_at=float(meta["stored_at"]),
+                etag=meta.get("etag"),
+                last_modified=meta.get("last_modified"),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        entry.fresh = self._clock() - entry.stored_at < self.ttl
+        if entry.fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._touch(body_path)
+        return entry
+
+    def put(
+        self, url: str, text: str, etag: str | None = None, last_modified: str | None = None
+    ) -> None:
+        body_path, meta_path = self._paths(url)
+        meta = {
+            "url": normalize_url(url),
+            "stored_at": self._clock(),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        body = gzip.compress(text.encode("utf-8"))
+        if self._size is None:
+            self._size = self._scan_size()
+        with suppress(FileNotFoundError):
+            self._size -= body_path.stat().st_size  # replacing an older copy
+        _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        self._touch(body_path)
+        self._size += len(body)
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def refresh(self, url: str) -> None:
+        """Restart the TTL of an entry the server confirmed unchanged (304).
+
+        Does nothing if the entry was evicted or damaged since it was read.
+        """
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta["stored_at"] = self._clock()
+            self._touch(body_path)
+        except (OSError, ValueError, TypeError):
+            log.debug("Cache entry for %s is gone; not refreshing it", url)
+            return
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        self.revalidated += 1
+
+    def _bodies(self) -> list[tuple[float, int, Path]]:
+        bodies = []
+        for path in self.directory.glob("*.html.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # removed since the glob
+                continue
+            bodies.append((stat.st_mtime, stat.st_size, path))
+        return bodies
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._bodies())
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the bodies fit in ``max_bytes``."""
+        bodies = self._bodies()
+        total = sum(size for _, size, _ in bodies)  # also corrects any drift
+        for _, size, body_path in sorted(bodies):
+            if total <= self.max_bytes:
+                break
+            body_path.unlink(missing_ok=True)
+            body_path.with_name(body_path.name.replace(".html.gz", ".json")).unlink(missing_ok=True)
+            total -= size
+            log.debug("Evicted %s from response cache", body_path.name)
+        self._size = total
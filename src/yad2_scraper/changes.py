@@ -0,0 +1,72 @@
+"""Change detection between a listing's stored and scraped rows via per-row fingerprints."""
+
+from __future__ import annotations
+
+import hashlib
+import operator
+from dataclasses import dataclass, field
+from typing import Any, NamedTuple
+
+from yad2_scraper.models import DETAIL_FIELDS, CarListing
+
+# Feed ranking, not a property of the car; it shifts with every promotion.
+# Detail fields are only filled in on --enrich runs (and not for every
+# listing even then), so a feed row must hash the same as its enriched one.
+FINGERPRINT_EXCLUDE = frozenset({"priority", *DETAIL_FIELDS})
+
+_fingerprinted_values = operator.itemgetter(
+    *(i for i, name in enumerate(CarListing.csv_header()) if name not in FINGERPRINT_EXCLUDE)
+)
+
+
+def fingerprint(values: tuple[Any, ...]) -> int:
+    """64-bit signed hash of a listing's field values (as from CarListing.rows).
+
+    Signed so it fits an SQLite INTEGER. Fields in FINGERPRINT_EXCLUDE don't
+    count as a change.
+    """
+    key = repr(_fingerprinted_values(values)).encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big", signed=True)
+
+
+class PriceChange(NamedTuple):
+    token: str
+    old: int | None
+    new: int | None
+
+    @property
+    def delta(self) -> int | None:
+        if self.old is None or self.new is None:
+            return None
+        return self.new - self.old
+
+
+@dataclass
+class ChangeSet:
+    """What changed in a run, by kind."""
+
+    new: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    price_changes: list[PriceChange] = field(default_factory=list)
+    updated: list[str] = field(default_factory=list)  # other fields changed, same price
+    returned: list[str] = field(default_factory=list)  # listed again after being removed
+
+    def __bool__(self) -> bool:
+        return bool(self.new or self.removed or self.price_changes or self.updated or self.returned)
+
+
+def change_kind(
+    before: tuple[int | None, int | None] | None, fp: int | None, price: int | None
+) -> str | None:
+    """How a row changed from ``before`` (its stored fingerprint and price).
+
+    Returns "new", "price", "updated", or None if nothing changed. Rows
+    stored before fingerprints existed only report price changes.
+    """
+    if before is None:
+        return "new"
+    if before[0] == fp:
+        return None
+    if before[1] != price:
+        return "price"
+    return "updated" if before[0] is not None else None
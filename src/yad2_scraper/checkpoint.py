@@ -0,0 +1,79 @@
+"""Resumable scrape state, saved atomically after every page."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class Checkpoint:
+    """Everything needed to continue an interrupted scrape.
+
+    ``seen_tokens`` is shared with the run's TokenDeduper, so saving always
+    captures the current seen set without copying it per page.
+    """
+
+    path: Path
+    params: dict[str, str]
+    output_path: str
+    output_format: str = "csv"
+    total_pages: int | None = None
+    completed_pages: set[int] = field(default_factory=set)
+    seen_tokens: set[str] = field(default_factory=set)
+
+    @property
+    def next_page(self) -> int:
+        """First page number not yet completed."""
+        page = 1
+        while page in self.completed_pages:
+            page += 1
+        return page
+
+    def mark_done(self, page: int, total_pages: int | None) -> None:
+        self.completed_pages.add(page)
+        if total_pages is not None:
+            self.total_pages = total_pages
+
+    def save(self) -> None:
+        """Write to a temp file in the same directory, then rename over the old one."""
+        payload = {
+            "params": self.params,
+            "output_path": self.output_path,
+            "output_format": self.output_format,
+            "total_pages": self.total_pages,
+            "completed_pages": sorted(self.completed_pages),
+            "seen_tokens": sorted(self.seen_tokens),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> Checkpoint:
+        """Read a checkpoint; raises FileNotFoundError or ValueError if unusable."""
+        with open(path, encoding="utf-8") as f:
+            try:
+                payload = json.load(f)
+                return cls(
+                    path=path,
+                    params=dict(payload["params"]),
+                    output_path=str(payload["output_path"]),
+                    output_format=str(payload.get("output_format", "csv")),
+                    total_pages=payload.get("total_pages"),
+                    completed_pages={int(p) for p in payload.get("completed_pages", [])},
+                    seen_tokens=set(payload.get("seen_tokens", [])),
+                )
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                raise ValueError(f"Corrupt checkpoint {path}: {e}") from e
@@ -11,6 +11,10 @@ DEFAULT_SEARCH_PARAMS = {
     "imgOnly": "1",
 }
 
+# Added to the search in --incremental mode: Yad2's "newest first" sort order,
+# so listings we already have sink to the later pages.
+NEWEST_FIRST_PARAMS = {"Order": "1"}
+
 # Chrome-like headers to mimic a real browser session
 HEADERS = {
     "User-Agent": (
@@ -39,10 +43,71 @@ HEADERS = {
 DELAY_MIN = 3.0  # seconds
 DELAY_MAX = 7.0  # seconds
 
+# Concurrent fetching (AsyncFetcher) — pages after the first are fetched in
+# parallel, but request starts are still paced by a global budget.
+MAX_CONCURRENCY = 4  # in-flight requests
+REQUESTS_PER_SECOND = 0.5  # default global budget across all workers
+MAX_REQUESTS_PER_SECOND = 1.0  # politeness ceiling; CLI values are clamped to it
+
+# Optional on-disk response cache (--cache-dir)
+CACHE_TTL = 3600.0  # seconds before a cached page must be revalidated
+CACHE_MAX_BYTES = 256 * 1024 * 1024  # LRU eviction beyond this (compressed size)
+
 # Bot detection backoff
 BACKOFF_BASE = 10.0  # seconds
 BACKOFF_MAX_RETRIES = 3
 
+# Adaptive rate control (--adaptive): additive increase while pages come back
+# fast, multiplicative decrease on a bot redirect or a latency spike
+ADAPTIVE_START_RATE = 0.2  # req/s with no saved state, ~the DELAY_MIN..DELAY_MAX pace
+ADAPTIVE_MIN_RATE = 0.05  # never slower than one request every 20s
+ADAPTIVE_INCREASE = 0.01  # req/s added per fast response
+ADAPTIVE_DECREASE = 0.5  # rate multiplier on a redirect or latency spike
+ADAPTIVE_LATENCY_SPIKE = 3.0  # a response this many times the mean latency is a spike
+ADAPTIVE_PROBE_SLOWDOWN = 10  # increases near the last blocked rate are this much smaller
+ADAPTIVE_JITTER = 0.5  # random extra delay, as a fraction of the request interval
+RATE_STATE_FILE = "rate_state.json"  # learned rate, kept next to the output
+
+# Identity pool (--identities): each identity has its own proxy, headers,
+# cookie jar and rate budget, and sits out a while after a bot redirect
+IDENTITY_QUARANTINE = 300.0  # seconds after a first redirect, doubling while they repeat
+IDENTITY_QUARANTINE_MAX = 3600.0
+
+# __NEXT_DATA__ decoding: the first of these that is installed is used
+JSON_BACKENDS = ("msgspec", "orjson", "json")
+
+# Listing arrays of the search feed, in the order they are parsed
+FEED_AD_TYPES = ("commercial", "private", "platinum", "boost", "solo")
+
+# Stage timing histograms (seconds); see metrics.py
+TIMING_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Prometheus exposition (--metrics-listen / --metrics-textfile)
+PROMETHEUS_TEXTFILE_INTERVAL = 15.0  # seconds between textfile rewrites
+
 # Output
 OUTPUT_DIR = "output"
+OUTPUT_FORMATS = ("csv", "parquet", "sqlite")
 CSV_ENCODING = "utf-8-sig"  # UTF-8 with BOM for Excel Hebrew compat
+CHECKPOINT_FILE = "checkpoint.json"  # written next to the output file
+PARQUET_ROW_GROUP_SIZE = 10_000  # listings buffered per Parquet row group
+SQLITE_FILE = "yad2_cars.db"  # one store updated in place by every run
+
+# Search partitioning (--partition): ranges are halved until each sub-query
+# reports at most this many results, i.e. a short page chain of ~40 per page.
+PARTITION_MAX_RESULTS = 800
+PARTITION_MIN_PRICE_STEP = 1000  # price ranges narrower than this aren't split
+
+# Incremental mode (--incremental)
+TOKEN_INDEX_FILE = "token_index.json.gz"  # token -> fingerprint of every listing seen
+INCREMENTAL_STOP_AFTER = 3  # consecutive pages with nothing new or changed
+
+# Daemon mode
+DAEMON_SCHEDULE = "0 * * * *"  # cron expression for profiles without their own schedule
+
+# Detail-page enrichment (--enrich): fills the fields the feed leaves empty
+DETAIL_URL = "https://www.yad2.co.il/vehicles/item/{token}"
+ENRICH_CONCURRENCY = 2  # detail pages in flight
+ENRICH_REQUESTS_PER_SECOND = 0.2  # own budget, on top of the search pages'
+ENRICH_TIME_BUDGET = 600.0  # seconds per run; later listings are written as they are
+DETAIL_CACHE_FILE = "detail_cache.json.gz"  # token -> feed fingerprint + detail fields
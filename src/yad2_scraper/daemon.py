@@ -0,0 +1,111 @@
+"""Long-lived --daemon mode: scrape search profiles on cron schedules over one warm client.
+
+A scheduled ``python -m yad2_scraper`` pays interpreter startup, imports
+and a cold TLS/HTTP2 handshake on every run. The daemon pays them once:
+the Fetcher (with its connection pool, rate limiter and response cache)
+and every profile's token index stay loaded between runs. Each run is
+incremental — newest first, stopping once pages only repeat known
+listings — and streams into that profile's output like any other run.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from yad2_scraper.batch import SearchProfile
+from yad2_scraper.config import INCREMENTAL_STOP_AFTER, NEWEST_FIRST_PARAMS
+from yad2_scraper.exporter import ListingWriter
+from yad2_scraper.fetcher import Fetcher
+from yad2_scraper.incremental import EarlyStop, TokenIndex
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.pipeline import Pipeline, run_sequential
+from yad2_scraper.schedule import CronSchedule
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    """One profile's schedule, its token index (kept in memory) and run history."""
+
+    profile: SearchProfile
+    schedule: CronSchedule
+    index: TokenIndex
+    due: datetime = datetime.min
+    runs: int = 0
+    written: int = 0
+
+
+def run_job(
+    fetcher: Fetcher,
+    job: Job,
+    sink: ListingWriter,
+    max_pages: int | None = None,
+    stop_after: int = INCREMENTAL_STOP_AFTER,
+) -> Pipeline:
+    """One incremental run of a job's profile into ``sink``, which is closed afterwards.
+
+    Network errors end the run rather than the daemon; the token index is
+    saved either way.
+    """
+    import httpx  # like fetcher.py, keep the network stack out of module import
+
+    pipeline = Pipeline(sink, early_stop=EarlyStop(job.index, stop_after))
+    params = {**job.profile.params, **NEWEST_FIRST_PARAMS}
+    try:
+        run_sequential(fetcher.for_search(params), pipeline, max_pages)
+    except httpx.HTTPError as e:
+        log.error("Profile %s: run failed: %s", job.profile.name, e)
+    finally:
+        sink.close()
+        job.index.save()
+    job.runs += 1
+    job.written += sink.written
+    METRICS.count("daemon.runs")
+    return pipeline
+
+
+def run_daemon(
+    fetcher: Fetcher,
+    jobs: list[Job],
+    open_writer: Callable[[SearchProfile], ListingWriter],
+    max_pages: int | None = None,
+    stop_after: int = INCREMENTAL_STOP_AFTER,
+    clock: Callable[[], datetime] = datetime.now,
+    max_runs: int | None = None,
+) -> None:
+    """Run each job whenever its schedule comes due, until interrupted (or ``max_runs``).
+
+    Runs never overlap: a job that comes due while another is running
+    starts when that one finishes, and slots missed meanwhile are skipped
+    rather than caught up.
+    """
+    for job in jobs:
+        job.due = job.schedule.next_after(clock())
+        log.info(
+            "Profile %s: schedule %s, first run at %s", job.profile.name, job.schedule, job.due
+        )
+
+    runs = 0
+    while max_runs is None or runs < max_runs:
+        job = min(jobs, key=lambda job: job.due)
+        wait = (job.due - clock()).total_seconds()
+        if wait > 0:
+            log.info("Sleeping %.0fs until %s (profile %s)", wait, job.due, job.profile.name)
+            time.sleep(wait)
+
+        log.info("Profile %s: run %d", job.profile.name, job.runs + 1)
+        pipeline = run_job(fetcher, job, open_writer(job.profile), max_pages, stop_after)
+        runs += 1
+        job.due = job.schedule.next_after(clock())
+        log.info(
+            "Profile %s: wrote %d listings to %s; next run at %s",
+            job.profile.name,
+            pipeline.sink.written,
+            pipeline.sink.path,
+            job.due,
+        )
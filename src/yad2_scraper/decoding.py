@@ -0,0 +1,131 @@
+"""JSON backends for the __NEXT_DATA__ blob: msgspec, then orjson, then stdlib json.
+
+The blob is often hundreds of KB, most of it page props we never read.
+The msgspec backend decodes against Struct schemas that keep only the
+``dehydratedState`` queries, and leaves each query's ``state`` as raw
+bytes until the feed query is found, so everything else is skipped
+without building Python objects. Every backend raises json.JSONDecodeError
+(a ValueError) for malformed input, like the stdlib.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from yad2_scraper.config import JSON_BACKENDS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+
+class SchemaMismatchError(Exception):
+    """The blob is valid JSON but not in the shape the typed decoder expects."""
+
+
+class JsonBackend(NamedTuple):
+    """How to decode a blob, fully and (optionally) just the feed query's data."""
+
+    name: str
+    loads: Callable[[str | bytes], Any]
+    # Returns the feed query's state.data, or None if there is no feed query;
+    # raises SchemaMismatchError when the caller should walk loads() output instead
+    loads_feed: Callable[[str | bytes], dict[str, Any] | None] | None = None
+
+
+def _as_text(blob: str | bytes) -> str:
+    return blob if isinstance(blob, str) else blob.decode("utf-8", "replace")
+
+
+if msgspec is not None:
+    # Only the path down to the queries is typed; unknown keys are skipped unbuilt
+
+    class _Query(msgspec.Struct):
+        queryKey: Any = None  # noqa: N815 - JSON key
+        state: msgspec.Raw = msgspec.Raw()
+
+    class _Dehydrated(msgspec.Struct):
+        queries: list[_Query] = []
+
+    class _PageProps(msgspec.Struct):
+        dehydratedState: _Dehydrated | None = None  # noqa: N815 - JSON key
+
+    class _Props(msgspec.Struct):
+        pageProps: _PageProps | None = None  # noqa: N815 - JSON key
+
+    class _NextData(msgspec.Struct):
+        props: _Props | None = None
+
+    class _State(msgspec.Struct):
+        data: dict[str, Any] = {}
+
+
+def _msgspec_backend() -> JsonBackend:
+    next_data_decoder = msgspec.json.Decoder(_NextData)
+    state_decoder = msgspec.json.Decoder(_State)
+
+    def loads(blob: str | bytes) -> Any:
+        try:
+            return msgspec.json.decode(blob)
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), _as_text(blob), 0) from None
+
+    def loads_feed(blob: str | bytes) -> dict[str, Any] | None:
+        try:
+            props = next_data_decoder.decode(blob).props
+            page_props = props.pageProps if props else None
+            dehydrated = page_props.dehydratedState if page_props else None
+            for query in dehydrated.queries if dehydrated else ():
+                key = query.queryKey
+                if isinstance(key, list) and key and key[0] == "feed":
+                    return state_decoder.decode(query.state).data if query.state else {}
+            return None
+        except msgspec.ValidationError as e:
+            raise SchemaMismatchError(str(e)) from e
+        except msgspec.DecodeError as e:
+            raise json.JSONDecodeError(str(e), _as_text(blob), 0) from None
+
+    return JsonBackend("msgspec", loads, loads_feed)
+
+
+def _available() -> dict[str, JsonBackend]:
+    backends = {"json": JsonBackend("json", json.loads)}
+    if orjson is not None:
+        # orjson.JSONDecodeError already subclasses json.JSONDecodeError
+        backends["orjson"] = JsonBackend("orjson", orjson.loads)
+    if msgspec is not None:
+        backends["msgspec"] = _msgspec_backend()
+    return backends
+
+
+BACKENDS = _available()
+_backend = next(BACKENDS[name] for name in JSON_BACKENDS if name in BACKENDS)
+
+
+def get_backend() -> JsonBackend:
+    """The backend used by the parser: the first of JSON_BACKENDS installed."""
+    return _backend
+
+
+def set_backend(name: str) -> JsonBackend:
+    """Switch the parser to another installed backend; returns the previous one.
+
+    Raises ValueError if ``name`` isn't installed (or isn't a backend at all).
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"JSON backend {name!r} is not available (installed: {sorted(BACKENDS)})")
+    previous, _backend = _backend, BACKENDS[name]
+    log.debug("Decoding __NEXT_DATA__ with %s", name)
+    return previous
@@ -0,0 +1,205 @@
+"""Detail-page enrichment for --enrich: fill the fields the search feed leaves empty.
+
+Financing, commitments and listing source (DETAIL_FIELDS, known issue #12)
+are only on each listing's own detail page. The Enricher sits between
+dedupe and write: for each selected listing of a page it fetches the
+detail page on a small thread pool, through a Fetcher with its own rate
+budget, and merges the fields in before the page is written. Detail data
+is cached by token together with the listing's feed fingerprint. A listing
+that hasn't changed in the feed is filled from the cache without a
+request. Once the run's time budget is used up, listings are written
+without the detail fields.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+import httpx
+
+from yad2_scraper.changes import fingerprint
+from yad2_scraper.config import ENRICH_CONCURRENCY, ENRICH_TIME_BUDGET
+from yad2_scraper.fetcher import BotDetectedError, Fetcher
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.models import CarListing
+from yad2_scraper.parser import parse_detail
+
+log = logging.getLogger(__name__)
+
+
+class DetailCache:
+    """Persisted token -> (feed fingerprint, detail fields) of enriched listings."""
+
+    def __init__(
+        self, path: Path, entries: dict[str, tuple[int, dict[str, str]]] | None = None
+    ) -> None:
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> DetailCache:
+        """Read the cache, or start an empty one if the file doesn't exist yet."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                raw = json.load(f)
+            entries = {
+                str(token): (int(fp), {str(k): str(v) for k, v in fields.items()})
+                for token, (fp, fields) in raw.items()
+            }
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            raise ValueError(f"Corrupt detail cache {path}: {e}") from e
+        return cls(path, entries)
+
+    def save(self) -> None:
+        """Write to a temp file in the same directory, then rename over the old one."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def get(self, token: str, fp: int) -> dict[str, str] | None:
+        """Cached detail fields, if they were fetched for this exact feed version."""
+        entry = self.entries.get(token)
+        return entry[1] if entry is not None and entry[0] == fp else None
+
+    def put(self, token: str, fp: int, fields: dict[str, str]) -> None:
+        self.entries[token] = (fp, fields)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def _merge(listing: CarListing, fields: dict[str, str]) -> None:
+    for name, value in fields.items():
+        setattr(listing, name, value)
+
+
+class Enricher:
+    """Fetch detail pages for a page's listings, ``concurrency`` at a time.
+
+    ``fetcher`` should have a limiter of its own and no cache or identity
+    pool, since it is shared by the worker threads. ``select`` picks the
+    listings worth enriching (default: all). Close the enricher to stop
+    its workers and save the cache; ``fetcher`` is only safe to close
+    after that.
+    """
+
+    def __init__(
+        self,
+        fetcher: Fetcher,
+        cache: DetailCache,
+        select: Callable[[CarListing], bool] | None = None,
+        concurrency: int = ENRICH_CONCURRENCY,
+        time_budget: float = ENRICH_TIME_BUDGET,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.fetcher = fetcher
+        self.cache = cache
+        self.select = select
+        self._clock = clock
+        self.time_budget = time_budget
+        self.deadline = clock() + time_budget
+        self._pool = ThreadPoolExecutor(concurrency, thread_name_prefix="enrich")
+        self.fetched = 0
+        self.cached = 0
+        self.failed = 0
+        self.skipped = 0  # selected but left out: over the time budget or blocked
+
+    def __enter__(self) -> Enricher:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def _fetch(self, token: str) -> dict[str, str]:
+        return parse_detail(self.fetcher.fetch_detail(token), token)
+
+    def _stop(self, reason: str) -> None:
+        if self.deadline > self._clock():
+            log.warning("Enrichment stopped for the rest of the run: %s", reason)
+        self.deadline = self._clock()
+
+    def enrich(self, listings: list[CarListing]) -> None:
+        """Merge detail fields into ``listings`` in place, waiting at most until the deadline."""
+        todo: dict[str, tuple[CarListing, int]] = {}
+        from_cache = 0
+        for listing, values in zip(listings, CarListing.rows(listings), strict=True):
+            if not listing.token or (self.select is not None and not self.select(listing)):
+                continue
+            fp = fingerprint(values)  # the feed version, before any detail fields
+            fields = self.cache.get(listing.token, fp)
+            if fields is not None:
+                _merge(listing, fields)
+                from_cache += 1
+            else:
+                todo[listing.token] = (listing, fp)
+        if from_cache:
+            self.cached += from_cache
+            METRICS.count("enrich.cached", from_cache)
+        if not todo:
+            return
+
+        remaining = self.deadline - self._clock()
+        if remaining <= 0:
+            self.skipped += len(todo)
+            METRICS.count("enrich.skipped", len(todo))
+            return
+
+        futures = {self._pool.submit(self._fetch, token): token for token in todo}
+        done, not_done = wait(futures, timeout=remaining)
+        for future in not_done:
+            future.cancel()  # still queued; requests already sent just finish unused
+        if not_done:
+            self._stop(f"the {self.time_budget:.0f}s time budget is used up")
+            self.skipped += len(not_done)
+            METRICS.count("enrich.skipped", len(not_done))
+
+        for future in done:
+            token = futures[future]
+            listing, fp = todo[token]
+            try:
+                fields = future.result()
+            except BotDetectedError as e:
+                self._stop(str(e))
+                self.skipped += 1
+                METRICS.count("enrich.skipped")
+                continue
+            except (httpx.HTTPError, ValueError) as e:
+                log.warning("No details for listing %s: %s", token, e)
+                self.failed += 1
+                METRICS.count("enrich.failed")
+                continue
+            _merge(listing, fields)
+            self.cache.put(token, fp, fields)
+            self.fetched += 1
+            METRICS.count("enrich.fetched")
+
+    def close(self) -> None:
+        # Queued fetches are dropped, but ones already running still use the
+        # fetcher's client, so wait for them before anyone closes it
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self.cache.save()
+        log.info(
+            "Enrichment: %d detail pages fetched, %d from cache, %d failed, %d skipped",
+            self.fetched,
+            self.cached,
+            self.failed,
+            self.skipped,
+        )
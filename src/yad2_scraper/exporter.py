@@ -1,47 +1,153 @@
-"""Write CarListing list to CSV with UTF-8 BOM."""
+"""Write CarListing batches to CSV with UTF-8 BOM (or another ListingWriter)."""
 
 from __future__ import annotations
 
 import csv
 import logging
+from collections.abc import Iterable
 from datetime import datetime
 from pathlib import Path
+from typing import IO, Any, Protocol
 
-from yad2_scraper.config import CSV_ENCODING, OUTPUT_DIR
+from yad2_scraper.config import CSV_ENCODING, OUTPUT_DIR, OUTPUT_FORMATS
+from yad2_scraper.metrics import METRICS
 from yad2_scraper.models import CarListing
 
 log = logging.getLogger(__name__)
 
 
+def default_output_path(suffix: str = ".csv", name: str = "cars") -> Path:
+    """Timestamped output path under OUTPUT_DIR."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return Path(OUTPUT_DIR) / f"yad2_{name}_{timestamp}{suffix}"
+
+
+def profile_output_path(name: str, fmt: str, directory: Path | None = None) -> Path:
+    """Output path for one batch profile: timestamped files, or a per-profile store."""
+    directory = directory or default_output_path().parent
+    if fmt == "sqlite":
+        return directory / f"yad2_{name}.db"
+    return directory / default_output_path(f".{fmt}", name).name
+
+
+class ListingWriter(Protocol):
+    """A sink the pipeline can stream listing batches into."""
+
+    path: Path
+    written: int
+
+    def write(self, listings: Iterable[CarListing]) -> int: ...
+
+    def close(self) -> None: ...
+
+
+def open_writer(fmt: str = "csv", path: Path | None = None) -> ListingWriter:
+    """Writer for an output format in OUTPUT_FORMATS.
+
+    Raises ImportError if the format's optional dependency isn't installed.
+    """
+    if fmt == "csv":
+        return CsvWriter(path)
+    if fmt == "parquet":
+        from yad2_scraper.parquet import ParquetWriter  # needs the optional pyarrow
+
+        return ParquetWriter(path)
+    if fmt == "sqlite":
+        from yad2_scraper.store import SqliteStore  # sqlite3 only for this format
+
+        return SqliteStore(path)
+    raise ValueError(f"Unknown output format {fmt!r} (expected one of {OUTPUT_FORMATS})")
+
+
+class TokenDeduper:
+    """Drop listings whose token was already seen (or that have no token).
+
+    Promoted listings can appear on multiple pages, so the seen set lives
+    for the whole run while the listings themselves don't.
+    """
+
+    def __init__(self, seen: Iterable[str] = ()) -> None:
+        self.seen: set[str] = set(seen)
+        self.dropped = 0
+
+    def filter(self, listings: Iterable[CarListing]) -> list[CarListing]:
+        unique: list[CarListing] = []
+        for listing in listings:
+            if listing.token and listing.token not in self.seen:
+                self.seen.add(listing.token)
+                unique.append(listing)
+            else:
+                self.dropped += 1
+        return unique
+
+
+class CsvWriter:
+    """CSV sink that stays open and appends rows batch by batch.
+
+    The file is created on the first write (or an explicit open()), and
+    flushed after every batch so rows already written survive a crash or
+    SIGKILL. An existing file is appended to without repeating the header.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or default_output_path()
+        self.written = 0
+        self._file: IO[str] | None = None
+        self._writer: Any = None
+
+    def open(self) -> Path:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            resuming = self.path.exists() and self.path.stat().st_size > 0
+            # Held open across batches; closed in close()
+            self._file = open(self.path, "a", newline="", encoding=CSV_ENCODING)  # noqa: SIM115
+            self._writer = csv.writer(self._file)
+            if not resuming:
+                self._writer.writerow(CarListing.csv_header())
+                self.flush()
+        return self.path
+
+    def write(self, listings: Iterable[CarListing]) -> int:
+        """Append ``listings`` and flush; returns the number of rows written."""
+        rows = list(CarListing.rows(listings))
+        if not rows:
+            return 0
+        self.open()
+        self._writer.writerows(rows)
+        self.flush()
+        self.written += len(rows)
+        return len(rows)
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> CsvWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
 def export_csv(listings: list[CarListing]) -> Path:
     """Deduplicate by token and write listings to a timestamped CSV file.
 
     Returns the path to the written file.
     """
-    # Deduplicate — promoted listings can appear on multiple pages
-    seen: set[str] = set()
-    unique: list[CarListing] = []
-    for listing in listings:
-        if listing.token and listing.token not in seen:
-            seen.add(listing.token)
-            unique.append(listing)
-
-    dupes = len(listings) - len(unique)
-    if dupes:
-        log.info("Removed %d duplicate listings (by token)", dupes)
-
-    # Ensure output directory exists
-    out_dir = Path(OUTPUT_DIR)
-    out_dir.mkdir(parents=True, exist_ok=True)
+    deduper = TokenDeduper()
+    unique = deduper.filter(listings)
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = out_dir / f"yad2_cars_{timestamp}.csv"
+    if deduper.dropped:
+        log.info("Removed %d duplicate listings (by token)", deduper.dropped)
 
-    with open(filename, "w", newline="", encoding=CSV_ENCODING) as f:
-        writer = csv.writer(f)
-        writer.writerow(CarListing.csv_header())
-        for listing in unique:
-            writer.writerow(listing.csv_row())
+    with METRICS.timer("export_csv"), CsvWriter() as writer:
+        filename = writer.open()
+        writer.write(unique)
 
     log.info("Wrote %d listings to %s", len(unique), filename)
     return filename
@@ -2,13 +2,14 @@
 
 from __future__ import annotations
 
+import copy
 import logging
-import random
 import time
+from collections.abc import AsyncIterator, Iterable
+from typing import TYPE_CHECKING
 from urllib.parse import urlencode
 
-import httpx
-
+from yad2_scraper.cache import CacheEntry, ResponseCache
 from yad2_scraper.config import (
     BACKOFF_BASE,
     BACKOFF_MAX_RETRIES,
@@ -16,30 +17,144 @@ from yad2_scraper.config import (
     DEFAULT_SEARCH_PARAMS,
     DELAY_MAX,
     DELAY_MIN,
+    DETAIL_URL,
     HEADERS,
+    MAX_CONCURRENCY,
+    MAX_REQUESTS_PER_SECOND,
+    REQUESTS_PER_SECOND,
 )
+from yad2_scraper.metrics import METRICS, RequestTrace
+from yad2_scraper.ratelimit import RateLimiter
+
+if TYPE_CHECKING:
+    import httpx
+
+    from yad2_scraper.identities import IdentityPool
 
 log = logging.getLogger(__name__)
 
 
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
 class BotDetectedError(Exception):
     """Raised when the site returns a bot-challenge redirect."""
 
 
+def _build_url(page: int, search: dict[str, str] = DEFAULT_SEARCH_PARAMS) -> str:
+    params = {**search, "page": str(page)}
+    # Build query string manually so commas in values (e.g. engineType)
+    # stay literal instead of being percent-encoded to %2C by httpx.
+    # Yad2 returns 404 when commas are encoded.
+    return f"{BASE_URL}?{urlencode(params, safe=',')}"
+
+
+def _cache_lookup(cache: ResponseCache | None, url: str) -> CacheEntry | None:
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None:
+        log.debug("Cache %s for %s", "hit" if entry.fresh else "stale", url)
+    return entry
+
+
+def _cache_store(cache: ResponseCache | None, url: str, resp: httpx.Response) -> None:
+    if cache is not None:
+        cache.put(url, resp.text, resp.headers.get("etag"), resp.headers.get("last-modified"))
+
+
+def _count_response(resp: httpx.Response) -> None:
+    METRICS.count("fetch.requests")
+    METRICS.count("fetch.bytes", resp.num_bytes_downloaded)  # as sent: compressed
+
+
+def _track_limiter(limiter: RateLimiter) -> None:
+    """Expose the limiter's live state as gauges (the latest fetcher's wins)."""
+    METRICS.gauge("rate_limiter.rate", lambda: limiter.rate)
+    METRICS.gauge("rate_limiter.tokens", lambda: limiter.tokens)
+    METRICS.gauge("rate_limiter.queue_depth", lambda: limiter.queue_depth)
+
+
+def _back_off(limiter: RateLimiter, attempt: int) -> None:
+    """Hold back every caller of ``limiter`` after a bot redirect."""
+    backoff = BACKOFF_BASE * (2**attempt)
+    log.info("Backing off %.0fs", backoff)
+    METRICS.count("fetch.backoff_seconds", backoff)
+    limiter.penalize(backoff)
+
+
+def _log_redirect(resp: httpx.Response, attempt: int) -> str:
+    """Log a bot-detection redirect and return its target location."""
+    METRICS.count("fetch.redirects")
+    location = resp.headers.get("location", "")
+    log.warning(
+        "Bot detection: %d redirect to %s (attempt %d/%d)",
+        resp.status_code,
+        location,
+        attempt + 1,
+        BACKOFF_MAX_RETRIES + 1,
+    )
+    return location
+
+
 class Fetcher:
-    """HTTP client for fetching Yad2 search result pages."""
+    """HTTP client for fetching Yad2 search result pages.
+
+    By default request starts are spaced DELAY_MIN..DELAY_MAX seconds apart;
+    pass a shared RateLimiter to pace several fetchers together. Response
+    latencies and bot redirects are reported back to the limiter, which an
+    AdaptiveRateLimiter uses to tune its rate. With a ResponseCache, fresh
+    hits are served without touching the network or the limiter, and stale
+    entries are revalidated conditionally. ``params`` replaces
+    DEFAULT_SEARCH_PARAMS as the search query. With an IdentityPool, every
+    request goes through the client and limiter of the identity the pool
+    picks instead.
+    """
+
+    def __init__(
+        self,
+        limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        params: dict[str, str] | None = None,
+        identities: IdentityPool | None = None,
+    ) -> None:
+        # httpx (and h2) load here, so replays and --help never import them
+        import httpx
 
-    def __init__(self) -> None:
         self._client = httpx.Client(
             headers=HEADERS,
             http2=True,
             follow_redirects=False,
             timeout=30.0,
         )
-        self._first_request = True
+        # One client per identity, each with its own proxy, headers and cookie jar
+        self._identity_clients = {
+            identity.name: httpx.Client(
+                headers=identity.headers,
+                proxy=identity.proxy,
+                http2=True,
+                follow_redirects=False,
+                timeout=30.0,
+            )
+            for identity in (identities.identities if identities else [])
+        }
+        self.identities = identities
+        self.limiter = limiter or RateLimiter.from_delay_range(DELAY_MIN, DELAY_MAX)
+        _track_limiter(self.limiter)
+        self.cache = cache
+        self.params = params or DEFAULT_SEARCH_PARAMS
+
+    def for_search(self, params: dict[str, str]) -> Fetcher:
+        """View of this fetcher for another search, sharing client, limiter and cache.
+
+        Close only the original; closing a view closes the shared client.
+        """
+        view = copy.copy(self)
+        view.params = params
+        return view
 
     def close(self) -> None:
         self._client.close()
+        for client in self._identity_clients.values():
+            client.close()
 
     def __enter__(self) -> Fetcher:
         return self
@@ -50,42 +165,62 @@ class Fetcher:
     def fetch_page(self, page: int) -> str:
         """Fetch a single search results page, returning the HTML.
 
-        Handles rate limiting (random delay between requests) and
-        bot detection (exponential backoff on 302 redirects).
+        Handles rate limiting (token bucket, so time spent on the previous
+        request counts toward the delay) and bot detection (exponential
+        backoff on 302 redirects).
+        """
+        with METRICS.timer("fetch_page"):
+            return self._fetch_url(_build_url(page, self.params))
+
+    def fetch_detail(self, token: str) -> str:
+        """Fetch one listing's detail page, with the same pacing and bot handling.
+
+        Without a cache or identity pool this may be called from several
+        threads at once, as enrich.py does.
         """
-        # Rate limiting — skip delay before the very first request
-        if not self._first_request:
-            delay = random.uniform(DELAY_MIN, DELAY_MAX)
-            log.debug("Sleeping %.1fs before request", delay)
-            time.sleep(delay)
-        self._first_request = False
-
-        params = {**DEFAULT_SEARCH_PARAMS, "page": str(page)}
-        # Build query string manually so commas in values (e.g. engineType)
-        # stay literal instead of being percent-encoded to %2C by httpx.
-        # Yad2 returns 404 when commas are encoded.
-        url = f"{BASE_URL}?{urlencode(params, safe=',')}"
+        with METRICS.timer("fetch_detail"):
+            return self._fetch_url(DETAIL_URL.format(token=token))
 
+    def _fetch_url(self, url: str) -> str:
+        cached = _cache_lookup(self.cache, url)
+        if cached is not None and cached.fresh:
+            return cached.text
+        headers = cached.conditional_headers() if cached else {}
+
+        identities = self.identities
         for attempt in range(BACKOFF_MAX_RETRIES + 1):
-            log.debug("Fetching page %d (attempt %d)", page, attempt + 1)
-            resp = self._client.get(url)
+            identity = identities.pick() if identities else None
+            client = self._identity_clients[identity.name] if identity else self._client
+            limiter = identity.limiter if identity else self.limiter
+            with METRICS.timer("fetch.sleep"):
+                limiter.acquire()
+            log.debug("Fetching %s (attempt %d)", url, attempt + 1)
+            started = time.perf_counter()
+            resp = client.get(url, headers=headers, extensions={"trace": RequestTrace(METRICS)})
+            latency = time.perf_counter() - started
+            _count_response(resp)
+
+            if identities and identity and resp.status_code in (200, 304):
+                identities.succeeded(identity)
+
+            if resp.status_code == 304 and cached is not None and self.cache is not None:
+                limiter.on_response(latency)
+                self.cache.refresh(url)
+                return cached.text
 
             if resp.status_code == 200:
+                limiter.on_response(latency)
+                _cache_store(self.cache, url, resp)
                 return resp.text
 
-            if resp.status_code in (301, 302, 303, 307, 308):
-                location = resp.headers.get("location", "")
-                log.warning(
-                    "Bot detection: %d redirect to %s (attempt %d/%d)",
-                    resp.status_code,
-                    location,
-                    attempt + 1,
-                    BACKOFF_MAX_RETRIES + 1,
-                )
+            if resp.status_code in REDIRECT_CODES:
+                location = _log_redirect(resp, attempt)
+                limiter.on_block()
+                if identities and identity:
+                    identities.quarantine(identity)  # a retry goes to another identity
                 if attempt < BACKOFF_MAX_RETRIES:
-                    backoff = BACKOFF_BASE * (2**attempt)
-                    log.info("Backing off %.0fs", backoff)
-                    time.sleep(backoff)
+                    if not identity:
+                        _back_off(limiter, attempt)
                     continue
                 raise BotDetectedError(
                     f"Bot detection after {BACKOFF_MAX_RETRIES + 1} attempts "
@@ -97,3 +232,179 @@ class Fetcher:
 
         # Should not reach here, but just in case
         raise BotDetectedError("Exhausted retries")
+
+
+class AsyncFetcher:
+    """Concurrent counterpart of Fetcher built on httpx.AsyncClient.
+
+    At most ``concurrency`` requests are in flight, and request starts are
+    spaced so the whole fetcher stays within ``requests_per_second``
+    (clamped to MAX_REQUESTS_PER_SECOND), unless a RateLimiter is passed in.
+    Cache handling, ``params`` and ``identities`` match Fetcher. A bot
+    redirect on any page pauses every worker for the backoff period, unless
+    it only quarantines one identity.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = MAX_CONCURRENCY,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        limiter: RateLimiter | None = None,
+        cache: ResponseCache | None = None,
+        params: dict[str, str] | None = None,
+        identities: IdentityPool | None = None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        if requests_per_second > MAX_REQUESTS_PER_SECOND:
+            log.warning(
+                "Clamping request rate %.2f/s to the %.2f/s politeness limit",
+                requests_per_second,
+                MAX_REQUESTS_PER_SECOND,
+            )
+            requests_per_second = MAX_REQUESTS_PER_SECOND
+        self.concurrency = concurrency
+        import asyncio
+
+        import httpx
+
+        self._client = httpx.AsyncClient(
+            headers=HEADERS,
+            http2=True,
+            follow_redirects=False,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=concurrency),
+        )
+        self._identity_clients = {
+            identity.name: httpx.AsyncClient(
+                headers=identity.headers,
+                proxy=identity.proxy,
+                http2=True,
+                follow_redirects=False,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=concurrency),
+            )
+            for identity in (identities.identities if identities else [])
+        }
+        self.identities = identities
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = limiter or RateLimiter(requests_per_second)
+        _track_limiter(self.limiter)
+        self.cache = cache
+        self.params = params or DEFAULT_SEARCH_PARAMS
+
+    def for_search(self, params: dict[str, str]) -> AsyncFetcher:
+        """View for another search sharing client, semaphore, limiter and cache."""
+        view = copy.copy(self)
+        view.params = params
+        return view
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        for client in self._identity_clients.values():
+            await client.aclose()
+
+    async def __aenter__(self) -> AsyncFetcher:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    async def fetch_page(self, page: int) -> str:
+        """Fetch a single search results page, returning the HTML.
+
+        Same status handling as Fetcher.fetch_page; the limiter is shared by
+        all workers.
+        """
+        with METRICS.timer("fetch_page"):
+            return await self._fetch_page(page)
+
+    async def _fetch_page(self, page: int) -> str:
+        url = _build_url(page, self.params)
+        cached = _cache_lookup(self.cache, url)
+        if cached is not None and cached.fresh:
+            return cached.text
+        headers = cached.conditional_headers() if cached else {}
+
+        identities = self.identities
+        async with self._semaphore:
+            for attempt in range(BACKOFF_MAX_RETRIES + 1):
+                # pick() and the limiter's reserve run without yielding in between
+                identity = identities.pick() if identities else None
+                client = self._identity_clients[identity.name] if identity else self._client
+                limiter = identity.limiter if identity else self.limiter
+                with METRICS.timer("fetch.sleep"):
+                    await limiter.acquire_async()
+                log.debug("Fetching page %d (attempt %d)", page, attempt + 1)
+                trace = RequestTrace(METRICS).atrace
+                started = time.perf_counter()
+                resp = await client.get(url, headers=headers, extensions={"trace": trace})
+                latency = time.perf_counter() - started
+                _count_response(resp)
+
+                if identities and identity and resp.status_code in (200, 304):
+                    identities.succeeded(identity)
+
+                if resp.status_code == 304 and cached is not None and self.cache is not None:
+                    limiter.on_response(latency)
+                    self.cache.refresh(url)
+                    return cached.text
+
+                if resp.status_code == 200:
+                    limiter.on_response(latency)
+                    _cache_store(self.cache, url, resp)
+                    return resp.text
+
+                if resp.status_code in REDIRECT_CODES:
+                    location = _log_redirect(resp, attempt)
+                    limiter.on_block()
+                    if identities and identity:
+                        identities.quarantine(identity)  # a retry goes to another identity
+                    if attempt < BACKOFF_MAX_RETRIES:
+                        if not identity:
+                            _back_off(limiter, attempt)
+                        continue
+                    raise BotDetectedError(
+                        f"Bot detection after {BACKOFF_MAX_RETRIES + 1} attempts "
+                        f"(last redirect: {location})"
+                    )
+
+                resp.raise_for_status()
+
+        raise BotDetectedError("Exhausted retries")
+
+    async def fetch_pages(self, pages: Iterable[int]) -> AsyncIterator[tuple[int, str]]:
+        """Fetch ``pages`` concurrently, yielding ``(page, html)`` as each completes.
+
+        At most twice ``concurrency`` pages are in flight or waiting to be
+        consumed, so a slow consumer pauses fetching instead of letting
+        bodies pile up. The first failure cancels all outstanding requests
+        and propagates to the caller.
+        """
+        import asyncio
+
+        async def fetch(page: int) -> tuple[int, str]:
+            return page, await self.fetch_page(page)
+
+        queue = iter(pages)
+        window = 2 * self.concurrency
+        tasks: set[asyncio.Task[tuple[int, str]]] = set()
+        done: set[asyncio.Task[tuple[int, str]]] = set()
+        try:
+            while True:
+                for page in queue:
+                    tasks.add(asyncio.create_task(fetch(page)))
+                    if len(tasks) >= window:
+                        break
+                if not tasks:
+                    return
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                while done:
+                    yield done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            # Also collects finished pages never yielded, so their errors aren't reported
+            await asyncio.gather(*tasks, *done, return_exceptions=True)
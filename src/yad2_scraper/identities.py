@@ -0,0 +1,179 @@
+"""Pool of client identities for --identities: own proxy, headers, cookies and rate budget each.
+
+One client with one fingerprint can only go as fast as one visitor may.
+With a pool, each page request goes to the identity that can send
+soonest, so the total rate grows with the pool while every identity keeps
+its own pace. An identity that gets a bot redirect is quarantined and
+the request is retried on another one. Quarantine starts at
+IDENTITY_QUARANTINE and doubles while redirects repeat. The fetchers own
+the HTTP clients (one per identity, so each has its own cookie jar); the
+pool only tracks pacing and health.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+import tomllib
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from yad2_scraper.config import (
+    DELAY_MAX,
+    DELAY_MIN,
+    HEADERS,
+    IDENTITY_QUARANTINE,
+    IDENTITY_QUARANTINE_MAX,
+    MAX_REQUESTS_PER_SECOND,
+)
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.ratelimit import FakeClock, RateLimiter
+
+log = logging.getLogger(__name__)
+
+_IDENTITY_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass
+class Identity:
+    name: str
+    limiter: RateLimiter
+    headers: dict[str, str] = field(default_factory=lambda: dict(HEADERS))
+    proxy: str | None = None
+    strikes: int = 0  # bot redirects since the last success
+    quarantined_until: float = float("-inf")
+    requests: int = 0
+
+
+class IdentityPool:
+    """Schedules requests across identities and quarantines blocked ones.
+
+    ``clock`` may be a FakeClock; the identities' limiters should share it.
+    """
+
+    def __init__(
+        self,
+        identities: list[Identity],
+        quarantine: float = IDENTITY_QUARANTINE,
+        max_quarantine: float = IDENTITY_QUARANTINE_MAX,
+        *,
+        clock: FakeClock | None = None,
+    ) -> None:
+        if not identities:
+            raise ValueError("an identity pool needs at least one identity")
+        self.identities = identities
+        self.quarantine_base = quarantine
+        self.max_quarantine = max_quarantine
+        self._clock: Callable[[], float] = clock or time.monotonic
+        METRICS.gauge("identities.healthy", lambda: len(self.healthy))
+
+    def __len__(self) -> int:
+        return len(self.identities)
+
+    @property
+    def healthy(self) -> list[Identity]:
+        now = self._clock()
+        return [identity for identity in self.identities if identity.quarantined_until <= now]
+
+    def pick(self) -> Identity:
+        """The identity that can send soonest, least used first among equals.
+
+        Quarantine is applied to the identity's limiter, so a quarantined
+        identity is only picked once every identity is quarantined, and
+        then it is the one released first. Call its limiter's acquire (or
+        acquire_async) before yielding to other tasks, so the slot isn't
+        handed out twice.
+        """
+        identity = min(
+            self.identities, key=lambda identity: (identity.limiter.peek(), identity.requests)
+        )
+        identity.requests += 1
+        return identity
+
+    def succeeded(self, identity: Identity) -> None:
+        identity.strikes = 0
+
+    def quarantine(self, identity: Identity) -> float:
+        """Take ``identity`` out of rotation after a bot redirect; returns the seconds."""
+        seconds = min(self.quarantine_base * 2**identity.strikes, self.max_quarantine)
+        identity.strikes += 1
+        identity.quarantined_until = self._clock() + seconds
+        identity.limiter.penalize(seconds)
+        METRICS.count("identities.quarantined")
+        log.warning(
+            "Identity %s quarantined for %.0fs (%d of %d healthy)",
+            identity.name,
+            seconds,
+            len(self.healthy),
+            len(self.identities),
+        )
+        return seconds
+
+
+def _identity_limiter(rate: object, where: str, clock: FakeClock | None) -> RateLimiter:
+    if rate is None:
+        return RateLimiter.from_delay_range(DELAY_MIN, DELAY_MAX, clock=clock)
+    if isinstance(rate, bool) or not isinstance(rate, int | float) or rate <= 0:
+        raise ValueError(f"{where}: rate must be a positive number of requests per second")
+    if rate > MAX_REQUESTS_PER_SECOND:
+        log.warning(
+            "%s: clamping rate %.2f/s to the %.2f/s politeness limit",
+            where,
+            rate,
+            MAX_REQUESTS_PER_SECOND,
+        )
+    return RateLimiter(min(float(rate), MAX_REQUESTS_PER_SECOND), clock=clock)
+
+
+def load_identities(path: Path, *, clock: FakeClock | None = None) -> IdentityPool:
+    """Read an identity pool from a TOML file.
+
+    The file has an ``identities`` table of name -> settings, plus an
+    optional ``defaults`` table merged under every identity. Settings are
+    ``proxy`` (a URL), ``rate`` (requests per second, at most
+    MAX_REQUESTS_PER_SECOND; the DELAY_MIN..DELAY_MAX pace if absent) and
+    a ``headers`` table merged over HEADERS. Raises ValueError if the
+    file can't be parsed or doesn't have that shape.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+        raise ValueError(f"{path}: {e}") from e
+
+    if not isinstance(data.get("identities"), dict) or not data["identities"]:
+        raise ValueError(f"{path}: expected an 'identities' table of named identities")
+    defaults = data.get("defaults", {})
+    if not isinstance(defaults, dict):
+        raise ValueError(f"{path}: 'defaults' must be a table")
+
+    identities = []
+    for name, settings in data["identities"].items():
+        where = f"{path}: identity {name!r}"
+        if not _IDENTITY_NAME_RE.match(name):
+            raise ValueError(f"{where}: name must be letters, digits, _ or -")
+        if not isinstance(settings, dict):
+            raise ValueError(f"{where}: must be a table")
+        merged = {**defaults, **settings}
+        unknown = set(merged) - {"proxy", "rate", "headers"}
+        if unknown:
+            raise ValueError(f"{where}: unknown settings {sorted(unknown)}")
+        proxy = merged.get("proxy")
+        if proxy is not None and not isinstance(proxy, str):
+            raise ValueError(f"{where}: proxy must be a URL string")
+        headers = {}
+        for table in (defaults.get("headers", {}), settings.get("headers", {})):
+            if not isinstance(table, dict) or not all(isinstance(v, str) for v in table.values()):
+                raise ValueError(f"{where}: headers must be a table of strings")
+            headers.update(table)
+        identities.append(
+            Identity(
+                name=name,
+                limiter=_identity_limiter(merged.get("rate"), where, clock),
+                headers={**HEADERS, **headers},
+                proxy=proxy,
+            )
+        )
+    return IdentityPool(identities, clock=clock)
@@ -0,0 +1,86 @@
+"""Incremental scraping: stop paging once the feed only repeats known listings."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Iterable
+from pathlib import Path
+
+from yad2_scraper.changes import fingerprint
+from yad2_scraper.config import INCREMENTAL_STOP_AFTER
+from yad2_scraper.models import CarListing
+
+log = logging.getLogger(__name__)
+
+
+class TokenIndex:
+    """Persisted token -> fingerprint map of every listing seen so far."""
+
+    def __init__(self, path: Path, fingerprints: dict[str, int] | None = None) -> None:
+        self.path = path
+        self.fingerprints = fingerprints or {}
+
+    @classmethod
+    def load(cls, path: Path) -> TokenIndex:
+        """Read the index, or start an empty one if the file doesn't exist yet."""
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return cls(path, {str(k): int(v) for k, v in json.load(f).items()})
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError, AttributeError) as e:
+            raise ValueError(f"Corrupt token index {path}: {e}") from e
+
+    def save(self) -> None:
+        """Write to a temp file in the same directory, then rename over the old one."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+                json.dump(self.fingerprints, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+
+class EarlyStop:
+    """Watch pages of a newest-first feed and say when to stop paging.
+
+    A page is stale when every listing on it is already in the index with
+    the same fingerprint. After ``stop_after`` stale pages in a row the
+    rest of the feed is assumed to be known too. Every listing observed is
+    recorded in the index, stale or not.
+    """
+
+    def __init__(self, index: TokenIndex, stop_after: int = INCREMENTAL_STOP_AFTER) -> None:
+        if stop_after < 1:
+            raise ValueError(f"stop_after must be >= 1, got {stop_after}")
+        self.index = index
+        self.stop_after = stop_after
+        self.stale_streak = 0
+
+    def observe(self, listings: Iterable[CarListing]) -> bool:
+        """Record a page's listings; returns True if the page was stale."""
+        known = self.index.fingerprints
+        stale = True
+        for values in CarListing.rows(listings):
+            if not values[0]:
+                continue  # no token, nothing to recognise it by next time
+            fp = fingerprint(values)
+            if known.get(values[0]) != fp:
+                stale = False
+                known[values[0]] = fp
+        self.stale_streak = self.stale_streak + 1 if stale else 0
+        return stale
+
+    @property
+    def should_stop(self) -> bool:
+        return self.stale_streak >= self.stop_after
@@ -0,0 +1,200 @@
+"""Per-stage timings and counters for a run, with a summary table and JSON dump.
+
+Stages are timed with ``METRICS.timer(name)`` (or fed directly through
+``observe``) and aggregated into fixed-bucket histograms, so a long run
+costs no more memory than a short one. Fetches are further split into
+connect, TTFB, body and rate-limiter sleep via RequestTrace.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from yad2_scraper.config import TIMING_BUCKETS
+
+
+@dataclass
+class Timing:
+    """Histogram of one stage's durations in seconds."""
+
+    count: int = 0
+    total: float = 0.0
+    min: float = math.inf
+    max: float = 0.0
+    # buckets[i] counts observations <= TIMING_BUCKETS[i]; the last is +Inf
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(TIMING_BUCKETS) + 1))
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(TIMING_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def merge(self, other: Timing) -> None:
+        """Add ``other``'s observations to this histogram."""
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets, strict=True)]
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        bounds = [str(bound) for bound in TIMING_BUCKETS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "buckets": dict(zip(bounds, self.buckets, strict=True)),
+        }
+
+
+class Metrics:
+    """Named Timings, counters and gauges for the current run.
+
+    Gauges are callables read whenever the metrics are reported, so they
+    always show live state (e.g. the rate limiter's queue).
+    """
+
+    def __init__(self) -> None:
+        self.timings: dict[str, Timing] = {}
+        self.counters: dict[str, float] = {}
+        self.gauges: dict[str, Callable[[], float]] = {}
+        # Detail-page workers (--enrich) record from their own threads
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.timings or self.counters)
+
+    def reset(self) -> None:
+        self.timings.clear()
+        self.counters.clear()
+        self.gauges.clear()
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                timing = self.timings[name] = Timing()
+            timing.observe(seconds)
+
+    def merge(self, timings: dict[str, Timing]) -> None:
+        """Fold in Timings recorded elsewhere, e.g. by a parse worker process."""
+        with self._lock:
+            for name, other in timings.items():
+                timing = self.timings.get(name)
+                if timing is None:
+                    timing = self.timings[name] = Timing()
+                timing.merge(other)
+
+    def count(self, name: str, n: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Report ``read()`` as ``name``, replacing any earlier gauge of that name."""
+        self.gauges[name] = read
+
+    def gauge_values(self) -> dict[str, float]:
+        # Copied first: an exporter thread may call this while a fetcher registers gauges
+        return {name: read() for name, read in sorted(dict(self.gauges).items())}
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Time the body of a ``with`` block as one observation of ``name``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def summary(self, wall: float | None = None) -> str:
+        """Plain-text table of every stage, slowest total first."""
+        lines = [f"{'stage':<20} {'count':>7} {'total':>9} {'mean':>9} {'max':>9} {'share':>6}"]
+        for name, timing in sorted(self.timings.items(), key=lambda item: -item[1].total):
+            share = f"{timing.total / wall:6.1%}" if wall else f"{'':>6}"
+            lines.append(
+                f"{name:<20} {timing.count:>7} {_seconds(timing.total):>9} "
+                f"{_seconds(timing.mean):>9} {_seconds(timing.max):>9} {share}"
+            )
+        lines.extend(f"{name:<20} {value:>7g}" for name, value in sorted(self.counters.items()))
+        return "\n".join(lines)
+
+    def as_dict(self, wall: float | None = None) -> dict[str, Any]:
+        return {
+            "wall_seconds": wall,
+            "timings": {name: timing.as_dict() for name, timing in sorted(self.timings.items())},
+            "counters": dict(sorted(self.counters.items())),
+            "gauges": self.gauge_values(),
+        }
+
+    def write_json(self, path: Path, wall: float | None = None, **extra: Any) -> None:
+        """Dump the run's metrics (plus any ``extra`` fields) as JSON."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {**extra, **self.as_dict(wall)}
+        # default=str covers Paths and the like in ``extra``
+        path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+
+
+def _seconds(value: float) -> str:
+    return f"{value * 1e3:.1f}ms" if value < 1 else f"{value:.2f}s"
+
+
+class RequestTrace:
+    """httpx ``trace`` extension hook splitting one request into phases.
+
+    Records ``fetch.connect`` (TCP + TLS, only when a new connection is
+    opened), ``fetch.ttfb`` (request sent until response headers) and
+    ``fetch.body``. Use a fresh instance per request: pass the instance
+    itself to httpx.Client and its ``atrace`` to httpx.AsyncClient.
+    """
+
+    def __init__(self, metrics: Metrics) -> None:
+        self.metrics = metrics
+        self._started: dict[str, float] = {}
+        self._connected: float | None = None
+
+    def __call__(self, event: str, info: dict[str, Any]) -> None:
+        now = time.perf_counter()
+        # e.g. "connection.start_tls.complete", "http2.receive_response_body.started"
+        step, _, edge = event.rpartition(".")
+        step = step.rpartition(".")[2]
+        if edge == "started":
+            self._started[step] = now
+            if step == "send_request_headers" and self._connected is not None:
+                connect_start = self._started.pop("connect_tcp", self._connected)
+                self.metrics.observe("fetch.connect", self._connected - connect_start)
+                self._connected = None
+        elif edge != "complete":
+            return  # "failed" events: the exception is reported by the caller
+        elif step in ("connect_tcp", "start_tls"):
+            self._connected = now
+        elif step == "receive_response_headers":
+            ttfb = now - self._started.get("send_request_headers", now)
+            self.metrics.observe("fetch.ttfb", ttfb)
+        elif step == "receive_response_body":
+            self.metrics.observe("fetch.body", now - self._started.get(step, now))
+
+    async def atrace(self, event: str, info: dict[str, Any]) -> None:
+        self(event, info)
+
+
+METRICS = Metrics()
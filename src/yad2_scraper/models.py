@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
+import operator
+import sys
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass, fields
-from typing import Any
+from typing import Any, get_args, get_type_hints
 
 
-@dataclass
+@dataclass(slots=True)
 class CarListing:
+    """One search result.
+
+    Slotted, with numeric fields as ints and repeated category strings
+    (makes, models, areas, ids) interned, so large in-memory sets of
+    listings stay compact. Missing numbers are None and export as "".
+    """
+
     token: str = ""
     order_id: str = ""
     ad_type: str = ""  # "commercial" or "private"
@@ -18,13 +28,13 @@ class CarListing:
     model_id: str = ""
     sub_model: str = ""
     sub_model_id: str = ""
-    year: str = ""
+    year: int | None = None
     engine_type: str = ""
     engine_type_id: str = ""
-    engine_volume_cc: str = ""
+    engine_volume_cc: int | None = None
     hand: str = ""
-    hand_number: str = ""
-    price: str = ""
+    hand_number: int | None = None
+    price: int | None = None
     advance_payment: str = ""
     monthly_payment: str = ""
     number_of_payments: str = ""
@@ -42,90 +52,236 @@ class CarListing:
 
     @classmethod
     def csv_header(cls) -> list[str]:
-        return [f.name for f in fields(cls)]
+        return list(_FIELD_NAMES)
 
     def csv_row(self) -> list[str]:
-        return [str(getattr(self, f.name)) for f in fields(self)]
+        return ["" if value is None else str(value) for value in _field_values(self)]
+
+    @staticmethod
+    def rows(listings: Iterable[CarListing]) -> Iterator[tuple[Any, ...]]:
+        """Field values of each listing in header order, for csv.writer.writerows.
+
+        Values are left as-is: csv.writer writes None as an empty cell and
+        stringifies numbers itself, so no per-row list is built here.
+        """
+        return map(_field_values, listings)
 
     @classmethod
     def from_raw(cls, raw: dict[str, Any], ad_type: str) -> CarListing:
-        """Build a CarListing from a raw Yad2 feed item."""
-
-        def g(*keys: str) -> str:
-            """Walk nested keys, return stringified value or empty string."""
-            obj: Any = raw
-            for k in keys:
-                if isinstance(obj, dict):
-                    obj = obj.get(k)
-                else:
-                    return ""
-            return str(obj) if obj is not None else ""
-
-        def nested_text(key: str) -> str:
-            """Extract 'text' from a nested dict field, or stringify scalars."""
-            val = raw.get(key)
-            if isinstance(val, dict):
-                return str(val.get("text", "")) if val.get("text") is not None else ""
-            return str(val) if val is not None else ""
-
-        def nested_id(key: str) -> str:
-            """Extract 'id' from a nested dict field."""
-            val = raw.get(key)
-            if isinstance(val, dict):
-                return str(val.get("id", "")) if val.get("id") is not None else ""
-            return ""
-
-        # Payment info lives under metaData.financingInfo
-        fin = raw.get("metaData", {}).get("financingInfo") or {}
-
-        # Tags list -> comma-separated string (use 'name' field, fall back to 'text')
-        tags_list = raw.get("tags") or []
-        tags_str = ", ".join(
-            str(t.get("name", t.get("text", t))) if isinstance(t, dict) else str(t)
-            for t in tags_list
-        )
+        """Build a CarListing from a raw Yad2 feed item (see FIELD_SPEC)."""
+        return _extract(cls, raw, ad_type)
 
-        # Images from metaData
-        metadata = raw.get("metaData") or {}
-        images = metadata.get("images") or []
-        cover_url = str(metadata.get("coverImage", "")) if metadata.get("coverImage") else ""
 
-        # Commitments
-        commitments_list = metadata.get("commitments") or []
-        commitments_str = ", ".join(
-            str(c.get("text", c)) if isinstance(c, dict) else str(c) for c in commitments_list
-        )
+# Resolved once: csv_row and rows() run for every listing written
+_FIELD_NAMES = tuple(f.name for f in fields(CarListing))
+_field_values = operator.attrgetter(*_FIELD_NAMES)
+
+
+def int_fields(cls: type) -> frozenset[str]:
+    """Names of a dataclass's integer fields (``int``, ``int | None``, ``Optional[int]``).
+
+    Annotations are resolved with get_type_hints, so string annotations
+    from ``from __future__ import annotations`` compare the same as real ones.
+    """
+    hints = get_type_hints(cls)
+    return frozenset(
+        f.name for f in fields(cls) if hints[f.name] is int or int in get_args(hints[f.name])
+    )
+
+
+# Typed as integer columns by the Parquet and SQLite writers
+INT_FIELDS = int_fields(CarListing)
+
+
+@dataclass(frozen=True)
+class Text:
+    """A ``{"id": ..., "text": ...}`` field; a bare scalar is used as the text."""
+
+    key: str
+
+
+@dataclass(frozen=True)
+class Apply:
+    """Run ``func`` on the value at key path ``path`` (None if it's missing)."""
+
+    func: Callable[[Any], Any]
+    path: tuple[str, ...]
+
+
+def _join(items: Any, *names: str) -> str:
+    """Comma-join a list of dicts by the first present name (or the item itself)."""
+    out = []
+    for item in items or ():
+        if isinstance(item, dict):
+            value = item
+            for name in reversed(names):
+                value = item.get(name, value)
+            out.append(str(value))
+        else:
+            out.append(str(item))
+    return ", ".join(out)
+
+
+def _to_int(value: Any) -> int | None:
+    """Whole number from an int or numeric string; None if missing or malformed."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 
-        return cls(
-            token=g("token"),
-            order_id=g("orderId"),
-            ad_type=ad_type,
-            listing_source=g("listingSource"),
-            manufacturer=nested_text("manufacturer"),
-            manufacturer_id=nested_id("manufacturer"),
-            model=nested_text("model"),
-            model_id=nested_id("model"),
-            sub_model=nested_text("subModel"),
-            sub_model_id=nested_id("subModel"),
-            year=g("vehicleDates", "yearOfProduction"),
-            engine_type=nested_text("engineType"),
-            engine_type_id=nested_id("engineType"),
-            engine_volume_cc=g("engineVolume"),
-            hand=nested_text("hand"),
-            hand_number=g("handNumber"),
-            price=g("price"),
-            advance_payment=str(fin.get("advancePayment", "")) if fin else "",
-            monthly_payment=str(fin.get("monthlyPayment", "")) if fin else "",
-            number_of_payments=str(fin.get("numberOfPayments", "")) if fin else "",
-            balance=str(fin.get("balance", "")) if fin else "",
-            area=g("address", "area", "text"),
-            area_id=g("address", "area", "id"),
-            image_count=str(len(images)),
-            cover_image_url=cover_url,
-            tags=tags_str,
-            agency_name=g("customer", "agencyName"),
-            agency_customer_id=g("customer", "id"),
-            commitments=commitments_str,
-            has_trade_in=g("packages", "isTradeInButton"),
-            priority=g("priority"),
+def _count(items: Any) -> str:
+    return str(len(items or ()))
+
+
+def _truthy_str(value: Any) -> str:
+    return str(value) if value else ""
+
+
+def _tags(tags: Any) -> str:
+    # Use 'name', fall back to 'text'
+    return _join(tags, "name", "text")
+
+
+def _commitments(commitments: Any) -> str:
+    return _join(commitments, "text")
+
+
+Source = tuple[str, ...] | Text | Apply
+
+# Where each CarListing field comes from in a raw feed item:
+#   tuple - key path into nested dicts; missing/None/non-dict along the way -> ""
+#   Text  - nested text of a {"id", "text"} dict (ids are just ("key", "id") paths)
+#   Apply - a function of the value at a key path, for numbers, lists and other reshaping
+# ad_type isn't in the item; it is passed to from_raw. Adding a field to the
+# dataclass only needs an entry here.
+FIELD_SPEC: dict[str, Source] = {
+    "token": ("token",),
+    "order_id": ("orderId",),
+    "listing_source": ("listingSource",),
+    "manufacturer": Text("manufacturer"),
+    "manufacturer_id": ("manufacturer", "id"),
+    "model": Text("model"),
+    "model_id": ("model", "id"),
+    "sub_model": Text("subModel"),
+    "sub_model_id": ("subModel", "id"),
+    "year": Apply(_to_int, ("vehicleDates", "yearOfProduction")),
+    "engine_type": Text("engineType"),
+    "engine_type_id": ("engineType", "id"),
+    "engine_volume_cc": Apply(_to_int, ("engineVolume",)),
+    "hand": Text("hand"),
+    "hand_number": Apply(_to_int, ("handNumber",)),
+    "price": Apply(_to_int, ("price",)),
+    "advance_payment": ("metaData", "financingInfo", "advancePayment"),
+    "monthly_payment": ("metaData", "financingInfo", "monthlyPayment"),
+    "number_of_payments": ("metaData", "financingInfo", "numberOfPayments"),
+    "balance": ("metaData", "financingInfo", "balance"),
+    "area": ("address", "area", "text"),
+    "area_id": ("address", "area", "id"),
+    "image_count": Apply(_count, ("metaData", "images")),
+    "cover_image_url": Apply(_truthy_str, ("metaData", "coverImage")),
+    "tags": Apply(_tags, ("tags",)),
+    "agency_name": ("customer", "agencyName"),
+    "agency_customer_id": ("customer", "id"),
+    "commitments": Apply(_commitments, ("metaData", "commitments")),
+    "has_trade_in": ("packages", "isTradeInButton"),
+    "priority": ("priority",),
+}
+
+# Fields the search feed leaves empty (known issue #12) but a listing's own
+# detail page fills in; --enrich fetches them from there
+DETAIL_FIELDS = (
+    "listing_source",
+    "advance_payment",
+    "monthly_payment",
+    "number_of_payments",
+    "balance",
+    "commitments",
+)
+
+# Low-cardinality strings repeated across most listings; interning them lets
+# every listing share one copy.
+INTERNED_FIELDS = frozenset(
+    {
+        "ad_type",
+        "listing_source",
+        "manufacturer",
+        "manufacturer_id",
+        "model",
+        "model_id",
+        "sub_model",
+        "sub_model_id",
+        "engine_type",
+        "engine_type_id",
+        "hand",
+        "area",
+        "area_id",
+        "agency_name",
+        "has_trade_in",
+    }
+)
+
+
+def compile_extractor(
+    spec: dict[str, Source], field_names: list[str], interned: frozenset[str] = frozenset()
+) -> Callable[..., Any]:
+    """Turn a field spec into one straight-line ``(cls, raw, ad_type)`` function.
+
+    Every shared key prefix (e.g. ``metaData`` -> ``financingInfo``) is looked
+    up once per item and the constructor is called positionally, so building
+    a listing costs a couple of dict lookups per field and no per-call setup.
+    Fields named in ``interned`` are passed through ``sys.intern``.
+    """
+    missing = set(field_names) - set(spec) - {"ad_type"}
+    unknown = set(spec) - set(field_names)
+    if missing or unknown:
+        raise ValueError(
+            f"Field spec mismatch: missing {sorted(missing)}, unknown {sorted(unknown)}"
         )
+
+    env: dict[str, Any] = {"str": str, "dict": dict, "intern": sys.intern}
+    lines: list[str] = []
+    nodes: dict[tuple[str, ...], str] = {(): "raw"}
+
+    def node(path: tuple[str, ...]) -> str:
+        """Local variable holding the value at ``path`` (None if unreachable)."""
+        if path not in nodes:
+            parent = node(path[:-1])
+            var = f"n{len(nodes)}"
+            if parent == "raw":
+                lines.append(f"{var} = raw.get({path[-1]!r})")
+            else:
+                lines.append(
+                    f"{var} = {parent}.get({path[-1]!r}) if {parent}.__class__ is dict else None"
+                )
+            nodes[path] = var
+        return nodes[path]
+
+    def as_str(var: str) -> str:
+        return f'("" if {var} is None else {var} if {var}.__class__ is str else str({var}))'
+
+    args = []
+    for name in field_names:
+        source = spec.get(name)
+        if source is None:  # ad_type
+            args.append("ad_type")
+        elif isinstance(source, Text):
+            obj, text = node((source.key,)), node((source.key, "text"))
+            args.append(f"({as_str(text)} if {obj}.__class__ is dict else {as_str(obj)})")
+        elif isinstance(source, Apply):
+            env[f"f_{name}"] = source.func
+            args.append(f"f_{name}({node(source.path)})")
+        else:
+            args.append(as_str(node(source)))
+        if name in interned:
+            args[-1] = f"intern({args[-1]})"
+
+    body = "\n    ".join([*lines, f"return cls({', '.join(args)})"])
+    namespace: dict[str, Any] = {}
+    exec(f"def extract(cls, raw, ad_type):\n    {body}\n", env, namespace)
+    return namespace["extract"]
+
+
+_extract = compile_extractor(FIELD_SPEC, [f.name for f in fields(CarListing)], INTERNED_FIELDS)
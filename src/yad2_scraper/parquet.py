@@ -0,0 +1,105 @@
+"""Columnar Parquet export; needs the optional ``pyarrow`` dependency."""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable
+from dataclasses import fields
+from pathlib import Path
+from typing import Any
+
+from yad2_scraper.config import PARQUET_ROW_GROUP_SIZE
+from yad2_scraper.exporter import default_output_path
+from yad2_scraper.models import INT_FIELDS, INTERNED_FIELDS, CarListing
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError as e:  # pragma: no cover - depends on the environment
+    raise ImportError("Parquet output needs pyarrow: pip install 'yad2-scraper[parquet]'") from e
+
+log = logging.getLogger(__name__)
+
+
+def listing_schema() -> Any:
+    """Arrow schema for CarListing: ints stay int64, categories are dictionaries."""
+    columns = []
+    for f in fields(CarListing):
+        if f.name in INT_FIELDS:
+            arrow_type = pa.int64()
+        elif f.name in INTERNED_FIELDS:
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        else:
+            arrow_type = pa.string()
+        columns.append(pa.field(f.name, arrow_type))
+    return pa.schema(columns)
+
+
+class ParquetWriter:
+    """Parquet sink writing typed columns one row group at a time.
+
+    Listings are buffered until ``row_group_size`` of them are queued, so
+    memory is bounded by one row group. Unlike CSV, a Parquet file is only
+    readable once close() has written its footer.
+    """
+
+    def __init__(
+        self, path: Path | None = None, row_group_size: int = PARQUET_ROW_GROUP_SIZE
+    ) -> None:
+        if row_group_size < 1:
+            raise ValueError(f"row_group_size must be >= 1, got {row_group_size}")
+        self.path = path or default_output_path(".parquet")
+        self.row_group_size = row_group_size
+        self.written = 0
+        self.schema = listing_schema()
+        self._rows: list[tuple[Any, ...]] = []
+        self._writer: Any = None
+
+    def open(self) -> Path:
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(
+                self.path,
+                self.schema,
+                compression="zstd",
+                use_dictionary=sorted(INTERNED_FIELDS),
+            )
+        return self.path
+
+    def write(self, listings: Iterable[CarListing]) -> int:
+        """Queue ``listings``, writing full row groups; returns the number queued."""
+        before = len(self._rows)
+        self._rows.extend(CarListing.rows(listings))
+        count = len(self._rows) - before
+        self.written += count
+        while len(self._rows) >= self.row_group_size:
+            self._write_group(self._rows[: self.row_group_size])
+            del self._rows[: self.row_group_size]
+        return count
+
+    def flush(self) -> None:
+        """Write whatever is buffered as a (possibly short) row group."""
+        if self._rows:
+            self._write_group(self._rows)
+            self._rows = []
+
+    def _write_group(self, rows: list[tuple[Any, ...]]) -> None:
+        self.open()
+        columns = [
+            pa.array(column, type=field.type)
+            for column, field in zip(zip(*rows, strict=True), self.schema, strict=True)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(columns, schema=self.schema))
+        log.debug("Wrote Parquet row group of %d listings", len(rows))
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> ParquetWriter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
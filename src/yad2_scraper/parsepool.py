@@ -0,0 +1,97 @@
+"""Optional parse stage that decodes page bodies off the event loop.
+
+JSON decoding and CarListing construction hold the GIL, so under concurrent
+fetching they compete with the network loop. A ParsePool runs them in worker
+processes (or threads on a free-threaded build, where threads parallelise)
+and ships results back as plain row tuples, which pickle far more cheaply
+than dataclass instances. Worker processes send their parse.* timings back
+with each page, to be merged into the parent's METRICS.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import fields
+from typing import Any
+
+from yad2_scraper.metrics import METRICS, Timing
+from yad2_scraper.models import INTERNED_FIELDS, CarListing
+from yad2_scraper.parser import PageResult, parse_listings
+
+# (total_pages, total_results, listing rows in CarListing field order)
+CompactPage = tuple[int, int, list[tuple[Any, ...]]]
+
+# Row positions of INTERNED_FIELDS; unpickled strings are fresh copies
+_INTERNED_INDEXES = tuple(i for i, f in enumerate(fields(CarListing)) if f.name in INTERNED_FIELDS)
+
+
+def parse_compact(html: str | bytes) -> CompactPage:
+    """Worker-side parse; raises ValueError like parse_listings."""
+    result = parse_listings(html)
+    return result.total_pages, result.total_results, list(CarListing.rows(result.listings))
+
+
+def parse_compact_timed(html: str | bytes) -> tuple[CompactPage, dict[str, Timing]]:
+    """parse_compact in a worker process, returning the timings it recorded there."""
+    METRICS.reset()  # the worker's own METRICS (a forked copy of the parent's, at first)
+    return parse_compact(html), dict(METRICS.timings)
+
+
+def _listing(row: tuple[Any, ...]) -> CarListing:
+    values = list(row)
+    for i in _INTERNED_INDEXES:
+        values[i] = sys.intern(values[i])
+    return CarListing(*values)
+
+
+def expand(page: CompactPage) -> PageResult:
+    """Rebuild the PageResult a worker flattened with parse_compact."""
+    total_pages, total_results, rows = page
+    return PageResult([_listing(row) for row in rows], total_pages, total_results)
+
+
+def free_threaded() -> bool:
+    """True on a free-threaded interpreter running with the GIL disabled."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+class ParsePool:
+    """A pool of ``workers`` parsers with room for ``max_pending`` queued pages.
+
+    The pipeline stops pulling fetched pages while ``max_pending`` are
+    waiting to be parsed, which in turn stalls the fetcher.
+    """
+
+    def __init__(self, workers: int, max_pending: int | None = None) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.max_pending = max_pending or 2 * workers
+        # Threads record into this process's METRICS themselves
+        self._threads = free_threaded()
+        self._executor: Executor = (
+            ThreadPoolExecutor(workers, thread_name_prefix="yad2-parse")
+            if self._threads
+            else ProcessPoolExecutor(workers)
+        )
+
+    async def parse(self, html: str | bytes) -> PageResult:
+        """Parse one page in the pool; raises ValueError if it can't be parsed."""
+        loop = asyncio.get_running_loop()
+        if self._threads:
+            return expand(await loop.run_in_executor(self._executor, parse_compact, html))
+        page, timings = await loop.run_in_executor(self._executor, parse_compact_timed, html)
+        METRICS.merge(timings)
+        return expand(page)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> ParsePool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
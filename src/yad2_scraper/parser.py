@@ -2,17 +2,25 @@
 
 from __future__ import annotations
 
-import json
 import logging
+import re
 from dataclasses import dataclass
 from typing import Any
 
-from bs4 import BeautifulSoup
-
-from yad2_scraper.models import CarListing
+from yad2_scraper.config import FEED_AD_TYPES
+from yad2_scraper.decoding import SchemaMismatchError, get_backend
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.models import DETAIL_FIELDS, CarListing
 
 log = logging.getLogger(__name__)
 
+# Opening tag of the __NEXT_DATA__ script, in any attribute order and quoting.
+# Anything this misses (e.g. a ">" inside an earlier attribute value) falls
+# through to the BeautifulSoup path.
+_NEXT_DATA_OPEN = r"""<script\b[^>]*?\sid\s*=\s*(["']?)__NEXT_DATA__\1(?=[\s/>])[^>]*>"""
+_NEXT_DATA_RE = re.compile(_NEXT_DATA_OPEN, re.IGNORECASE)
+_NEXT_DATA_RE_BYTES = re.compile(_NEXT_DATA_OPEN.encode(), re.IGNORECASE)
+
 
 @dataclass
 class PageResult:
@@ -23,16 +31,57 @@ class PageResult:
     total_results: int
 
 
-def extract_next_data(html: str) -> dict[str, Any]:
-    """Pull the __NEXT_DATA__ JSON blob from the page HTML.
+def _scan_next_data(html: str | bytes) -> str | bytes | None:
+    """Locate the __NEXT_DATA__ script body by scanning the raw text.
 
-    Returns the parsed dict, or raises ValueError if not found.
+    Returns just the JSON slice, or None when the tag can't be found this way.
+    Next.js escapes "</" inside the blob, so the first closing tag ends it.
     """
+    if isinstance(html, bytes):
+        match_b = _NEXT_DATA_RE_BYTES.search(html)
+        if match_b is None:
+            return None
+        start, end = match_b.end(), html.find(b"</script", match_b.end())
+    else:
+        match_s = _NEXT_DATA_RE.search(html)
+        if match_s is None:
+            return None
+        start, end = match_s.end(), html.find("</script", match_s.end())
+    if end < 0:
+        return None
+    blob = html[start:end]
+    return blob if blob.strip() else None
+
+
+def _extract_with_soup(html: str | bytes) -> dict[str, Any]:
+    """Slow path: build the full DOM with BeautifulSoup and find the script tag."""
+    # Imported here: the fast scan handles almost every page, and bs4 is slow to import
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
     script = soup.find("script", id="__NEXT_DATA__")
     if script is None or not hasattr(script, "string") or not script.string:
         raise ValueError("__NEXT_DATA__ script tag not found — possible bot challenge page")
-    return json.loads(script.string)
+    return get_backend().loads(str(script.string))
+
+
+def extract_next_data(html: str | bytes) -> dict[str, Any]:
+    """Pull the __NEXT_DATA__ JSON blob from the page HTML.
+
+    Tries a regex scan first and only hands the script body to the JSON
+    decoder; falls back to a full BeautifulSoup parse if the scan misses or
+    its slice doesn't decode (e.g. a commented-out copy of the tag comes
+    first). Returns the parsed dict, or raises ValueError if not found.
+    """
+    blob = _scan_next_data(html)
+    if blob is None:
+        log.debug("Fast __NEXT_DATA__ scan missed — falling back to BeautifulSoup")
+        return _extract_with_soup(html)
+    try:
+        return get_backend().loads(blob)
+    except ValueError as e:
+        log.debug("Fast __NEXT_DATA__ slice didn't decode (%s) — falling back to BeautifulSoup", e)
+        return _extract_with_soup(html)
 
 
 def _find_feed_query(queries: list[dict[str, Any]]) -> dict[str, Any] | None:
@@ -44,21 +93,66 @@ def _find_feed_query(queries: list[dict[str, Any]]) -> dict[str, Any] | None:
     return None
 
 
-def parse_listings(html: str) -> PageResult:
-    """Parse all car listings and pagination info from a search results page."""
-    data = extract_next_data(html)
-
+def _feed_state_data(data: dict[str, Any]) -> dict[str, Any] | None:
+    """The feed query's state.data from a fully decoded __NEXT_DATA__ tree."""
     queries = (
         data.get("props", {}).get("pageProps", {}).get("dehydratedState", {}).get("queries", [])
     )
-
     feed_query = _find_feed_query(queries)
     if feed_query is None:
+        return None
+    return feed_query.get("state", {}).get("data", {})
+
+
+def extract_feed_data(html: str | bytes) -> dict[str, Any] | None:
+    """Decode just the feed query's data (None if the page has no feed query).
+
+    Backends with a typed decoder skip the rest of the blob; otherwise, or
+    when the blob isn't shaped as expected, the full tree is decoded and walked.
+    """
+    blob = _scan_next_data(html)
+    backend = get_backend()
+    if blob is not None and backend.loads_feed is not None:
+        try:
+            return backend.loads_feed(blob)
+        except (SchemaMismatchError, ValueError) as e:
+            log.debug("Typed __NEXT_DATA__ decode failed (%s) — decoding the full tree", e)
+    return _feed_state_data(extract_next_data(html))
+
+
+def parse_detail(html: str | bytes, token: str) -> dict[str, str]:
+    """The non-empty DETAIL_FIELDS of listing ``token``, from its detail page.
+
+    The detail page embeds the listing in the same shape as a feed item, so
+    it goes through the same field mapping. Raises ValueError if the page
+    has no data for that token.
+    """
+    data = extract_next_data(html)
+    queries = (
+        data.get("props", {}).get("pageProps", {}).get("dehydratedState", {}).get("queries", [])
+    )
+    for query in queries:
+        item = query.get("state", {}).get("data") if isinstance(query, dict) else None
+        if isinstance(item, dict) and item.get("token") == token:
+            listing = CarListing.from_raw(item, "")
+            fields = {name: getattr(listing, name) for name in DETAIL_FIELDS}
+            return {name: value for name, value in fields.items() if value}
+    raise ValueError(f"no data for listing {token} on its detail page")
+
+
+def parse_listings(html: str | bytes) -> PageResult:
+    """Parse all car listings and pagination info from a search results page."""
+    with METRICS.timer("parse_listings"):
+        return _parse_listings(html)
+
+
+def _parse_listings(html: str | bytes) -> PageResult:
+    with METRICS.timer("parse.decode"):
+        state_data = extract_feed_data(html)
+    if state_data is None:
         log.warning("No 'feed' query found in dehydratedState — page may be empty")
         return PageResult(listings=[], total_pages=0, total_results=0)
 
-    state_data = feed_query.get("state", {}).get("data", {})
-
     # Pagination
     pagination = state_data.get("pagination", {})
     total_pages = int(pagination.get("pages", 0))
@@ -67,16 +161,17 @@ def parse_listings(html: str) -> PageResult:
     # Listings from both commercial and private arrays
     listings: list[CarListing] = []
 
-    for ad_type in ("commercial", "private", "platinum", "boost", "solo"):
-        raw_items = state_data.get(ad_type, [])
-        for item in raw_items:
-            if not isinstance(item, dict) or not item.get("token"):
-                continue
-            try:
-                listings.append(CarListing.from_raw(item, ad_type))
-            except Exception:
-                token = item.get("token", "?")
-                log.warning("Failed to parse %s listing %s", ad_type, token, exc_info=True)
+    with METRICS.timer("parse.from_raw"):
+        for ad_type in FEED_AD_TYPES:
+            raw_items = state_data.get(ad_type, [])
+            for item in raw_items:
+                if not isinstance(item, dict) or not item.get("token"):
+                    continue
+                try:
+                    listings.append(CarListing.from_raw(item, ad_type))
+                except Exception:
+                    token = item.get("token", "?")
+                    log.warning("Failed to parse %s listing %s", ad_type, token, exc_info=True)
 
     log.debug(
         "Parsed %d listings (total_pages=%d, total_results=%d)",
@@ -0,0 +1,149 @@
+"""Split one large search into sub-queries small enough to page through quickly.
+
+Page 1 of a search reports ``pagination.total``. While that is above the
+target, the ``year`` range is halved (then, once it is a single year, the
+``price`` range), and each half is probed in turn. The leaves together
+cover exactly the original search, so scraping all of them through one
+deduper yields the same listings as the original query.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from yad2_scraper.config import PARTITION_MAX_RESULTS, PARTITION_MIN_PRICE_STEP
+from yad2_scraper.exporter import ListingWriter, TokenDeduper
+from yad2_scraper.fetcher import AsyncFetcher, Fetcher
+from yad2_scraper.parsepool import ParsePool
+from yad2_scraper.parser import parse_listings
+from yad2_scraper.pipeline import Pipeline, run_concurrent, run_sequential
+
+log = logging.getLogger(__name__)
+
+# Range params in the order they are split, with the narrowest range worth splitting
+SPLIT_PARAMS = (("year", 1), ("price", PARTITION_MIN_PRICE_STEP))
+
+
+@dataclass
+class Partition:
+    """A leaf sub-query, with its already fetched first page."""
+
+    params: dict[str, str]
+    total_results: int
+    first_page: str
+
+
+def parse_range(value: str) -> tuple[int, int] | None:
+    """``"2020-2023"`` -> ``(2020, 2023)``; None for anything else."""
+    low, sep, high = value.partition("-")
+    if not sep or not low.isdigit() or not high.isdigit() or int(low) > int(high):
+        return None
+    return int(low), int(high)
+
+
+def split_params(params: dict[str, str]) -> tuple[dict[str, str], dict[str, str]] | None:
+    """Halve the first splittable range in ``params``, or None if none is left."""
+    for key, min_width in SPLIT_PARAMS:
+        bounds = parse_range(params.get(key, ""))
+        if bounds is None or bounds[1] - bounds[0] < min_width:
+            continue
+        low, high = bounds
+        mid = (low + high) // 2
+        return {**params, key: f"{low}-{mid}"}, {**params, key: f"{mid + 1}-{high}"}
+    return None
+
+
+def _describe(params: dict[str, str]) -> str:
+    return ", ".join(f"{key}={params[key]}" for key, _ in SPLIT_PARAMS if key in params)
+
+
+def _plan_step(
+    params: dict[str, str], html: str, max_results: int
+) -> tuple[list[Partition], tuple[dict[str, str], dict[str, str]] | None]:
+    """Turn one probed page into a leaf, nothing (no results), or two halves to probe.
+
+    Raises ValueError if the page can't be parsed.
+    """
+    result = parse_listings(html)
+    if not result.listings:
+        log.debug("Partition %s: no results", _describe(params))
+        return [], None
+    halves = split_params(params) if result.total_results > max_results else None
+    if halves is not None:
+        log.info("Partition %s: %d results — splitting", _describe(params), result.total_results)
+        return [], halves
+    if result.total_results > max_results:
+        log.warning(
+            "Partition %s: %d results but no range left to split",
+            _describe(params),
+            result.total_results,
+        )
+    return [Partition(params, result.total_results, html)], None
+
+
+def plan_partitions(
+    fetcher: Fetcher, params: dict[str, str], max_results: int = PARTITION_MAX_RESULTS
+) -> list[Partition]:
+    """Probe page 1 of ``params`` and its halves until every leaf is small enough.
+
+    Raises BotDetectedError or ValueError (unparseable page) from the probes.
+    """
+    leaves, halves = _plan_step(params, fetcher.for_search(params).fetch_page(1), max_results)
+    if halves is None:
+        return leaves
+    return [leaf for half in halves for leaf in plan_partitions(fetcher, half, max_results)]
+
+
+async def plan_partitions_async(
+    fetcher: AsyncFetcher, params: dict[str, str], max_results: int = PARTITION_MAX_RESULTS
+) -> list[Partition]:
+    """Like plan_partitions, probing both halves of every split concurrently."""
+    html = await fetcher.for_search(params).fetch_page(1)
+    leaves, halves = _plan_step(params, html, max_results)
+    if halves is None:
+        return leaves
+    first, second = await asyncio.gather(
+        *(plan_partitions_async(fetcher, half, max_results) for half in halves)
+    )
+    return first + second
+
+
+def _pipelines(partitions: list[Partition], sink: ListingWriter) -> list[Pipeline]:
+    # One pipeline per sub-query (each has its own page count), one shared deduper
+    deduper = TokenDeduper()
+    pipelines = []
+    for partition in partitions:
+        pipeline = Pipeline(sink, deduper=deduper)
+        pipeline.process(1, partition.first_page)
+        pipelines.append(pipeline)
+    return pipelines
+
+
+def run_partitions(
+    fetcher: Fetcher, partitions: list[Partition], sink: ListingWriter
+) -> list[Pipeline]:
+    """Scrape every sub-query into ``sink`` in turn; page 1 is reused from planning."""
+    pipelines = _pipelines(partitions, sink)
+    for partition, pipeline in zip(partitions, pipelines, strict=True):
+        log.info("Scraping partition %s", _describe(partition.params))
+        run_sequential(fetcher.for_search(partition.params), pipeline)
+    return pipelines
+
+
+async def run_partitions_concurrent(
+    fetcher: AsyncFetcher,
+    partitions: list[Partition],
+    sink: ListingWriter,
+    parse_pool: ParsePool | None = None,
+) -> list[Pipeline]:
+    """Scrape every sub-query at once; the fetcher's limiter paces them all."""
+    pipelines = _pipelines(partitions, sink)
+    await asyncio.gather(
+        *(
+            run_concurrent(fetcher.for_search(partition.params), pipeline, parse_pool=parse_pool)
+            for partition, pipeline in zip(partitions, pipelines, strict=True)
+        )
+    )
+    return pipelines
@@ -0,0 +1,324 @@
+"""Streaming fetch → parse → dedupe → write pipeline.
+
+Each page is parsed, deduplicated against every token seen so far and
+written straight to the sink, so memory is bounded by a single page and
+the output on disk is always complete up to the last processed page.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from yad2_scraper.archive import PageArchive
+from yad2_scraper.checkpoint import Checkpoint
+from yad2_scraper.exporter import ListingWriter, TokenDeduper
+from yad2_scraper.fetcher import AsyncFetcher, BotDetectedError, Fetcher
+from yad2_scraper.incremental import EarlyStop
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.parser import PageResult, parse_listings
+
+if TYPE_CHECKING:
+    from yad2_scraper.enrich import Enricher
+    from yad2_scraper.parsepool import ParsePool
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class ScrapeStats:
+    """Running totals for one scrape."""
+
+    pages: int = 0
+    listings: int = 0  # unique listings written
+    duplicates: int = 0
+    total_pages: int | None = None
+    total_results: int = 0
+
+
+class Pipeline:
+    """Parse, dedupe and write search result pages one at a time.
+
+    With a checkpoint, the seen-token set and page count are restored from
+    it and it is saved after every page, once that page's rows are on disk.
+    With a recorder, every raw body is archived before it is parsed. With
+    an EarlyStop, each page's listings are checked against the token index.
+    With an Enricher, new listings get their detail-page fields before
+    they are written.
+    """
+
+    def __init__(
+        self,
+        sink: ListingWriter,
+        deduper: TokenDeduper | None = None,
+        checkpoint: Checkpoint | None = None,
+        recorder: PageArchive | None = None,
+        early_stop: EarlyStop | None = None,
+        enricher: Enricher | None = None,
+    ) -> None:
+        self.sink = sink
+        self.deduper = deduper or TokenDeduper()
+        self.stats = ScrapeStats()
+        self.checkpoint = checkpoint
+        self.recorder = recorder
+        self.early_stop = early_stop
+        self.enricher = enricher
+        self.processed: set[int] = set()
+        if checkpoint is not None:
+            self.deduper.seen |= checkpoint.seen_tokens
+            checkpoint.seen_tokens = self.deduper.seen
+            self.stats.total_pages = checkpoint.total_pages
+
+    @property
+    def complete(self) -> bool:
+        """True once this run itself has processed every page of the search."""
+        total = self.stats.total_pages
+        return total is not None and self.processed.issuperset(range(1, total + 1))
+
+    @property
+    def stale_streak(self) -> int:
+        """Consecutive pages with nothing new or changed (incremental runs only)."""
+        return self.early_stop.stale_streak if self.early_stop else 0
+
+    @property
+    def should_stop(self) -> bool:
+        """True when an incremental run has seen enough stale pages in a row."""
+        return self.early_stop is not None and self.early_stop.should_stop
+
+    @property
+    def pages_done(self) -> set[int]:
+        """Pages already processed, by this run or the earlier one it resumes."""
+        # The checkpoint's set already includes every page processed here
+        return self.checkpoint.completed_pages if self.checkpoint else self.processed
+
+    def process(self, page: int, html: str | bytes) -> PageResult:
+        """Push one page through the pipeline.
+
+        Raises ValueError if the page can't be parsed; nothing is written then.
+        """
+        self.record(page, html)
+        return self.accept(page, parse_listings(html))
+
+    def record(self, page: int, html: str | bytes) -> None:
+        """Archive a raw body, if recording; done before parsing so failures are kept."""
+        if self.recorder is not None:
+            self.recorder.save(page, html)
+
+    def accept(self, page: int, result: PageResult) -> PageResult:
+        """Dedupe, write and account for a page parsed elsewhere (e.g. a ParsePool)."""
+        if self.early_stop is not None:
+            self.early_stop.observe(result.listings)
+        unique = self.deduper.filter(result.listings)
+        if self.enricher is not None:
+            with METRICS.timer("enrich"):
+                self.enricher.enrich(unique)
+        with METRICS.timer("write"):
+            self.sink.write(unique)
+        METRICS.count("pages")
+        METRICS.count("listings", len(unique))
+
+        self.stats.pages += 1
+        self.stats.listings += len(unique)
+        self.stats.duplicates += len(result.listings) - len(unique)
+        log.info(
+            "Page %d: %d listings (running total: %d)",
+            page,
+            len(result.listings),
+            self.stats.listings,
+        )
+
+        # Learn total pages from the first successful parse
+        if self.stats.total_pages is None and result.total_pages > 0:
+            self.stats.total_pages = result.total_pages
+            self.stats.total_results = result.total_results
+            log.info(
+                "Pagination: %d pages, %d total results",
+                result.total_pages,
+                result.total_results,
+            )
+
+        self.processed.add(page)
+        if self.checkpoint is not None:
+            self.checkpoint.mark_done(page, self.stats.total_pages)
+            self.checkpoint.save()
+        return result
+
+
+def run_sequential(fetcher: Fetcher, pipeline: Pipeline, max_pages: int | None = None) -> None:
+    """Fetch pages one after another until the last page, an empty page or an error."""
+    page = 1
+    while True:
+        # Stop if we've hit the user-specified page limit
+        if max_pages is not None and page > max_pages:
+            log.info("Reached --max-pages limit (%d)", max_pages)
+            break
+
+        # Stop if we've gone past the last page (known after first fetch)
+        total_pages = pipeline.stats.total_pages
+        if total_pages is not None and page > total_pages:
+            log.info("Reached last page (%d)", total_pages)
+            break
+
+        if page in pipeline.pages_done:
+            page += 1
+            continue
+
+        log.info("Fetching page %d ...", page)
+
+        try:
+            html = fetcher.fetch_page(page)
+        except BotDetectedError as e:
+            log.error("Stopping: %s", e)
+            break
+
+        try:
+            result = pipeline.process(page, html)
+        except ValueError as e:
+            log.error("Parse error on page %d: %s", page, e)
+            break
+
+        # If a page returned zero listings, we've likely passed the end
+        if not result.listings:
+            log.info("Empty page %d — stopping", page)
+            break
+
+        if pipeline.should_stop:
+            log.info(
+                "Nothing new or changed on the last %d pages — stopping", pipeline.stale_streak
+            )
+            break
+
+        page += 1
+
+
+async def _process_in_pool(
+    fetched: AsyncIterator[tuple[int, str]], pipeline: Pipeline, pool: ParsePool
+) -> None:
+    """Parse fetched pages in ``pool``, accepting them in completion order.
+
+    Once ``pool.max_pending`` pages are waiting no more are pulled from
+    ``fetched``, which stalls the fetcher. Pages already fetched are still
+    written if fetching fails.
+    """
+    import asyncio
+
+    async def parse(page: int, html: str) -> tuple[int, PageResult | ValueError]:
+        try:
+            return page, await pool.parse(html)
+        except ValueError as e:
+            return page, e
+
+    async def accept(done: set[asyncio.Task[tuple[int, PageResult | ValueError]]]) -> None:
+        for task in done:
+            page, result = task.result()
+            if isinstance(result, ValueError):
+                log.error("Parse error on page %d: %s", page, result)
+            elif pipeline.enricher is not None:
+                # Detail fetches block, so keep the event loop fetching meanwhile
+                await asyncio.to_thread(pipeline.accept, page, result)
+            else:
+                pipeline.accept(page, result)
+
+    pending: set[asyncio.Task[tuple[int, PageResult | ValueError]]] = set()
+    try:
+        async for page, html in fetched:
+            pipeline.record(page, html)
+            pending.add(asyncio.create_task(parse(page, html)))
+            if len(pending) >= pool.max_pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                await accept(done)
+    finally:
+        if pending:
+            done, _ = await asyncio.wait(pending)
+            await accept(done)
+
+
+async def run_concurrent(
+    fetcher: AsyncFetcher,
+    pipeline: Pipeline,
+    max_pages: int | None = None,
+    parse_pool: ParsePool | None = None,
+) -> None:
+    """Fetch page 1 to learn the page count, then the rest concurrently.
+
+    With a ParsePool, pages after the first are parsed in its workers.
+    """
+    import asyncio
+
+    done = pipeline.pages_done
+    if 1 not in done or pipeline.stats.total_pages is None:
+        log.info("Fetching page 1 ...")
+        try:
+            result = pipeline.process(1, await fetcher.fetch_page(1))
+        except BotDetectedError as e:
+            log.error("Stopping: %s", e)
+            return
+        except ValueError as e:
+            log.error("Parse error on page 1: %s", e)
+            return
+
+        if not result.listings:
+            log.info("Empty page 1 — stopping")
+            return
+
+    last_page = pipeline.stats.total_pages or 0
+    if max_pages is not None and max_pages < last_page:
+        log.info("Limiting to --max-pages (%d)", max_pages)
+        last_page = max_pages
+    pages = [page for page in range(2, last_page + 1) if page not in done]
+    if not pages:
+        return
+
+    log.info(
+        "Fetching %d pages (2-%d) with %d workers at %.2f req/s",
+        len(pages),
+        last_page,
+        fetcher.concurrency,
+        fetcher.limiter.rate,
+    )
+    try:
+        if parse_pool is not None:
+            await _process_in_pool(fetcher.fetch_pages(pages), pipeline, parse_pool)
+            return
+        async for page, html in fetcher.fetch_pages(pages):
+            try:
+                if pipeline.enricher is not None:
+                    # Detail fetches block, so keep the event loop fetching meanwhile
+                    await asyncio.to_thread(pipeline.process, page, html)
+                else:
+                    pipeline.process(page, html)
+            except ValueError as e:
+                log.error("Parse error on page %d: %s", page, e)
+    except BotDetectedError as e:
+        log.error("Stopping: %s", e)
+
+
+def run_replay(archive: PageArchive, pipeline: Pipeline, max_pages: int | None = None) -> None:
+    """Drive the pipeline from archived pages — no network, no sleeps.
+
+    Replays at most ``max_pages`` pages, lowest page numbers first. Pages
+    that can't be read back (a truncated or corrupt file) are skipped.
+    """
+    pages = archive.pages()
+    if max_pages is not None and max_pages < len(pages):
+        log.info("Limiting to --max-pages (%d)", max_pages)
+        pages = pages[:max_pages]
+    log.info("Replaying %d archived pages from %s", len(pages), archive.directory)
+    for page in pages:
+        try:
+            html = archive.load(page)
+        except (OSError, EOFError) as e:  # gzip.BadGzipFile is an OSError
+            log.error("Unreadable archived page %d: %s", page, e)
+            continue
+        try:
+            pipeline.process(page, html)
+        except ValueError as e:
+            log.error("Parse error on archived page %d: %s", page, e)
+            continue
+        if pipeline.should_stop:
+            log.info(
+                "Nothing new or changed on the last %d pages — stopping", pipeline.stale_streak
+            )
+            break
@@ -0,0 +1,193 @@
+"""Prometheus text exposition of the run's metrics, over HTTP or as a textfile.
+
+Counters become ``yad2_<name>_total``, gauges ``yad2_<name>``, and every
+stage timing becomes one series of the ``yad2_stage_duration_seconds``
+histogram, labelled by stage. Both outputs run on a daemon thread beside
+the scrape, so a scheduled container can be watched while it works.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from yad2_scraper.config import PROMETHEUS_TEXTFILE_INTERVAL, TIMING_BUCKETS
+from yad2_scraper.metrics import METRICS, Metrics
+
+log = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "yad2_"
+
+_HELP = {
+    "pages": "Result pages parsed and written",
+    "listings": "Unique listings written",
+    "fetch.requests": "HTTP requests sent, including retries",
+    "fetch.bytes": "Response body bytes downloaded, before decompression",
+    "fetch.redirects": "Bot-detection redirects received",
+    "fetch.backoff_seconds": "Seconds of backoff imposed after bot detection",
+    "rate_limiter.rate": "Rate limiter budget in requests per second",
+    "rate_limiter.tokens": "Rate limiter tokens available (negative while callers queue)",
+    "rate_limiter.queue_depth": "Callers waiting on the rate limiter",
+    "rate_limiter.decreases": "Adaptive rate cuts after a bot redirect or latency spike",
+    "identities.healthy": "Client identities not in quarantine",
+    "identities.quarantined": "Times a client identity was quarantined after a bot redirect",
+    "enrich.fetched": "Listings enriched from a freshly fetched detail page",
+    "enrich.cached": "Listings enriched from the detail cache",
+    "enrich.failed": "Detail pages that could not be fetched or parsed",
+    "enrich.skipped": "Listings left unenriched by the time budget or a bot redirect",
+}
+
+
+def _metric_name(name: str) -> str:
+    return PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render(metrics: Metrics = METRICS) -> str:
+    """The current metrics in Prometheus text format 0.0.4."""
+    lines: list[str] = []
+
+    def family(name: str, kind: str, help_text: str) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    # Copies: the scrape thread may be adding entries while this runs
+    for key, value in sorted(dict(metrics.counters).items()):
+        name = _metric_name(key) + "_total"
+        family(name, "counter", _HELP.get(key, key))
+        lines.append(f"{name} {_number(value)}")
+    for key, value in metrics.gauge_values().items():
+        name = _metric_name(key)
+        family(name, "gauge", _HELP.get(key, key))
+        lines.append(f"{name} {_number(value)}")
+
+    timings = sorted(dict(metrics.timings).items())
+    if timings:
+        name = PREFIX + "stage_duration_seconds"
+        family(name, "histogram", "Time spent per scrape stage")
+        for stage, timing in timings:
+            cumulative = 0
+            for bound, count in zip((*TIMING_BUCKETS, "+Inf"), timing.buckets, strict=True):
+                cumulative += count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {timing.total!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {timing.count}')
+    return "\n".join(lines) + "\n"
+
+
+def parse_listen(value: str) -> tuple[str, int]:
+    """``"9108"`` or ``"0.0.0.0:9108"`` -> (host, port); localhost when no host is given.
+
+    Raises ValueError for anything else.
+    """
+    host, _, port = value.rpartition(":")
+    if not port.isdigit() or int(port) > 65535:
+        raise ValueError(f"expected [HOST:]PORT, got {value!r}")
+    return host or "127.0.0.1", int(port)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    metrics: Metrics = METRICS
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render(self.metrics).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        log.debug("Metrics request: " + format, *args)
+
+
+class MetricsServer:
+    """Serve ``/metrics`` from a daemon thread until closed."""
+
+    def __init__(self, host: str, port: int, metrics: Metrics = METRICS) -> None:
+        handler = type("Handler", (_Handler,), {"metrics": metrics})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="yad2-metrics", daemon=True
+        )
+        self._thread.start()
+        log.info("Serving Prometheus metrics on http://%s:%d/metrics", self.host, self.port)
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> MetricsServer:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class TextfileExporter:
+    """Rewrite a node_exporter textfile-collector file every ``interval`` seconds.
+
+    The file is replaced atomically, and written once more on close so it
+    ends with the run's final numbers.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        interval: float = PROMETHEUS_TEXTFILE_INTERVAL,
+        metrics: Metrics = METRICS,
+    ) -> None:
+        self.path = Path(path)
+        self.interval = interval
+        self.metrics = metrics
+        self._stop = threading.Event()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._loop, name="yad2-textfile", daemon=True)
+        self._thread.start()
+
+    def write(self) -> None:
+        # The collector only reads *.prom, so the dot-prefixed temp file is never seen half-written
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(render(self.metrics))
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.write()
+
+    def __enter__(self) -> TextfileExporter:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
@@ -0,0 +1,177 @@
+"""Token-bucket rate limiter shared by the sync and async fetch paths."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable
+
+log = logging.getLogger(__name__)
+
+
+class FakeClock:
+    """Manually driven clock for tests — sleeping just advances time."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = start
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += max(seconds, 0.0)
+
+    async def async_sleep(self, seconds: float) -> None:
+        import asyncio
+
+        self.sleep(seconds)
+        # Still yield to the event loop so other tasks interleave as they would
+        await asyncio.sleep(0)
+
+
+class RateLimiter:
+    """Token bucket: ``rate`` tokens per second, holding at most ``burst``.
+
+    Implemented as a virtual-schedule (GCRA) bucket, so time spent on the
+    network between requests counts toward the next delay instead of being
+    added on top of it. Each request also pushes the schedule back by a
+    random ``jitter`` (0..jitter seconds) to avoid a perfectly regular beat.
+
+    ``clock`` may be a FakeClock, which also replaces both sleep functions.
+    Otherwise time.monotonic is used and the sleeps are looked up at call
+    time, so patching ``time.sleep`` or ``asyncio.sleep`` still works.
+    Slots are claimed under a lock, so threads may share a limiter.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float = 1.0,
+        jitter: float = 0.0,
+        *,
+        clock: FakeClock | None = None,
+        rng: random.Random | None = None,
+    ) -> None:
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        if jitter < 0:
+            raise ValueError("jitter must not be negative")
+        self.rate = rate
+        self.burst = burst
+        self.jitter = jitter
+        self._clock: Callable[[], float] = clock or time.monotonic
+        self._fake = clock
+        self._rng = rng or random.Random()
+        self._tat: float | None = None  # theoretical arrival time of the next token
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    @classmethod
+    def from_delay_range(
+        cls, delay_min: float, delay_max: float, *, clock: FakeClock | None = None
+    ) -> RateLimiter:
+        """Space request starts ``delay_min``..``delay_max`` seconds apart."""
+        return cls(1.0 / delay_min, jitter=delay_max - delay_min, clock=clock)
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: float) -> None:
+        if value <= 0:
+            raise ValueError("rate must be positive")
+        self._rate = value
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently sleeping for a token."""
+        return self._waiting
+
+    @property
+    def tokens(self) -> float:
+        """Tokens available right now (negative while callers are queued)."""
+        if self._tat is None:
+            return self.burst
+        return min(self.burst, self.burst - (self._tat - self._clock()) * self._rate)
+
+    def peek(self) -> float:
+        """How long acquire() would wait right now, without claiming the slot."""
+        if self._tat is None:
+            return 0.0
+        tolerance = (self.burst - 1) / self._rate
+        return max(0.0, self._tat - tolerance - self._clock())
+
+    def reserve(self) -> float:
+        """Claim the next request slot and return how long to wait for it."""
+        with self._lock:
+            now = self._clock()
+            interval = 1.0 / self._rate
+            tolerance = (self.burst - 1) * interval
+            tat = now if self._tat is None else max(self._tat, now)
+            start = max(now, tat - tolerance)
+            extra = self._rng.uniform(0.0, self.jitter) if self.jitter else 0.0
+            self._tat = tat + interval + extra
+            return start - now
+
+    def penalize(self, seconds: float) -> None:
+        """Hold back every caller for at least ``seconds`` (e.g. bot backoff)."""
+        with self._lock:
+            tolerance = (self.burst - 1) / self._rate
+            resume = self._clock() + seconds + tolerance
+            if self._tat is None or self._tat < resume:
+                self._tat = resume
+
+    def on_response(self, latency: float) -> None:
+        """Feedback after a page came back in ``latency`` seconds; ignored at a fixed rate."""
+
+    def on_block(self) -> None:
+        """Feedback after a bot-detection redirect; ignored at a fixed rate."""
+
+    def _log_wait(self, delay: float) -> None:
+        log.debug(
+            "Sleeping %.1fs before request (rate %.2f/s, %d queued)",
+            delay,
+            self._rate,
+            self._waiting,
+        )
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the time slept."""
+        delay = self.reserve()
+        if delay > 0:
+            self._waiting += 1
+            self._log_wait(delay)
+            try:
+                if self._fake is not None:
+                    self._fake.sleep(delay)
+                else:
+                    time.sleep(delay)
+            finally:
+                self._waiting -= 1
+        return delay
+
+    async def acquire_async(self) -> float:
+        """Async counterpart of acquire()."""
+        # asyncio is imported on first use so sequential runs never load it
+        import asyncio
+
+        delay = self.reserve()
+        if delay > 0:
+            self._waiting += 1
+            self._log_wait(delay)
+            try:
+                if self._fake is not None:
+                    await self._fake.async_sleep(delay)
+                else:
+                    await asyncio.sleep(delay)
+            finally:
+                self._waiting -= 1
+        return delay
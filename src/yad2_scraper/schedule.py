@@ -0,0 +1,116 @@
+"""Cron expressions for --daemon: when each search profile is due next."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+ALIASES = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+# (name, lowest, highest) for each of the five fields
+_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),
+)
+
+# A satisfiable expression matches within a few years; Feb 29 may take up to eight
+_SEARCH_LIMIT = timedelta(days=366 * 8 + 2)
+
+
+def _parse_field(text: str, name: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in text.split(","):
+        spec, _, step_text = part.partition("/")
+        if (step_text and not step_text.isdigit()) or step_text == "0":
+            raise ValueError(f"bad step in {name} field {text!r}")
+        step = int(step_text) if step_text else 1
+        if spec == "*":
+            start, end = low, high
+        else:
+            start_text, dash, end_text = spec.partition("-")
+            if not start_text.isdigit() or (dash and not end_text.isdigit()):
+                raise ValueError(f"bad {name} field {text!r}")
+            start = int(start_text)
+            end = int(end_text) if dash else (high if step_text else start)
+        if not low <= start <= end <= high:
+            raise ValueError(f"{name} field {text!r} is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """A standard five-field cron expression, evaluated in local time.
+
+    Fields accept ``*``, numbers, ranges, lists and ``/`` steps; ``@hourly``,
+    ``@daily``, ``@weekly`` and ``@monthly`` are accepted too. As in cron,
+    when both day fields are restricted a day matching either one is due.
+    """
+
+    expression: str
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]  # 0 = Sunday
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> CronSchedule:
+        """Raises ValueError for anything that isn't a valid cron expression."""
+        fields = ALIASES.get(expression.strip(), expression).split()
+        if len(fields) != len(_FIELDS):
+            raise ValueError(f"expected 5 cron fields or an @alias, got {expression!r}")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(text, *spec) for text, spec in zip(fields, _FIELDS, strict=True)
+        )
+        schedule = cls(
+            expression=expression,
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=frozenset(day % 7 for day in weekdays),  # 7 is Sunday too
+            any_day=fields[2] == "*",
+            any_weekday=fields[4] == "*",
+        )
+        schedule.next_after(datetime(2000, 1, 1))  # e.g. "0 0 31 2 *" never fires
+        return schedule
+
+    def _day_matches(self, when: datetime) -> bool:
+        in_month = when.day in self.days
+        in_week = (when.isoweekday() % 7) in self.weekdays
+        if self.any_day or self.any_weekday:
+            return in_month and in_week
+        return in_month or in_week
+
+    def next_after(self, when: datetime) -> datetime:
+        """The first matching minute strictly after ``when``.
+
+        Raises ValueError if the expression can never match.
+        """
+        candidate = when.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + _SEARCH_LIMIT
+        while candidate < limit:
+            if candidate.month not in self.months or not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"cron expression {self.expression!r} never matches")
+
+    def __str__(self) -> str:
+        return self.expression
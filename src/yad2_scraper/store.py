@@ -0,0 +1,264 @@
+"""SQLite listing store, upserted by token so repeat scrapes update in place."""
+
+from __future__ import annotations
+
+import logging
+import operator
+import sqlite3
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import fields
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from yad2_scraper.changes import ChangeSet, PriceChange, change_kind, fingerprint
+from yad2_scraper.config import OUTPUT_DIR, SQLITE_FILE
+from yad2_scraper.models import DETAIL_FIELDS, INT_FIELDS, CarListing
+
+log = logging.getLogger(__name__)
+
+INDEXED_COLUMNS = ("manufacturer", "model", "year", "price")
+
+# Tokens per "IN (...)" lookup, under SQLite's oldest host-parameter limit (999)
+_MAX_PARAMS = 900
+
+_COLUMNS = CarListing.csv_header()
+_detail_values = operator.itemgetter(*(_COLUMNS.index(name) for name in DETAIL_FIELDS))
+_PRIORITY = _COLUMNS.index("priority")
+
+# Bookkeeping columns after the CarListing fields; added to older databases on open
+_EXTRA_COLUMNS = {
+    "first_seen": "TEXT NOT NULL DEFAULT ''",
+    "last_seen": "TEXT NOT NULL DEFAULT ''",
+    "fingerprint": "INTEGER",
+    "removed_at": "TEXT",
+}
+
+
+def _schema() -> list[str]:
+    columns = ",\n    ".join(
+        [
+            *(
+                f"{f.name} {'INTEGER' if f.name in INT_FIELDS else 'TEXT'}"
+                + (" PRIMARY KEY" if f.name == "token" else "")
+                for f in fields(CarListing)
+            ),
+            *(f"{name} {decl}" for name, decl in _EXTRA_COLUMNS.items()),
+        ]
+    )
+    return [
+        f"CREATE TABLE IF NOT EXISTS listings (\n    {columns}\n)",
+        *(
+            f"CREATE INDEX IF NOT EXISTS idx_listings_{name} ON listings ({name})"
+            for name in INDEXED_COLUMNS
+        ),
+        # One row per detected change; price_delta is new_price - old_price
+        "CREATE TABLE IF NOT EXISTS history (\n"
+        "    seen_at TEXT NOT NULL,\n"
+        "    token TEXT NOT NULL,\n"
+        "    change TEXT NOT NULL,\n"
+        "    old_price INTEGER,\n"
+        "    new_price INTEGER,\n"
+        "    price_delta INTEGER\n"
+        ")",
+        "CREATE INDEX IF NOT EXISTS idx_history_token ON history (token)",
+    ]
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add bookkeeping columns missing from a database made by an older version."""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(listings)")}
+    for name, decl in _EXTRA_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE listings ADD COLUMN {name} {decl}")
+
+
+def _assignment(name: str) -> str:
+    # A run without --enrich (or one that skipped the listing) leaves detail
+    # fields blank; keep what an earlier enriched run stored
+    if name in DETAIL_FIELDS:
+        return f"{name} = COALESCE(NULLIF(excluded.{name}, ''), listings.{name})"
+    return f"{name} = excluded.{name}"
+
+
+_UPSERT = (
+    f"INSERT INTO listings ({', '.join(_COLUMNS)}, first_seen, last_seen, fingerprint) "
+    f"VALUES ({', '.join('?' * len(_COLUMNS))}, ?, ?, ?) "
+    "ON CONFLICT (token) DO UPDATE SET "
+    + ", ".join(_assignment(name) for name in _COLUMNS if name != "token")
+    + ", last_seen = excluded.last_seen, fingerprint = excluded.fingerprint, removed_at = NULL"
+)
+
+
+# For a row whose fingerprint is unchanged: the fingerprint ignores priority
+_TOUCH = "UPDATE listings SET last_seen = ?, priority = ? WHERE token = ?"
+
+
+def default_store_path() -> Path:
+    return Path(OUTPUT_DIR) / SQLITE_FILE
+
+
+class SqliteStore:
+    """ListingWriter that upserts into a persistent SQLite database.
+
+    Each write() is one transaction, so a page's rows are durable once it
+    returns. New tokens get first_seen; every write refreshes last_seen.
+    Blank detail fields (see DETAIL_FIELDS) never overwrite stored ones.
+    The database runs in WAL mode so it can be queried during a scrape.
+
+    Each write also compares its rows with the rows they replace and, in
+    the same transaction, appends new, returned (listed again after being
+    removed), price-changed and updated listings to the history table, so
+    a killed run keeps the history of what it wrote. Removals are recorded
+    on close, and only when ``complete`` has been set, i.e. the run saw
+    every page of the search.
+    """
+
+    def __init__(self, path: Path | None = None, *, clock: Callable[[], float] = time.time) -> None:
+        self.path = path or default_store_path()
+        self.written = 0
+        self.complete = False
+        self.changes = ChangeSet()  # this run's, so far
+        self._clock = clock
+        self._conn: sqlite3.Connection | None = None
+        self._count_at_open = 0
+        self._seen: set[str] = set()  # tokens written this run
+
+    def open(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # FULL: every commit is fsynced, so a written page survives power loss
+            # too; one sync per page is nothing next to the request delay
+            conn.execute("PRAGMA synchronous=FULL")
+            with conn:
+                for statement in _schema():
+                    conn.execute(statement)
+                _migrate(conn)
+            self._count_at_open = conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _now(self) -> str:
+        return datetime.fromtimestamp(self._clock(), UTC).isoformat(timespec="seconds")
+
+    def write(self, listings: Iterable[CarListing]) -> int:
+        """Upsert ``listings`` and their history in one transaction; returns the row count."""
+        now = self._now()
+        rows = [(*values, now, now, fingerprint(values)) for values in CarListing.rows(listings)]
+        if not rows:
+            return 0
+        conn = self.open()
+        with conn:
+            history, unchanged = self._page_history(conn, rows, now)
+            conn.executemany("INSERT INTO history VALUES (?, ?, ?, ?, ?, ?)", history)
+            # Most rows of a repeat scrape are unchanged; touching only the
+            # unindexed columns that may differ skips rewriting the indexes
+            conn.executemany(_TOUCH, ((now, row[_PRIORITY], row[0]) for row in unchanged.values()))
+            conn.executemany(_UPSERT, (row for row in rows if row[0] not in unchanged))
+        self._seen.update(row[0] for row in rows)
+        self.written += len(rows)
+        return len(rows)
+
+    def _page_history(
+        self, conn: sqlite3.Connection, rows: list[tuple[Any, ...]], now: str
+    ) -> tuple[list[tuple[Any, ...]], dict[str, tuple[Any, ...]]]:
+        """History rows for ``rows`` against the stored rows they are about to replace.
+
+        Also returns, by token, the rows whose stored row is active, has the
+        same fingerprint and gets no detail fields, i.e. needs only _TOUCH.
+        """
+        tokens = [row[0] for row in rows]
+        stored: dict[str, tuple[Any, ...]] = {}
+        for start in range(0, len(tokens), _MAX_PARAMS):
+            chunk = tokens[start : start + _MAX_PARAMS]
+            stored.update(
+                (token, (fp, price, removed_at))
+                for token, fp, price, removed_at in conn.execute(
+                    "SELECT token, fingerprint, price, removed_at FROM listings "
+                    f"WHERE token IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+            )
+        price_index = _COLUMNS.index("price")
+        history: list[tuple[Any, ...]] = []
+        unchanged: dict[str, tuple[Any, ...]] = {}
+        for row in rows:
+            token, fp, price = row[0], row[-1], row[price_index]
+            before = stored.get(token)
+            if before is not None and before[2] is None and before[0] == fp:
+                if not any(_detail_values(row)):
+                    unchanged[token] = row
+                continue
+            if before is not None and before[2] is not None:
+                old = before[1]
+                delta = None if old is None or price is None else price - old
+                self.changes.returned.append(token)
+                history.append((now, token, "returned", old, price, delta))
+                continue
+            kind = change_kind(before and before[:2], fp, price)
+            if kind == "new":
+                self.changes.new.append(token)
+                history.append((now, token, "new", None, price, None))
+            elif kind == "price" and before is not None:
+                change = PriceChange(token, before[1], price)
+                self.changes.price_changes.append(change)
+                history.append((now, token, "price", change.old, change.new, change.delta))
+            elif kind == "updated":
+                self.changes.updated.append(token)
+                history.append((now, token, "updated", None, None, None))
+        return history, unchanged
+
+    def _record_removals(self, conn: sqlite3.Connection) -> None:
+        """Mark listings that were active but not seen by this complete run as removed."""
+        now = self._now()
+        gone = [
+            (token, price)
+            for token, price in conn.execute(
+                "SELECT token, price FROM listings WHERE removed_at IS NULL"
+            )
+            if token not in self._seen
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO history VALUES (?, ?, 'removed', ?, NULL, NULL)",
+                ((now, token, price) for token, price in gone),
+            )
+            conn.executemany(
+                "UPDATE listings SET removed_at = ? WHERE token = ?",
+                ((now, token) for token, _ in gone),
+            )
+        self.changes.removed = [token for token, _ in gone]
+
+    def close(self) -> None:
+        if self._conn is not None:
+            if self.complete:
+                self._record_removals(self._conn)
+            changes = self.changes
+            log.info(
+                "Changes since last run: %d new, %d returned, %d price changes, "
+                "%d updated, %d removed",
+                len(changes.new),
+                len(changes.returned),
+                len(changes.price_changes),
+                len(changes.updated),
+                len(changes.removed),
+            )
+            total = self._conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+            log.info(
+                "SQLite store %s: %d listings upserted, %d new, %d total",
+                self.path,
+                self.written,
+                total - self._count_at_open,
+                total,
+            )
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> SqliteStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
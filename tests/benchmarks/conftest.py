@@ -0,0 +1,26 @@
+"""Shared fixtures and timing helpers for benchmarks."""
+
+import timeit
+
+import coverage
+import pytest
+
+
+def best_of_interleaved(*funcs, repeat: int = 5) -> list[float]:
+    """Best time per function, alternating between them so noise hits all alike."""
+    best = [float("inf")] * len(funcs)
+    for _ in range(repeat):
+        for i, func in enumerate(funcs):
+            best[i] = min(best[i], timeit.timeit(func, number=1))
+    return best
+
+
+@pytest.fixture(autouse=True)
+def _pause_coverage():
+    """Time benchmarks without the coverage tracer, which skews ratios."""
+    cov = coverage.Coverage.current()
+    if cov is not None:
+        cov.stop()
+    yield
+    if cov is not None:
+        cov.start()
@@ -0,0 +1,68 @@
+"""Rewriting 100k stored listings, 5% of them repriced, through SqliteStore.write."""
+
+import random
+import time
+from dataclasses import replace
+
+import pytest
+
+from yad2_scraper.models import CarListing
+from yad2_scraper.store import SqliteStore
+
+SIZE = 100_000
+
+WRITE_BUDGET = 3.0  # ~2s on a dev machine, ~3.4s when every row was fully upserted
+
+
+def _scrapes(size):
+    """An earlier scrape and a later one: 5% repriced, 2% gone and 2% new."""
+    rng = random.Random(13)
+    earlier = [
+        CarListing(token=f"t{i}", price=20_000 + i % 40_000, manufacturer="קיה", year=2021)
+        for i in range(size)
+    ]
+    gone = size // 50
+    repriced = set(rng.sample(range(gone, size), size // 20))
+    later = [
+        replace(listing, price=(listing.price or 0) - 1000) if i in repriced else listing
+        for i, listing in enumerate(earlier)
+    ][gone:] + [CarListing(token=f"new{i}", price=30_000) for i in range(gone)]
+    return earlier, later
+
+
+def _stored(path, earlier):
+    with SqliteStore(path) as store:
+        store.write(earlier)
+    return path
+
+
+@pytest.mark.unit
+class TestRewriteChanges:
+    """A scaled-down later scrape should record the changes it was built with."""
+
+    def test_counts(self, tmp_path):
+        size = 1000
+        earlier, later = _scrapes(size)
+        with SqliteStore(_stored(tmp_path / "cars.db", earlier)) as store:
+            store.write(later)
+            store.complete = True
+
+        assert len(store.changes.new) == len(store.changes.removed) == size // 50
+        assert len(store.changes.price_changes) == size // 20
+        assert not store.changes.updated
+        assert {change.delta for change in store.changes.price_changes} == {-1000}
+
+
+@pytest.mark.benchmark
+class TestRewriteBenchmark:
+    """Fingerprinting, comparing and upserting 100k listings should stay quick."""
+
+    def test_rewrite_100k(self, tmp_path):
+        """Time the write a repeat scrape makes, where every row is compared and stored."""
+        earlier, later = _scrapes(SIZE)
+        with SqliteStore(_stored(tmp_path / "cars.db", earlier)) as store:
+            start = time.perf_counter()
+            store.write(later)
+            elapsed = time.perf_counter() - start
+
+        assert elapsed < WRITE_BUDGET, f"rewriting {SIZE} listings took {elapsed:.2f}s"
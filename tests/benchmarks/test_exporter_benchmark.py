@@ -0,0 +1,50 @@
+"""CSV export cost: row building should be small next to csv.writer itself."""
+
+import csv
+import io
+from dataclasses import fields
+
+import pytest
+
+from tests.benchmarks.conftest import best_of_interleaved
+from tests.fixtures.sample_data import make_listing
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.models import CarListing
+
+
+@pytest.fixture(scope="module")
+def listings():
+    return [CarListing.from_raw(make_listing(i), "private") for i in range(20_000)]
+
+
+def _reflective_rows(listings):
+    """The old per-row reflection: fields() and getattr for every listing."""
+    for listing in listings:
+        yield ["" if (v := getattr(listing, f.name)) is None else str(v) for f in fields(listing)]
+
+
+@pytest.mark.benchmark
+class TestCsvExportBenchmark:
+    """Guard the cached-accessor row path against regressions."""
+
+    def test_rows_beat_reflection(self, listings):
+        """Bulk rows() into csv.writer should be at least 1.5x faster than reflection."""
+        reflective, bulk = best_of_interleaved(
+            lambda: csv.writer(io.StringIO()).writerows(_reflective_rows(listings)),
+            lambda: csv.writer(io.StringIO()).writerows(CarListing.rows(listings)),
+        )
+        assert reflective / bulk > 1.5, f"reflection={reflective:.3f}s rows()={bulk:.3f}s"
+
+    def test_writer_overhead_is_mostly_io(self, listings, tmp_path):
+        """CsvWriter.write should cost little more than serializing prebuilt rows."""
+        prebuilt = [tuple(listing.csv_row()) for listing in listings]
+
+        def write():
+            with CsvWriter(tmp_path / "out.csv") as writer:
+                writer.write(listings)
+            (tmp_path / "out.csv").unlink()
+
+        floor, written = best_of_interleaved(
+            lambda: csv.writer(io.StringIO()).writerows(prebuilt), write
+        )
+        assert written < floor * 2, f"prebuilt rows={floor:.3f}s CsvWriter.write={written:.3f}s"
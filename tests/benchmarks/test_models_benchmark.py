@@ -0,0 +1,179 @@
+"""Speed of the compiled CarListing.from_raw and memory held per listing."""
+
+import gc
+import json
+import tracemalloc
+from dataclasses import make_dataclass
+from typing import Any
+
+import pytest
+
+from tests.benchmarks.conftest import best_of_interleaved
+from tests.fixtures.sample_data import (
+    LISTING_AGENCY,
+    LISTING_MINIMAL,
+    LISTING_NO_SUB_MODEL,
+    LISTING_WITH_TAGS,
+    make_listing,
+)
+from yad2_scraper.models import CarListing
+
+
+def _closure_from_raw(raw: dict[str, Any], ad_type: str) -> CarListing:
+    """The pre-spec, all-strings implementation, kept as the baseline to beat."""
+
+    def g(*keys: str) -> str:
+        obj: Any = raw
+        for k in keys:
+            if isinstance(obj, dict):
+                obj = obj.get(k)
+            else:
+                return ""
+        return str(obj) if obj is not None else ""
+
+    def nested_text(key: str) -> str:
+        val = raw.get(key)
+        if isinstance(val, dict):
+            return str(val.get("text", "")) if val.get("text") is not None else ""
+        return str(val) if val is not None else ""
+
+    def nested_id(key: str) -> str:
+        val = raw.get(key)
+        if isinstance(val, dict):
+            return str(val.get("id", "")) if val.get("id") is not None else ""
+        return ""
+
+    fin = raw.get("metaData", {}).get("financingInfo") or {}
+    tags_str = ", ".join(
+        str(t.get("name", t.get("text", t))) if isinstance(t, dict) else str(t)
+        for t in raw.get("tags") or []
+    )
+    metadata = raw.get("metaData") or {}
+    images = metadata.get("images") or []
+    cover_url = str(metadata.get("coverImage", "")) if metadata.get("coverImage") else ""
+    commitments_str = ", ".join(
+        str(c.get("text", c)) if isinstance(c, dict) else str(c)
+        for c in metadata.get("commitments") or []
+    )
+    return CarListing(
+        token=g("token"),
+        order_id=g("orderId"),
+        ad_type=ad_type,
+        listing_source=g("listingSource"),
+        manufacturer=nested_text("manufacturer"),
+        manufacturer_id=nested_id("manufacturer"),
+        model=nested_text("model"),
+        model_id=nested_id("model"),
+        sub_model=nested_text("subModel"),
+        sub_model_id=nested_id("subModel"),
+        year=g("vehicleDates", "yearOfProduction"),
+        engine_type=nested_text("engineType"),
+        engine_type_id=nested_id("engineType"),
+        engine_volume_cc=g("engineVolume"),
+        hand=nested_text("hand"),
+        hand_number=g("handNumber"),
+        price=g("price"),
+        advance_payment=str(fin.get("advancePayment", "")) if fin else "",
+        monthly_payment=str(fin.get("monthlyPayment", "")) if fin else "",
+        number_of_payments=str(fin.get("numberOfPayments", "")) if fin else "",
+        balance=str(fin.get("balance", "")) if fin else "",
+        area=g("address", "area", "text"),
+        area_id=g("address", "area", "id"),
+        image_count=str(len(images)),
+        cover_image_url=cover_url,
+        tags=tags_str,
+        agency_name=g("customer", "agencyName"),
+        agency_customer_id=g("customer", "id"),
+        commitments=commitments_str,
+        has_trade_in=g("packages", "isTradeInButton"),
+        priority=g("priority"),
+    )
+
+
+def _items(n: int) -> list[dict[str, Any]]:
+    variants = [LISTING_MINIMAL, LISTING_NO_SUB_MODEL, LISTING_AGENCY, LISTING_WITH_TAGS]
+    items = []
+    for i in range(n):
+        item = make_listing(i) if i % 2 else dict(variants[i % len(variants)])
+        if i % 3 == 0:
+            item["metaData"] = {
+                "images": ["a.jpg"],
+                "financingInfo": {"monthlyPayment": 990 + i, "balance": 12000},
+                "commitments": [{"text": "אחריות"}],
+            }
+        items.append(item)
+    return items
+
+
+ITEMS = _items(5000)
+
+
+@pytest.mark.unit
+class TestFromRawBaseline:
+    """The benchmark baseline should build the same listings as the compiled spec."""
+
+    def test_compiled_matches_baseline(self):
+        """Both implementations should export identical rows."""
+        for raw in ITEMS:
+            compiled = CarListing.from_raw(raw, "private").csv_row()
+            assert compiled == _closure_from_raw(raw, "private").csv_row()
+
+
+@pytest.mark.benchmark
+class TestFromRawBenchmark:
+    """The compiled field spec should clearly beat rebuilding closures per item."""
+
+    def test_compiled_speedup(self):
+        """Building 5000 listings should be clearly faster than the baseline.
+
+        Typically ~2x; the bound leaves room for noisy CI machines, and both
+        sides pay the same 31-argument dataclass constructor.
+        """
+        compiled, baseline = best_of_interleaved(
+            lambda: [CarListing.from_raw(raw, "private") for raw in ITEMS],
+            lambda: [_closure_from_raw(raw, "private") for raw in ITEMS],
+            repeat=9,
+        )
+
+        per_item = 1e6 / len(ITEMS)
+        assert baseline / compiled > 1.3, (
+            f"compiled={compiled * per_item:.2f}µs baseline={baseline * per_item:.2f}µs"
+        )
+
+
+# The pre-slots shape: a plain dataclass, one string per field, with a __dict__.
+DictListing = make_dataclass("DictListing", [(name, str, "") for name in CarListing.csv_header()])
+
+
+def _retained_bytes(build, payloads: list[str]) -> int:
+    """Memory still held by the built listings once every raw item is gone."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        listings = [build(json.loads(payload)) for payload in payloads]
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(listings) == len(payloads)
+    return retained
+
+
+def _dict_listing(raw: dict[str, Any]) -> Any:
+    legacy = _closure_from_raw(raw, "private")
+    return DictListing(*(str(getattr(legacy, name)) for name in CarListing.csv_header()))
+
+
+@pytest.mark.unit
+class TestListingMemory:
+    """Slots, int fields and interning should shrink what each listing keeps alive."""
+
+    def test_memory_per_listing(self):
+        """A compact listing should retain at least 3x less than a dict-backed one."""
+        payloads = [json.dumps(raw) for raw in ITEMS]
+        compact = _retained_bytes(lambda raw: CarListing.from_raw(raw, "private"), payloads)
+        plain = _retained_bytes(_dict_listing, payloads)
+
+        assert plain / compact > 3, (
+            f"compact={compact / len(ITEMS):.0f}B plain={plain / len(ITEMS):.0f}B per listing"
+        )
@@ -0,0 +1,73 @@
+"""Parquet vs CSV: file size and time to load typed columns back."""
+
+import csv
+import timeit
+
+import pytest
+
+from tests.fixtures.sample_data import make_listing
+from yad2_scraper.config import CSV_ENCODING
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.models import CarListing
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+from yad2_scraper.parquet import ParquetWriter  # noqa: E402
+
+INT_COLUMNS = ("year", "engine_volume_cc", "hand_number", "price")
+
+
+def _load_csv_typed(path):
+    """What an analytics job does with the CSV: re-parse every row into types."""
+    with open(path, encoding=CSV_ENCODING, newline="") as f:
+        reader = csv.DictReader(f)
+        columns = {name: [] for name in reader.fieldnames}
+        for row in reader:
+            for name, value in row.items():
+                if name in INT_COLUMNS:
+                    value = int(value) if value else None
+                columns[name].append(value)
+    return columns
+
+
+@pytest.fixture(scope="module")
+def outputs(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("export")
+    listings = [CarListing.from_raw(make_listing(i), "private") for i in range(20_000)]
+    with CsvWriter(directory / "out.csv") as writer:
+        writer.write(listings)
+    with ParquetWriter(directory / "out.parquet") as writer:
+        writer.write(listings)
+    return directory / "out.csv", directory / "out.parquet"
+
+
+@pytest.mark.unit
+class TestParquetOutputSize:
+    """Parquet output should be smaller and load back the same typed values."""
+
+    def test_smaller_file(self, outputs):
+        """The Parquet file should be at least 3x smaller than the CSV."""
+        csv_path, parquet_path = outputs
+        csv_size, parquet_size = csv_path.stat().st_size, parquet_path.stat().st_size
+        assert csv_size / parquet_size > 3, f"csv={csv_size}B parquet={parquet_size}B"
+
+    def test_same_typed_values(self, outputs):
+        csv_path, parquet_path = outputs
+        assert (
+            pq.read_table(parquet_path).column("price").to_pylist()
+            == (_load_csv_typed(csv_path)["price"])
+        )
+
+
+@pytest.mark.benchmark
+class TestParquetBenchmark:
+    """Parquet output should be much quicker to load typed."""
+
+    def test_faster_typed_load(self, outputs):
+        """Loading typed columns from Parquet should be at least 5x faster."""
+        csv_path, parquet_path = outputs
+        csv_time = min(timeit.repeat(lambda: _load_csv_typed(csv_path), number=1, repeat=3))
+        parquet_time = min(timeit.repeat(lambda: pq.read_table(parquet_path), number=1, repeat=3))
+        assert csv_time / parquet_time > 5, (
+            f"csv load={csv_time * 1e3:.0f}ms parquet load={parquet_time * 1e3:.1f}ms"
+        )
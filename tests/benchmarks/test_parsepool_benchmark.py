@@ -0,0 +1,78 @@
+"""Concurrent-run throughput with parsing in-process vs in a ParsePool."""
+
+import asyncio
+import os
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.fixtures.sample_data import create_feed_html, make_listing
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.fetcher import AsyncFetcher
+from yad2_scraper.parsepool import ParsePool
+from yad2_scraper.pipeline import Pipeline, run_concurrent
+
+PAGES = 120
+PER_PAGE = 40
+WORKERS = max(2, os.cpu_count() or 1)
+
+
+@pytest.fixture(scope="module")
+def bodies():
+    return {
+        page: create_feed_html(
+            [make_listing(page * PER_PAGE + i) for i in range(PER_PAGE)], pages=PAGES
+        )
+        for page in range(1, PAGES + 1)
+    }
+
+
+def _fetcher(bodies):
+    """An AsyncFetcher stand-in that serves every page instantly."""
+    fetcher = MagicMock(spec=AsyncFetcher)
+    fetcher.concurrency = WORKERS
+    fetcher.limiter = MagicMock(rate=1.0)
+
+    async def fetch_page(page):
+        return bodies[page]
+
+    async def fetch_pages(pages):
+        for page in pages:
+            await asyncio.sleep(0)
+            yield page, bodies[page]
+
+    fetcher.fetch_page = fetch_page
+    fetcher.fetch_pages = fetch_pages
+    return fetcher
+
+
+def _timed_run(bodies, path, pool=None):
+    with CsvWriter(path) as writer:
+        pipeline = Pipeline(writer)
+        start = time.perf_counter()
+        asyncio.run(run_concurrent(_fetcher(bodies), pipeline, parse_pool=pool))
+        elapsed = time.perf_counter() - start
+    assert writer.written == PAGES * PER_PAGE
+    return elapsed
+
+
+@pytest.mark.benchmark
+class TestParsePoolBenchmark:
+    """The pool should keep up with in-process parsing, and beat it given spare cores."""
+
+    def test_pool_throughput(self, bodies, tmp_path):
+        with ParsePool(WORKERS) as pool:
+            _timed_run(bodies, tmp_path / "warmup.csv", pool)  # start the workers
+            best_inline = best_pool = float("inf")
+            for i in range(3):
+                best_inline = min(best_inline, _timed_run(bodies, tmp_path / f"a{i}.csv"))
+                best_pool = min(best_pool, _timed_run(bodies, tmp_path / f"b{i}.csv", pool))
+
+        rates = (
+            f"in-process {PAGES / best_inline:.0f} pages/s, "
+            f"{WORKERS} workers {PAGES / best_pool:.0f} pages/s on {os.cpu_count()} CPUs"
+        )
+        assert PAGES / best_pool > 20, rates
+        if (os.cpu_count() or 1) >= 4:
+            assert best_inline / best_pool > 1.2, rates
@@ -0,0 +1,110 @@
+"""Benchmarks for __NEXT_DATA__ extraction (fast scan vs BeautifulSoup)."""
+
+import timeit
+
+import pytest
+
+from tests.fixtures import sample_data
+from yad2_scraper import decoding
+from yad2_scraper.parser import _extract_with_soup, extract_next_data, parse_listings
+
+# Real search pages carry ~hundreds of KB of markup around the script tag.
+FILLER = '<div class="feed-item"><a href="/item/x"><span>פריט</span></a></div>\n' * 2000
+PADDED_HTML = sample_data.SAMPLE_HTML_VALID.replace(
+    '<div id="__next"></div>', f'<div id="__next">{FILLER}</div>'
+)
+
+
+def _best_of(func, html: str, number: int) -> float:
+    return min(timeit.repeat(lambda: func(html), number=number, repeat=5)) / number
+
+
+@pytest.mark.unit
+class TestExtractNextDataInputs:
+    """The benchmarked paths should agree on the benchmark pages."""
+
+    def test_fast_path_matches_soup_on_padded_page(self):
+        assert extract_next_data(PADDED_HTML) == _extract_with_soup(PADDED_HTML)
+
+
+@pytest.mark.benchmark
+class TestExtractNextDataBenchmark:
+    """The regex fast path should beat a full DOM parse by a wide margin."""
+
+    @pytest.mark.parametrize(
+        ("html", "number"),
+        [(sample_data.SAMPLE_HTML_VALID, 200), (PADDED_HTML, 3)],
+        ids=["fixture-page", "padded-page"],
+    )
+    def test_fast_path_speedup(self, html, number):
+        """Fast extraction should be at least 5x quicker than BeautifulSoup."""
+        fast = _best_of(extract_next_data, html, number)
+        soup = _best_of(_extract_with_soup, html, number)
+
+        assert soup / fast > 5, f"fast={fast * 1e6:.1f}µs soup={soup * 1e6:.1f}µs"
+
+
+# A blob shaped like a real page: the feed plus much larger unrelated page props
+NOISY_PAGE = sample_data.create_html_with_next_data(
+    {
+        "props": {
+            "pageProps": {
+                "dehydratedState": {
+                    "queries": [
+                        {
+                            "queryKey": ["feed", "vehicles", "search"],
+                            "state": {
+                                "data": {
+                                    "private": [sample_data.make_listing(i) for i in range(40)],
+                                    "pagination": {"pages": 35, "total": 1347},
+                                }
+                            },
+                        },
+                        *(
+                            {
+                                "queryKey": ["catalog", i],
+                                "state": {"data": {"items": list(range(300))}},
+                            }
+                            for i in range(40)
+                        ),
+                    ]
+                },
+                "translations": {f"key{i}": {"he": "ערך" * 10, "en": "value"} for i in range(3000)},
+            }
+        }
+    }
+)
+
+
+def _with_backend(name, func):
+    previous = decoding.set_backend(name)
+    try:
+        return func()
+    finally:
+        decoding.set_backend(previous.name)
+
+
+@pytest.mark.unit
+class TestJsonBackendInputs:
+    """Every installed backend should parse the benchmark page the same."""
+
+    @pytest.mark.parametrize("name", ["orjson", "msgspec"])
+    def test_backend_matches_stdlib(self, name):
+        if name not in decoding.BACKENDS:
+            pytest.skip(f"{name} is not installed")
+        expected = _with_backend("json", lambda: parse_listings(NOISY_PAGE))
+        assert _with_backend(name, lambda: parse_listings(NOISY_PAGE)) == expected
+
+
+@pytest.mark.benchmark
+class TestJsonBackendBenchmark:
+    """Faster decoders should pay off on large, mostly irrelevant blobs."""
+
+    @pytest.mark.parametrize(("name", "speedup"), [("orjson", 1.3), ("msgspec", 1.5)])
+    def test_backend_beats_stdlib(self, name, speedup):
+        if name not in decoding.BACKENDS:
+            pytest.skip(f"{name} is not installed")
+        stdlib = _with_backend("json", lambda: _best_of(parse_listings, NOISY_PAGE, 10))
+        fast = _with_backend(name, lambda: _best_of(parse_listings, NOISY_PAGE, 10))
+
+        assert stdlib / fast > speedup, f"json={stdlib * 1e3:.2f}ms {name}={fast * 1e3:.2f}ms"
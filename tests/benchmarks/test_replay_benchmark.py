@@ -0,0 +1,38 @@
+"""Offline throughput of the parse → dedupe → write path via --replay."""
+
+import time
+
+import pytest
+
+from tests.fixtures.sample_data import create_feed_html, make_listing
+from yad2_scraper.archive import PageArchive
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.pipeline import Pipeline, run_replay
+
+PAGES = 50
+PER_PAGE = 40
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = PageArchive(tmp_path / "rec")
+    for page in range(1, PAGES + 1):
+        listings = [make_listing(page * PER_PAGE + i) for i in range(PER_PAGE)]
+        archive.save(page, create_feed_html(listings, pages=PAGES))
+    return archive
+
+
+@pytest.mark.benchmark
+class TestReplayBenchmark:
+    """Replay should run far faster than any polite live scrape."""
+
+    def test_replay_throughput(self, archive, tmp_path):
+        """Replaying 50 pages should sustain well over 10 pages/s."""
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            start = time.perf_counter()
+            run_replay(archive, pipeline)
+            elapsed = time.perf_counter() - start
+
+        assert writer.written == PAGES * PER_PAGE
+        assert PAGES / elapsed > 10, f"{PAGES} pages in {elapsed * 1e3:.1f}ms"
@@ -0,0 +1,94 @@
+"""Cold-start import cost of the CLI, measured with ``python -X importtime``."""
+
+import subprocess
+import sys
+
+import pytest
+
+from tests.fixtures.sample_data import create_feed_html, make_listing
+from yad2_scraper.archive import PageArchive
+
+# Only the modes that use them may import these
+NETWORK = ("httpx", "h2", "ssl")
+SLOW_PATHS = ("bs4", "asyncio", "concurrent.futures", "http.server")
+PARSING = ("msgspec", "orjson", "sqlite3")
+
+HELP_BUDGET_MS = 50  # ~15ms on a dev machine; generous for slow CI runners
+
+
+def _importtime(cwd, *argv):
+    """Run the CLI under -X importtime; returns {module: (cumulative µs, depth)}.
+
+    Interpreter startup (site, encodings) is left out: only modules imported
+    once ``python -m yad2_scraper`` starts loading the package are counted.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "yad2_scraper", *argv],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    modules = {}
+    started = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        started = started or name.strip() == "yad2_scraper"
+        if started:
+            modules[name.strip()] = (int(cumulative), len(name) - len(name.lstrip()))
+    return proc, modules
+
+
+def _total_ms(modules):
+    """Sum of the top-level imports' cumulative times."""
+    return sum(us for us, depth in modules.values() if depth == 1) / 1e3
+
+
+@pytest.mark.unit
+class TestStartupImports:
+    """Quick invocations shouldn't import what they never use."""
+
+    def test_help_imports_nothing_heavy(self, tmp_path):
+        proc, modules = _importtime(tmp_path, "--help")
+
+        assert proc.returncode == 0
+        assert not set(NETWORK + SLOW_PATHS + PARSING) & set(modules)
+
+    def test_replay_skips_network_stack(self, tmp_path):
+        archive = PageArchive(tmp_path / "rec")
+        archive.save(1, create_feed_html([make_listing(1)]))
+
+        proc, modules = _importtime(tmp_path, "--replay", "rec", "--output", "out.csv")
+
+        assert proc.returncode == 0, proc.stderr[-2000:]
+        assert (tmp_path / "out.csv").exists()
+        assert not set(NETWORK + SLOW_PATHS) & set(modules)
+        assert "sqlite3" not in modules  # CSV output
+
+    def test_fetcher_modules_defer_network_stack(self):
+        """Only fetching loads httpx, not importing the modules that fetch."""
+        code = "import sys, yad2_scraper.daemon; sys.exit(bool({*%r} & set(sys.modules)))"
+        proc = subprocess.run([sys.executable, "-c", code % (NETWORK,)], check=False)
+        assert proc.returncode == 0
+
+    def test_daemon_imports_lazily(self, tmp_path):
+        """Sanity check that the measurement sees lazily imported modules at all."""
+        proc, modules = _importtime(tmp_path, "--daemon", "--schedule", "61 * * * *")
+
+        assert proc.returncode == 2  # usage error, after the daemon's imports ran
+        assert {"yad2_scraper.daemon", "yad2_scraper.fetcher"} <= set(modules)
+        assert not set(NETWORK) & set(modules)  # no Fetcher built yet
+
+
+@pytest.mark.benchmark
+class TestStartupBenchmark:
+    """--help should stay within its import-time budget."""
+
+    def test_help_import_time(self, tmp_path):
+        proc, modules = _importtime(tmp_path, "--help")
+
+        assert proc.returncode == 0
+        total = _total_ms(modules)
+        assert total < HELP_BUDGET_MS, f"--help imported {len(modules)} modules in {total:.1f}ms"
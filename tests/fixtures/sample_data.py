@@ -214,3 +214,93 @@ SAMPLE_HTML_NO_NEXT_DATA = """<!DOCTYPE html>
     <div id="__next"></div>
 </body>
 </html>"""
+
+
+def make_listing(i):
+    """Synthetic listing with every commonly used field populated."""
+    listing = dict(LISTING_COMPLETE)
+    listing.update(token=f"synthetic-{i}", orderId=str(i), price=str(20000 + i * 100))
+    return listing
+
+
+def create_feed_html(listings, pages=1, total=None):
+    """Search results page carrying ``listings`` and a pagination block."""
+    return create_html_with_next_data(
+        {
+            "props": {
+                "pageProps": {
+                    "dehydratedState": {
+                        "queries": [
+                            {
+                                "queryKey": ["feed", "vehicles", "search"],
+                                "state": {
+                                    "data": {
+                                        "commercial": [],
+                                        "private": listings,
+                                        "pagination": {
+                                            "pages": pages,
+                                            "total": pages * 40 if total is None else total,
+                                        },
+                                    }
+                                },
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+    )
+
+
+def create_detail_html(listing):
+    """A listing's own detail page: the full item in a query of its own."""
+    return create_html_with_next_data(
+        {
+            "props": {
+                "pageProps": {
+                    "dehydratedState": {
+                        "queries": [
+                            {"queryKey": ["user"], "state": {"data": None}},
+                            {
+                                "queryKey": ["item", listing["token"]],
+                                "state": {"data": listing},
+                            },
+                        ]
+                    }
+                }
+            }
+        }
+    )
+
+
+def make_inventory(count):
+    """``count`` synthetic listings spread over years 2020-2023 and prices 20,000-59,900."""
+    inventory = []
+    for i in range(count):
+        listing = make_listing(i)
+        listing["vehicleDates"] = {"yearOfProduction": 2020 + i % 4}
+        listing["price"] = str(20000 + (i * 7919) % 40000 // 100 * 100)
+        inventory.append(listing)
+    return inventory
+
+
+def create_search_html(inventory, params, per_page=40):
+    """Results page for a search over ``inventory``, honouring year/price ranges and page."""
+
+    def in_range(value, key):
+        if key not in params:
+            return True
+        low, _, high = params[key].partition("-")
+        return int(low) <= value <= int(high)
+
+    matches = [
+        listing
+        for listing in inventory
+        if in_range(listing["vehicleDates"]["yearOfProduction"], "year")
+        and in_range(int(listing["price"]), "price")
+    ]
+    page = int(params.get("page", 1))
+    pages = max(1, -(-len(matches) // per_page))
+    return create_feed_html(
+        matches[(page - 1) * per_page : page * per_page], pages=pages, total=len(matches)
+    )
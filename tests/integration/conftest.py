@@ -1,12 +1,19 @@
 """Shared fixtures for integration tests."""
 
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
 
 @pytest.fixture(autouse=True)
 def mock_fetcher_sleep():
-    """Mock time.sleep in fetcher to eliminate real delays in integration tests."""
-    with patch("yad2_scraper.fetcher.time.sleep") as mock_sleep:
+    """Mock time.sleep in the rate limiter to eliminate real delays in integration tests."""
+    with patch("yad2_scraper.ratelimit.time.sleep") as mock_sleep:
+        yield mock_sleep
+
+
+@pytest.fixture(autouse=True)
+def mock_fetcher_async_sleep():
+    """Mock asyncio.sleep in the rate limiter so AsyncFetcher pacing doesn't slow tests."""
+    with patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
         yield mock_sleep
@@ -17,7 +17,7 @@ class TestIssue10VerboseLogging:
         monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
 
         # Mock fetcher and parser to avoid actual HTTP requests
-        with patch("yad2_scraper.__main__.Fetcher") as mock_fetcher_class:
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
             mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
 
@@ -60,7 +60,7 @@ class TestIssue10VerboseLogging:
         monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
 
         # Mock fetcher and parser
-        with patch("yad2_scraper.__main__.Fetcher") as mock_fetcher_class:
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
             mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
 
@@ -111,7 +111,7 @@ class TestCLIArguments:
         """Should parse --max-pages argument correctly."""
         monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
 
-        with patch("yad2_scraper.__main__.Fetcher") as mock_fetcher_class:
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
             mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
 
@@ -165,7 +165,7 @@ class TestLoggingFormat:
         """Should include timestamp in log format."""
         monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
 
-        with patch("yad2_scraper.__main__.Fetcher") as mock_fetcher_class:
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
             mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
 
@@ -201,7 +201,7 @@ class TestLoggingFormat:
         """Default logging level should be INFO."""
         monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
 
-        with patch("yad2_scraper.__main__.Fetcher") as mock_fetcher_class:
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
             mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
 
@@ -243,7 +243,7 @@ class TestCLIExitCodes:
         """Should exit with code 1 when no listings found."""
         monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
 
-        with patch("yad2_scraper.__main__.Fetcher") as mock_fetcher_class:
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
             mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
 
@@ -274,3 +274,24 @@ class TestCLIExitCodes:
                 main(["--max-pages", "1"])
 
             assert exc_info.value.code == 1
+
+
+@pytest.mark.integration
+class TestCacheFlags:
+    """Test --cache-dir / --cache-ttl wiring."""
+
+    def test_cache_flags_build_response_cache(self, tmp_path, monkeypatch):
+        """--cache-dir should hand a ResponseCache with the given TTL to Fetcher."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
+            mock_fetcher = MagicMock()
+            mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
+            mock_fetcher.fetch_page.return_value = "<html></html>"
+
+            with pytest.raises(SystemExit):
+                main(["--cache-dir", str(tmp_path / "cache"), "--cache-ttl", "120"])
+
+            cache = mock_fetcher_class.call_args.kwargs["cache"]
+            assert cache.directory == tmp_path / "cache"
+            assert cache.ttl == 120
@@ -1,13 +1,21 @@
 """Integration tests for end-to-end scraping flow (Issue 1)."""
 
+import csv
 import json
+import os
+import signal
+import sqlite3
+import sys
 from unittest.mock import MagicMock, patch
 
 import httpx
 import pytest
 import respx
 
+from tests.fixtures.sample_data import create_detail_html, create_search_html, make_inventory
 from yad2_scraper.__main__ import main
+from yad2_scraper.config import ADAPTIVE_DECREASE, ADAPTIVE_INCREASE, DEFAULT_SEARCH_PARAMS
+from yad2_scraper.fetcher import Fetcher
 
 
 @pytest.mark.integration
@@ -329,7 +337,7 @@ class TestScrapingEdgeCases:
 </body></html>"""
 
         # Mock Fetcher so first call returns HTML, second raises KeyboardInterrupt
-        with patch("yad2_scraper.__main__.Fetcher") as mock_fetcher_class:
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
             mock_fetcher = MagicMock()
             mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
             mock_fetcher.fetch_page.side_effect = [html, KeyboardInterrupt()]
@@ -384,3 +392,911 @@ class TestPaginationLogic:
 
         # Should fetch pages 1-5
         assert route.call_count == 5
+
+
+def _feed_html(page_param, pages=5):
+    next_data = {
+        "props": {
+            "pageProps": {
+                "dehydratedState": {
+                    "queries": [
+                        {
+                            "queryKey": ["feed", "vehicles", "search"],
+                            "state": {
+                                "data": {
+                                    "commercial": [
+                                        {"token": f"test-{page_param}", "price": "50000"}
+                                    ],
+                                    "private": [],
+                                    "pagination": {"pages": pages, "total": pages * 10},
+                                }
+                            },
+                        }
+                    ]
+                }
+            }
+        }
+    }
+    return f"""<!DOCTYPE html>
+<html><body>
+<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data)}</script>
+</body></html>"""
+
+
+@pytest.mark.integration
+class TestConcurrentFlow:
+    """Test the --concurrency path through AsyncFetcher."""
+
+    @respx.mock
+    def test_concurrent_scrape_fetches_all_pages(self, tmp_path, monkeypatch):
+        """Should fetch page 1, then the remaining pages concurrently."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"])
+            )
+        )
+
+        main(["--concurrency", "3"])
+
+        assert route.call_count == 5
+        csv_files = list(tmp_path.glob("yad2_cars_*.csv"))
+        assert len(csv_files) == 1
+        rows = csv_files[0].read_text(encoding="utf-8-sig").splitlines()
+        assert len(rows) == 6  # header + one listing per page
+
+    @respx.mock
+    def test_concurrent_scrape_with_parse_workers(self, tmp_path, monkeypatch):
+        """--parse-workers should parse in worker processes with the same output."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=6)
+            )
+        )
+
+        main(["--concurrency", "3", "--parse-workers", "2"])
+
+        (output,) = tmp_path.glob("yad2_cars_*.csv")
+        rows = output.read_text(encoding="utf-8-sig").splitlines()
+        assert sorted(row.split(",")[0] for row in rows[1:]) == [f"test-{i}" for i in range(1, 7)]
+
+    @pytest.mark.parametrize(
+        "extra", [["--parse-workers", "2"], ["--parse-workers", "-1", "--concurrency", "2"]]
+    )
+    def test_parse_workers_usage_errors(self, extra):
+        """--parse-workers needs concurrent fetching and a non-negative count."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(extra)
+        assert exc_info.value.code == 2
+
+    @respx.mock
+    def test_concurrent_scrape_respects_max_pages(self, tmp_path, monkeypatch):
+        """--max-pages should cap the concurrent page range."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=50)
+            )
+        )
+
+        main(["--concurrency", "4", "--max-pages", "3"])
+
+        assert route.call_count == 3
+
+    @respx.mock
+    def test_concurrent_scrape_keeps_pages_before_bot_detection(self, tmp_path, monkeypatch):
+        """Bot detection mid-run should stop fetching but export what was collected."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+
+        def respond(request):
+            page = request.url.params["page"]
+            if page == "1":
+                return httpx.Response(200, text=_feed_html(page))
+            return httpx.Response(302, headers={"location": "/bot-check"})
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(side_effect=respond)
+
+        main(["--concurrency", "2"])
+
+        assert len(list(tmp_path.glob("yad2_cars_*.csv"))) == 1
+
+    @respx.mock
+    def test_concurrent_scrape_bot_detection_on_first_page(self, tmp_path, monkeypatch):
+        """Bot detection on page 1 should exit with nothing to export."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(302, headers={"location": "/bot-check"})
+        )
+
+        with pytest.raises(SystemExit):
+            main(["--concurrency", "2"])
+
+    @respx.mock
+    def test_concurrent_scrape_skips_unparseable_pages(self, tmp_path, monkeypatch):
+        """A parse error on a later page should be logged and skipped."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+
+        def respond(request):
+            page = request.url.params["page"]
+            if page == "2":
+                return httpx.Response(200, text="<html>challenge</html>")
+            return httpx.Response(200, text=_feed_html(page, pages=3))
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(side_effect=respond)
+
+        main(["--concurrency", "2"])
+
+        csv_file = next(tmp_path.glob("yad2_cars_*.csv"))
+        assert len(csv_file.read_text(encoding="utf-8-sig").splitlines()) == 3
+
+
+@pytest.mark.integration
+class TestStreamingOutput:
+    """Test that output is written page by page."""
+
+    def test_crash_keeps_pages_already_written(self, tmp_path, monkeypatch):
+        """An unexpected error mid-run should leave earlier pages on disk."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
+            mock_fetcher = MagicMock()
+            mock_fetcher_class.return_value.__enter__.return_value = mock_fetcher
+            mock_fetcher.fetch_page.side_effect = [
+                _feed_html("1"),
+                _feed_html("2"),
+                RuntimeError("connection reset"),
+            ]
+
+            with pytest.raises(RuntimeError):
+                main([])
+
+        csv_file = next(tmp_path.glob("yad2_cars_*.csv"))
+        rows = csv_file.read_text(encoding="utf-8-sig").splitlines()
+        assert len(rows) == 3  # header + pages 1 and 2
+
+
+@pytest.mark.integration
+class TestResume:
+    """Test --resume from a checkpoint after an interrupted run."""
+
+    @respx.mock
+    def test_resume_continues_after_bot_detection(self, tmp_path, monkeypatch):
+        """A resumed run should fetch only the missing pages into the same file."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        blocked = {"3"}
+        fetched = []
+
+        def respond(request):
+            page = request.url.params["page"]
+            fetched.append(page)
+            if page in blocked:
+                return httpx.Response(302, headers={"location": "/bot-check"})
+            return httpx.Response(200, text=_feed_html(page, pages=5))
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(side_effect=respond)
+
+        main([])
+        assert fetched.count("3") == 4  # all retries used
+        checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+        assert checkpoint["completed_pages"] == [1, 2]
+        assert checkpoint["total_pages"] == 5
+        assert sorted(checkpoint["seen_tokens"]) == ["test-1", "test-2"]
+
+        blocked.clear()
+        fetched.clear()
+        main(["--resume"])
+
+        assert fetched == ["3", "4", "5"]
+        csv_files = list(tmp_path.glob("yad2_cars_*.csv"))
+        assert len(csv_files) == 1
+        rows = csv_files[0].read_text(encoding="utf-8-sig").splitlines()
+        assert [row.split(",")[0] for row in rows[1:]] == [f"test-{p}" for p in range(1, 6)]
+
+    @respx.mock
+    def test_resume_concurrent_skips_completed_pages(self, tmp_path, monkeypatch):
+        """Concurrent resume should skip page 1 and any completed pages."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        output = tmp_path / "yad2_cars_20240101_000000.csv"
+        (tmp_path / "checkpoint.json").write_text(
+            json.dumps(
+                {
+                    "params": dict(DEFAULT_SEARCH_PARAMS),
+                    "output_path": str(output),
+                    "total_pages": 4,
+                    "completed_pages": [1, 3],
+                    "seen_tokens": ["test-1", "test-3"],
+                }
+            )
+        )
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=4)
+            )
+        )
+
+        main(["--resume", "--concurrency", "2"])
+
+        pages = sorted(call.request.url.params["page"] for call in route.calls)
+        assert pages == ["2", "4"]
+        assert len(output.read_text(encoding="utf-8-sig").splitlines()) == 3
+
+    def test_resume_without_checkpoint_errors(self, tmp_path, monkeypatch):
+        """--resume with no checkpoint should be a usage error."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--resume"])
+        assert exc_info.value.code == 2
+
+    def test_resume_rejects_corrupt_checkpoint(self, tmp_path):
+        """A corrupt checkpoint should be reported as a usage error."""
+        path = tmp_path / "cp.json"
+        path.write_text("garbage")
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--resume", "--checkpoint", str(path)])
+        assert exc_info.value.code == 2
+
+    def test_resume_rejects_different_search_params(self, tmp_path):
+        """A checkpoint for another search should not be resumed."""
+        path = tmp_path / "cp.json"
+        path.write_text(json.dumps({"params": {"year": "1999"}, "output_path": "x.csv"}))
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--resume", "--checkpoint", str(path)])
+        assert exc_info.value.code == 2
+
+
+@pytest.mark.integration
+class TestRecordReplay:
+    """Test --record followed by an offline --replay."""
+
+    @respx.mock
+    def test_replay_matches_recorded_run_without_network(self, tmp_path, monkeypatch):
+        """A replayed archive should produce the same CSV rows with no requests."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path / "out"))
+        archive_dir = tmp_path / "rec"
+
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=3)
+            )
+        )
+        main(["--record", str(archive_dir)])
+        assert route.call_count == 3
+        (recorded,) = (tmp_path / "out").glob("yad2_cars_*.csv")
+        recorded_text = recorded.read_text(encoding="utf-8-sig")
+        recorded.unlink()
+
+        with patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class:
+            main(["--replay", str(archive_dir)])
+        mock_fetcher_class.assert_not_called()
+        assert route.call_count == 3
+
+        (replayed,) = (tmp_path / "out").glob("yad2_cars_*.csv")
+        assert replayed.read_text(encoding="utf-8-sig") == recorded_text
+
+    def test_replay_of_empty_archive_fails(self, tmp_path, monkeypatch):
+        """Replaying a directory with no pages writes nothing and exits 1."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--replay", str(tmp_path / "empty")])
+        assert exc_info.value.code == 1
+
+    def test_record_and_replay_are_mutually_exclusive(self, tmp_path):
+        """--record and --replay together should be a usage error."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--record", str(tmp_path), "--replay", str(tmp_path)])
+        assert exc_info.value.code == 2
+
+
+@pytest.mark.integration
+class TestParquetOutput:
+    """Test --format parquet end to end."""
+
+    @respx.mock
+    def test_scrape_to_parquet(self, tmp_path, monkeypatch):
+        """A scrape with --format parquet should write one typed row per listing."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=3)
+            )
+        )
+
+        main(["--format", "parquet"])
+
+        (output,) = tmp_path.glob("yad2_cars_*.parquet")
+        table = pq.read_table(output)
+        assert table.column("token").to_pylist() == ["test-1", "test-2", "test-3"]
+        assert table.column("price").to_pylist() == [50000] * 3
+        assert not (tmp_path / "checkpoint.json").exists()
+
+    def test_resume_refused_for_parquet(self, tmp_path):
+        """--resume should be refused for a format that can't be appended to."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--resume", "--format", "parquet", "--checkpoint", str(tmp_path / "cp")])
+        assert exc_info.value.code == 2
+
+    def test_missing_pyarrow_is_a_usage_error(self, tmp_path, monkeypatch):
+        """Without pyarrow, --format parquet should fail before any request."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        monkeypatch.setitem(sys.modules, "yad2_scraper.parquet", None)
+        with (
+            patch("yad2_scraper.fetcher.Fetcher") as mock_fetcher_class,
+            pytest.raises(SystemExit) as exc_info,
+        ):
+            main(["--format", "parquet"])
+        assert exc_info.value.code == 2
+        mock_fetcher_class.assert_not_called()
+
+
+@pytest.mark.integration
+class TestSqliteOutput:
+    """Test --format sqlite across repeat runs."""
+
+    @respx.mock
+    def test_repeat_runs_update_in_place(self, tmp_path, monkeypatch):
+        """Running twice into one database should upsert, not duplicate."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        db = tmp_path / "cars.db"
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=3)
+            )
+        )
+
+        main(["--format", "sqlite", "--output", str(db)])
+        main(["--format", "sqlite", "--output", str(db), "--max-pages", "2"])
+
+        with sqlite3.connect(db) as conn:
+            rows = conn.execute("SELECT token, price FROM listings ORDER BY token").fetchall()
+        assert rows == [("test-1", 50000), ("test-2", 50000), ("test-3", 50000)]
+
+    @respx.mock
+    def test_resume_continues_into_same_database(self, tmp_path, monkeypatch):
+        """--resume should reopen the store named in the checkpoint."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        db = tmp_path / "cars.db"
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=3)
+            )
+        )
+        main(["--format", "sqlite", "--output", str(db), "--max-pages", "2"])
+        main(["--resume"])
+
+        with sqlite3.connect(db) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM listings").fetchone()[0] == 3
+        assert not list(tmp_path.glob("yad2_cars_*.csv"))
+
+    def test_output_conflicts_with_resume(self, tmp_path):
+        """--output with --resume should be a usage error."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--resume", "--output", str(tmp_path / "x.db")])
+        assert exc_info.value.code == 2
+
+    @respx.mock
+    def test_complete_run_records_removals(self, tmp_path, monkeypatch):
+        """Listings missing from a full re-scrape are recorded as removed."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        db = tmp_path / "cars.db"
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=3)
+            )
+        )
+        main(["--format", "sqlite", "--output", str(db)])
+        main(["--format", "sqlite", "--output", str(db), "--max-pages", "2"])
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=2)
+            )
+        )
+        main(["--format", "sqlite", "--output", str(db)])
+
+        with sqlite3.connect(db) as conn:
+            history = conn.execute("SELECT token, change FROM history WHERE change != 'new'")
+            assert history.fetchall() == [("test-3", "removed")]
+
+
+@pytest.mark.integration
+class TestIncremental:
+    """Test --incremental early stopping against a known-token index."""
+
+    def _mock_feed(self, pages=10):
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=pages)
+            )
+        )
+        return route
+
+    @respx.mock
+    def test_second_run_stops_after_known_pages(self, tmp_path, monkeypatch):
+        """With everything known, a rerun should stop after --stop-after pages."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        index = tmp_path / "index.json.gz"
+        route = self._mock_feed()
+
+        main(["--incremental", "--token-index", str(index)])
+        assert route.call_count == 10
+        assert all(call.request.url.params["Order"] == "1" for call in route.calls)
+
+        main(["--incremental", "--token-index", str(index), "--stop-after", "2"])
+        assert route.call_count == 12
+        # Newest-first pages 1-2 aren't pages 1-2 of the search --resume continues
+        assert not (tmp_path / "checkpoint.json").exists()
+
+    @respx.mock
+    def test_new_listings_keep_paging(self, tmp_path, monkeypatch):
+        """Unknown listings on every page mean the whole feed is fetched."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        route = self._mock_feed(pages=4)
+
+        main(["--incremental", "--stop-after", "1"])
+
+        assert route.call_count == 4
+        assert (tmp_path / "token_index.json.gz").exists()
+
+    @pytest.mark.parametrize(
+        "extra",
+        [["--concurrency", "2"], ["--resume"], ["--stop-after", "0"]],
+        ids=["concurrency", "resume", "stop-after"],
+    )
+    def test_incompatible_options(self, tmp_path, extra):
+        """Options that break in-order paging should be usage errors."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--incremental", "--token-index", str(tmp_path / "i"), *extra])
+        assert exc_info.value.code == 2
+
+    def test_corrupt_index_is_usage_error(self, tmp_path):
+        """A damaged token index should stop the run before any request."""
+        index = tmp_path / "index.json.gz"
+        index.write_bytes(b"junk")
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--incremental", "--token-index", str(index)])
+        assert exc_info.value.code == 2
+
+
+@pytest.mark.integration
+class TestBatch:
+    """Test --batch runs over several search profiles."""
+
+    PROFILES = """
+[defaults]
+gearBox = "102"
+
+[profiles.old]
+year = "2010-2012"
+
+[profiles.new]
+year = "2020-2022"
+"""
+
+    @respx.mock
+    def test_profiles_share_one_fetcher_and_dedupe(self, tmp_path, monkeypatch):
+        """One Fetcher serves every profile; overlapping listings are written once."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        profiles = tmp_path / "searches.toml"
+        profiles.write_text(self.PROFILES, encoding="utf-8")
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        # Both searches return the same listing on page 2
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200,
+                text=_feed_html(
+                    request.url.params["year"] + request.url.params["page"]
+                    if request.url.params["page"] == "1"
+                    else "shared",
+                    pages=2,
+                ),
+            )
+        )
+
+        with patch("yad2_scraper.fetcher.Fetcher", wraps=Fetcher) as fetcher_cls:
+            main(["--batch", str(profiles)])
+
+        fetcher_cls.assert_called_once()
+        assert route.call_count == 4
+        assert {call.request.url.params["year"] for call in route.calls} == {
+            "2010-2012",
+            "2020-2022",
+        }
+        old = next(tmp_path.glob("yad2_old_*.csv")).read_text(encoding="utf-8-sig")
+        new = next(tmp_path.glob("yad2_new_*.csv")).read_text(encoding="utf-8-sig")
+        assert "test-shared" in old
+        assert "test-shared" not in new
+        assert "test-2020-20221" in new
+
+    @respx.mock
+    def test_batch_to_sqlite_uses_store_per_profile(self, tmp_path):
+        """--output names the directory holding one database per profile."""
+        profiles = tmp_path / "searches.toml"
+        profiles.write_text(self.PROFILES, encoding="utf-8")
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["year"], pages=1)
+            )
+        )
+
+        main(["--batch", str(profiles), "--format", "sqlite", "--output", str(tmp_path / "db")])
+
+        for name in ("old", "new"):
+            with sqlite3.connect(tmp_path / "db" / f"yad2_{name}.db") as conn:
+                assert conn.execute("SELECT count(*) FROM listings").fetchone() == (1,)
+
+    @respx.mock
+    def test_interrupt_keeps_finished_profiles(self, tmp_path, monkeypatch, caplog):
+        """Ctrl-C in a later profile should keep earlier output and not exit 1."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        profiles = tmp_path / "searches.toml"
+        profiles.write_text(self.PROFILES, encoding="utf-8")
+
+        def respond(request):
+            if request.url.params["year"] != "2010-2012":
+                raise KeyboardInterrupt
+            return httpx.Response(200, text=_feed_html("old", pages=1))
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(side_effect=respond)
+
+        with caplog.at_level("INFO"):
+            main(["--batch", str(profiles)])
+
+        assert "keeping 1 listings written across 2 profiles" in caplog.text
+        assert "test-old" in next(tmp_path.glob("yad2_old_*.csv")).read_text(encoding="utf-8-sig")
+
+    @pytest.mark.parametrize("extra", [["--resume"], ["--incremental"], ["--replay", "pages"]])
+    def test_incompatible_options(self, tmp_path, extra):
+        """Single-search modes should be usage errors with --batch."""
+        profiles = tmp_path / "searches.toml"
+        profiles.write_text(self.PROFILES, encoding="utf-8")
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--batch", str(profiles), *extra])
+        assert exc_info.value.code == 2
+
+    def test_bad_profile_file_is_usage_error(self, tmp_path):
+        """A missing or malformed profile file should stop before any request."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--batch", str(tmp_path / "missing.toml")])
+        assert exc_info.value.code == 2
+
+
+@pytest.mark.integration
+class TestPartition:
+    """Test --partition splitting the default search into sub-queries."""
+
+    def _mock_search(self, inventory):
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=create_search_html(inventory, dict(request.url.params))
+            )
+        )
+        return route
+
+    @pytest.mark.parametrize("concurrency", ["1", "3"])
+    @respx.mock
+    def test_partitioned_scrape_gets_every_listing(self, tmp_path, monkeypatch, concurrency):
+        """The merged sub-queries should hold each listing exactly once."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        route = self._mock_search(make_inventory(400))
+
+        main(["--partition", "--partition-size", "120", "--concurrency", concurrency])
+
+        (output,) = tmp_path.glob("yad2_cars_*.csv")
+        rows = output.read_text(encoding="utf-8-sig").splitlines()[1:]
+        assert len(rows) == 400
+        years = {call.request.url.params["year"] for call in route.calls}
+        assert "2020-2021" in years
+
+    @respx.mock
+    def test_partitioned_sqlite_run_records_removals(self, tmp_path):
+        """A finished partitioned run covers the whole search, so removals count."""
+        db = tmp_path / "cars.db"
+        inventory = make_inventory(200)
+        self._mock_search(inventory)
+        main(["--partition", "--partition-size", "60", "--format", "sqlite", "--output", str(db)])
+
+        respx.clear()
+        self._mock_search(inventory[1:])
+        main(["--partition", "--partition-size", "60", "--format", "sqlite", "--output", str(db)])
+
+        with sqlite3.connect(db) as conn:
+            removed = conn.execute("SELECT token FROM history WHERE change = 'removed'").fetchall()
+        assert removed == [("synthetic-0",)]
+
+    @respx.mock
+    def test_bot_detection_while_planning_exits(self, tmp_path, monkeypatch):
+        """A blocked probe should end the run without output."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(302, headers={"location": "/captcha"})
+        )
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--partition"])
+        assert exc_info.value.code == 1
+
+    @pytest.mark.parametrize(
+        "extra",
+        [
+            ["--resume"],
+            ["--incremental"],
+            ["--max-pages", "2"],
+            ["--record", "pages"],
+            ["--partition-size", "0"],
+            ["--batch", "searches.toml"],
+        ],
+    )
+    def test_incompatible_options(self, extra):
+        """Options tied to a single page chain should be usage errors."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["--partition", *extra])
+        assert exc_info.value.code == 2
+
+
+@pytest.mark.integration
+class TestDaemon:
+    """Test --daemon runs on a schedule over one fetcher."""
+
+    @respx.mock
+    def test_daemon_runs_on_one_fetcher(self, tmp_path):
+        """Each scheduled run is incremental and reuses the same Fetcher."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=2)
+            )
+        )
+
+        with patch("yad2_scraper.fetcher.Fetcher", wraps=Fetcher) as fetcher_cls:
+            main(["--daemon", "--max-runs", "2", "--output", str(tmp_path)])
+
+        fetcher_cls.assert_called_once()
+        assert route.call_count == 4  # two runs of two pages
+        assert all(call.request.url.params["Order"] == "1" for call in route.calls)
+        assert (tmp_path / "yad2_cars_token_index.json.gz").exists()
+        assert list(tmp_path.glob("yad2_cars_*.csv"))
+
+    def test_sigterm_stops_cleanly(self, tmp_path, caplog):
+        """SIGTERM (docker stop) while waiting for the next run exits like Ctrl-C."""
+        previous = signal.getsignal(signal.SIGTERM)
+        with (
+            patch(
+                "yad2_scraper.daemon.time.sleep",
+                side_effect=lambda seconds: os.kill(os.getpid(), signal.SIGTERM),
+            ),
+            caplog.at_level("INFO", logger="yad2_scraper"),
+        ):
+            main(["--daemon", "--output", str(tmp_path)])
+
+        assert "Daemon stopped" in caplog.text
+        assert "Profile cars: 0 runs" in caplog.text
+        assert signal.getsignal(signal.SIGTERM) == previous
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["--daemon", "--concurrency", "2"],
+            ["--daemon", "--resume"],
+            ["--daemon", "--schedule", "61 * * * *"],
+            ["--daemon", "--max-runs", "0"],
+        ],
+        ids=["concurrency", "resume", "bad-schedule", "max-runs"],
+    )
+    def test_usage_errors(self, argv):
+        with pytest.raises(SystemExit) as excinfo:
+            main(argv)
+        assert excinfo.value.code == 2
+
+
+@pytest.mark.integration
+class TestMetrics:
+    """Test the stage timing summary and --metrics-file."""
+
+    @respx.mock
+    def test_metrics_file_per_run(self, tmp_path, monkeypatch, caplog):
+        """Each run should log a timing table and dump its own metrics as JSON."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=3)
+            )
+        )
+        path = tmp_path / "metrics.json"
+
+        with caplog.at_level("INFO", logger="yad2_scraper"):
+            main(["--metrics-file", str(path)])
+            main(["--metrics-file", str(path), "--max-pages", "1"])
+
+        assert caplog.text.count("Stage timings") == 2
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        assert payload["timings"]["fetch_page"]["count"] == 1  # second run only
+        assert {"fetch.sleep", "parse_listings", "parse.decode", "write"} <= set(payload["timings"])
+        assert payload["counters"]["listings"] == 1
+        assert payload["options"]["max_pages"] == 1
+        assert payload["wall_seconds"] > 0
+
+    @respx.mock
+    def test_metrics_textfile(self, tmp_path, monkeypatch):
+        """--metrics-textfile should leave the run's final numbers in Prometheus format."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=2)
+            )
+        )
+        path = tmp_path / "textfile" / "yad2.prom"
+
+        main(["--metrics-textfile", str(path)])
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert "yad2_pages_total 2" in lines
+        assert "yad2_listings_total 2" in lines
+        assert "yad2_rate_limiter_queue_depth 0" in lines
+        assert 'yad2_stage_duration_seconds_count{stage="fetch_page"} 2' in lines
+
+    def test_bad_metrics_listen_is_usage_error(self, capsys):
+        with pytest.raises(SystemExit) as excinfo:
+            main(["--metrics-listen", "localhost:http"])
+        assert excinfo.value.code == 2
+        assert "--metrics-listen" in capsys.readouterr().err
+
+    def test_usage_error_writes_no_metrics(self, tmp_path):
+        path = tmp_path / "metrics.json"
+        with pytest.raises(SystemExit):
+            main(["--metrics-file", str(path), "--parse-workers", "2"])
+        assert not path.exists()
+
+
+@pytest.mark.integration
+class TestAdaptiveRate:
+    """Test --adaptive learning a rate and carrying it across runs."""
+
+    @respx.mock
+    def test_rate_is_learned_across_runs(self, tmp_path, monkeypatch):
+        """A redirect cuts the rate; the next run starts from what was saved."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=[
+                httpx.Response(302, headers={"location": "/bot-check"}),
+                httpx.Response(200, text=_feed_html("1", pages=1)),
+                httpx.Response(200, text=_feed_html("1", pages=1)),
+            ]
+        )
+        state_path = tmp_path / "rate_state.json"
+        state_path.write_text('{"rate": 0.4}', encoding="utf-8")
+
+        main(["--adaptive"])
+        first = json.loads(state_path.read_text(encoding="utf-8"))
+        assert first["ceiling"] == 0.4
+        assert first["rate"] == pytest.approx(0.4 * ADAPTIVE_DECREASE + ADAPTIVE_INCREASE)
+
+        main(["--adaptive", "--rate-state", str(state_path)])
+        second = json.loads(state_path.read_text(encoding="utf-8"))
+        assert second["rate"] == pytest.approx(first["rate"] + ADAPTIVE_INCREASE)
+        assert second["ceiling"] == 0.4
+
+    @pytest.mark.parametrize("content", ["not json", None], ids=["corrupt-state", "with-replay"])
+    def test_usage_errors(self, tmp_path, content):
+        state_path = tmp_path / "rate_state.json"
+        argv = ["--adaptive", "--rate-state", str(state_path)]
+        if content is None:
+            argv += ["--replay", str(tmp_path)]
+        else:
+            state_path.write_text(content, encoding="utf-8")
+        with pytest.raises(SystemExit) as excinfo:
+            main(argv)
+        assert excinfo.value.code == 2
+
+
+@pytest.mark.integration
+class TestIdentities:
+    """Test --identities spreading a scrape over several client identities."""
+
+    @respx.mock
+    def test_pages_spread_over_identities(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        route = respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=4)
+            )
+        )
+        identities = tmp_path / "identities.toml"
+        identities.write_text(
+            # A fixed rate: the default pace's random jitter could reorder the picks
+            "[defaults]\nrate = 0.5\n"
+            '[identities.a]\nheaders = { "User-Agent" = "agent-a" }\n'
+            '[identities.b]\nheaders = { "User-Agent" = "agent-b" }\n',
+            encoding="utf-8",
+        )
+
+        main(["--identities", str(identities)])
+
+        agents = [call.request.headers["User-Agent"] for call in route.calls]
+        assert agents == ["agent-a", "agent-b", "agent-a", "agent-b"]
+        assert list(tmp_path.glob("yad2_cars_*.csv"))
+
+    @pytest.mark.parametrize(
+        ("extra", "content"),
+        [([], None), ([], "[identities]\n"), (["--adaptive"], "[identities.a]\n")],
+        ids=["missing-file", "no-identities", "with-adaptive"],
+    )
+    def test_usage_errors(self, tmp_path, extra, content):
+        path = tmp_path / "identities.toml"
+        if content is not None:
+            path.write_text(content, encoding="utf-8")
+        with pytest.raises(SystemExit) as excinfo:
+            main(["--identities", str(path), *extra])
+        assert excinfo.value.code == 2
+
+
+@pytest.mark.integration
+class TestEnrich:
+    """Test --enrich filling listings from their detail pages."""
+
+    def _mock_site(self, pages):
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=lambda request: httpx.Response(
+                200, text=_feed_html(request.url.params["page"], pages=pages)
+            )
+        )
+
+        def detail(request):
+            token = request.url.path.rpartition("/")[2]
+            item = {"token": token, "metaData": {"financingInfo": {"monthlyPayment": "1500"}}}
+            return httpx.Response(200, text=create_detail_html(item))
+
+        return respx.get(url__startswith="https://www.yad2.co.il/vehicles/item/").mock(
+            side_effect=detail
+        )
+
+    @pytest.mark.parametrize("concurrency", ["1", "2"])
+    @respx.mock
+    def test_detail_fields_written_and_cached(self, tmp_path, monkeypatch, concurrency):
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        details = self._mock_site(pages=3)
+
+        main(["--enrich", "--concurrency", concurrency, "--output", str(tmp_path / "a.csv")])
+        with open(tmp_path / "a.csv", encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert sorted(row["token"] for row in rows) == ["test-1", "test-2", "test-3"]
+        assert {row["monthly_payment"] for row in rows} == {"1500"}
+        assert details.call_count == 3
+
+        # Unchanged listings come from the detail cache on the next run
+        main(["--enrich", "--output", str(tmp_path / "b.csv")])
+        assert details.call_count == 3
+        assert (tmp_path / "detail_cache.json.gz").exists()
+
+    @respx.mock
+    def test_ad_type_filter(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        details = self._mock_site(pages=1)
+
+        main(["--enrich", "private", "--output", str(tmp_path / "a.csv")])
+        assert details.call_count == 0  # the feed's listings are all commercial
+
+    @pytest.mark.parametrize(
+        "extra",
+        [
+            ["--enrich", "vans"],
+            ["--enrich", "--enrich-rps", "0"],
+            ["--enrich", "--enrich-concurrency", "0"],
+            ["--enrich", "--enrich-time", "-1"],
+            ["--enrich", "--partition"],
+            ["--enrich", "--daemon"],
+        ],
+    )
+    def test_usage_errors(self, extra):
+        with pytest.raises(SystemExit) as excinfo:
+            main(extra)
+        assert excinfo.value.code == 2
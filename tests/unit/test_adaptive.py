@@ -0,0 +1,159 @@
+"""Unit tests for AIMD rate control and its persisted state."""
+
+import json
+
+import httpx
+import pytest
+import respx
+
+from yad2_scraper.adaptive import AdaptiveRateLimiter, RateState
+from yad2_scraper.config import (
+    ADAPTIVE_DECREASE,
+    ADAPTIVE_INCREASE,
+    ADAPTIVE_JITTER,
+    ADAPTIVE_MIN_RATE,
+    ADAPTIVE_PROBE_SLOWDOWN,
+    ADAPTIVE_START_RATE,
+    MAX_REQUESTS_PER_SECOND,
+)
+from yad2_scraper.fetcher import Fetcher
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.ratelimit import FakeClock
+
+URL = "https://www.yad2.co.il/vehicles/cars"
+
+
+def _limiter(tmp_path, rate=1.0, ceiling=None, clock=None):
+    state = RateState(tmp_path / "rate_state.json", rate=rate, ceiling=ceiling)
+    return AdaptiveRateLimiter(state, clock=clock or FakeClock())
+
+
+@pytest.mark.unit
+class TestRateState:
+    """Test loading and saving the learned rate."""
+
+    def test_missing_file_starts_at_default(self, tmp_path):
+        state = RateState.load(tmp_path / "rate_state.json")
+        assert state.rate == ADAPTIVE_START_RATE
+        assert state.ceiling is None
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / "nested" / "rate_state.json"
+        RateState(path, rate=0.7, ceiling=1.2).save()
+
+        state = RateState.load(path)
+        assert (state.rate, state.ceiling) == (0.7, 1.2)
+        assert state.updated_at is not None
+        assert list(path.parent.iterdir()) == [path]  # no temp files left behind
+
+    @pytest.mark.parametrize(
+        "content", ["not json", "[]", '{"ceiling": 1}', '{"rate": "fast"}', '{"rate": 0}']
+    )
+    def test_corrupt_file_raises(self, tmp_path, content):
+        path = tmp_path / "rate_state.json"
+        path.write_text(content, encoding="utf-8")
+        with pytest.raises(ValueError, match="Corrupt rate state"):
+            RateState.load(path)
+
+
+@pytest.mark.unit
+class TestAdaptiveRateLimiter:
+    """Test additive increase / multiplicative decrease with a fake clock."""
+
+    def test_starts_from_state_within_bounds(self, tmp_path):
+        assert _limiter(tmp_path, rate=0.5).rate == 0.5
+        assert _limiter(tmp_path, rate=100.0).rate == MAX_REQUESTS_PER_SECOND
+        assert _limiter(tmp_path, rate=0.001).rate == ADAPTIVE_MIN_RATE
+
+    def test_invalid_bounds(self, tmp_path):
+        with pytest.raises(ValueError, match="min_rate"):
+            AdaptiveRateLimiter(RateState(tmp_path / "s.json"), min_rate=2.0, max_rate=1.0)
+
+    def test_fast_responses_increase_additively(self, tmp_path):
+        limiter = _limiter(tmp_path, rate=0.5)
+        for _ in range(10):
+            limiter.on_response(0.2)
+        assert limiter.rate == pytest.approx(0.5 + 10 * ADAPTIVE_INCREASE)
+        assert limiter.jitter == pytest.approx(ADAPTIVE_JITTER / limiter.rate)
+
+    def test_increase_is_capped(self, tmp_path):
+        limiter = _limiter(tmp_path, rate=MAX_REQUESTS_PER_SECOND)
+        limiter.on_response(0.2)
+        assert limiter.rate == MAX_REQUESTS_PER_SECOND
+
+    def test_block_cuts_multiplicatively_and_saves(self, tmp_path):
+        METRICS.reset()
+        limiter = _limiter(tmp_path, rate=1.0)
+        limiter.on_block()
+
+        assert limiter.rate == pytest.approx(ADAPTIVE_DECREASE)
+        assert METRICS.counters["rate_limiter.decreases"] == 1
+        saved = json.loads((tmp_path / "rate_state.json").read_text(encoding="utf-8"))
+        assert saved["rate"] == pytest.approx(ADAPTIVE_DECREASE)
+        assert saved["ceiling"] == 1.0
+        METRICS.reset()
+
+    def test_no_second_cut_for_requests_already_in_flight(self, tmp_path):
+        clock = FakeClock()
+        limiter = _limiter(tmp_path, rate=1.0, clock=clock)
+        limiter.on_block()
+        limiter.on_block()  # sent before the first cut took effect
+        assert limiter.rate == pytest.approx(ADAPTIVE_DECREASE)
+        assert limiter.state.ceiling == 1.0
+
+        clock.advance(1.0 / limiter.rate)
+        limiter.on_block()
+        assert limiter.rate == pytest.approx(ADAPTIVE_DECREASE**2)
+        assert limiter.state.ceiling == pytest.approx(ADAPTIVE_DECREASE)
+
+    def test_cut_stops_at_min_rate(self, tmp_path):
+        clock = FakeClock()
+        limiter = _limiter(tmp_path, rate=ADAPTIVE_MIN_RATE, clock=clock)
+        limiter.on_block()
+        assert limiter.rate == ADAPTIVE_MIN_RATE
+
+    def test_latency_spike_cuts(self, tmp_path):
+        limiter = _limiter(tmp_path, rate=1.0)
+        for _ in range(6):
+            limiter.on_response(0.2)
+        before = limiter.rate
+        limiter.on_response(5.0)
+        assert limiter.rate == pytest.approx(before * ADAPTIVE_DECREASE)
+        assert limiter.state.ceiling is None  # only redirects set the ceiling
+
+    def test_slow_start_is_not_a_spike(self, tmp_path):
+        """The first few responses only establish the baseline."""
+        limiter = _limiter(tmp_path, rate=0.5)
+        limiter.on_response(0.1)
+        limiter.on_response(5.0)
+        assert limiter.rate == pytest.approx(0.5 + 2 * ADAPTIVE_INCREASE)
+
+    def test_probes_slowly_near_the_ceiling(self, tmp_path):
+        limiter = _limiter(tmp_path, rate=0.5, ceiling=1.0)
+        limiter.on_response(0.2)
+        assert limiter.rate == pytest.approx(0.5 + ADAPTIVE_INCREASE)
+
+        limiter = _limiter(tmp_path, rate=0.9, ceiling=1.0)
+        limiter.on_response(0.2)
+        assert limiter.rate == pytest.approx(0.9 + ADAPTIVE_INCREASE / ADAPTIVE_PROBE_SLOWDOWN)
+
+
+@pytest.mark.unit
+class TestFetcherFeedback:
+    """The fetcher should report every response to its limiter."""
+
+    @respx.mock
+    def test_success_and_redirect_feedback(self, tmp_path):
+        respx.get(URL).mock(
+            side_effect=[
+                httpx.Response(302, headers={"location": "/bot-check"}),
+                httpx.Response(200, text="<html>ok</html>"),
+            ]
+        )
+        limiter = _limiter(tmp_path, rate=1.0)
+        with Fetcher(limiter=limiter) as fetcher:
+            assert fetcher.fetch_page(1) == "<html>ok</html>"
+
+        assert limiter.state.ceiling == 1.0
+        assert limiter.rate == pytest.approx(ADAPTIVE_DECREASE + ADAPTIVE_INCREASE)
+        assert limiter.mean_latency is not None
@@ -0,0 +1,37 @@
+"""Unit tests for the raw page archive used by --record / --replay."""
+
+import gzip
+
+import pytest
+
+from yad2_scraper.archive import PageArchive
+
+
+@pytest.mark.unit
+class TestPageArchive:
+    """Test saving, loading and listing archived pages."""
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """A saved text body should load back as the same UTF-8 bytes."""
+        archive = PageArchive(tmp_path / "rec")
+        archive.save(3, "<html>שלום</html>")
+        assert archive.load(3) == "<html>שלום</html>".encode()
+
+    def test_bytes_are_stored_verbatim(self, tmp_path):
+        """Byte bodies should be archived without re-encoding."""
+        archive = PageArchive(tmp_path)
+        path = archive.save(1, b"\xef\xbb\xbf<html/>")
+        assert path.name == "page_0001.html.gz"
+        assert gzip.decompress(path.read_bytes()) == b"\xef\xbb\xbf<html/>"
+
+    def test_pages_sorted_and_ignores_other_files(self, tmp_path):
+        """pages() should list archived numbers in order and skip unrelated files."""
+        archive = PageArchive(tmp_path)
+        for page in (12, 2, 1):
+            archive.save(page, "x")
+        (tmp_path / "notes.txt").write_text("hi")
+        assert archive.pages() == [1, 2, 12]
+
+    def test_missing_directory_has_no_pages(self, tmp_path):
+        """A directory that doesn't exist yet is simply empty."""
+        assert PageArchive(tmp_path / "nope").pages() == []
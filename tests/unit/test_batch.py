@@ -0,0 +1,168 @@
+"""Tests for batch search profiles and the batch runner."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.fixtures.sample_data import create_feed_html, make_listing
+from yad2_scraper.batch import SearchProfile, load_profiles, run_batch
+from yad2_scraper.config import DEFAULT_SEARCH_PARAMS
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.fetcher import Fetcher
+
+PROFILES_TOML = """
+[defaults]
+gearBox = "102"
+
+[profiles.cheap]
+year = "2015-2018"
+price = "0-40000"
+
+[profiles.new-cars]
+year = 2022
+"""
+
+
+@pytest.mark.unit
+class TestLoadProfiles:
+    """Test reading search profiles from TOML and YAML."""
+
+    def test_toml_profiles_merge_defaults(self, tmp_path):
+        """Each profile should be layered over [defaults], with values as strings."""
+        path = tmp_path / "searches.toml"
+        path.write_text(PROFILES_TOML, encoding="utf-8")
+
+        profiles = load_profiles(path)
+
+        assert profiles == [
+            SearchProfile("cheap", {"gearBox": "102", "year": "2015-2018", "price": "0-40000"}),
+            SearchProfile("new-cars", {"gearBox": "102", "year": "2022"}),
+        ]
+
+    def test_missing_defaults_use_default_search(self, tmp_path):
+        """Without [defaults], profiles should override DEFAULT_SEARCH_PARAMS."""
+        path = tmp_path / "searches.toml"
+        path.write_text('[profiles.a]\nyear = "2000-2001"\n', encoding="utf-8")
+
+        (profile,) = load_profiles(path)
+
+        assert profile.params == {**DEFAULT_SEARCH_PARAMS, "year": "2000-2001"}
+
+    def test_schedule_is_not_a_query_param(self, tmp_path):
+        """``schedule`` (from a profile or [defaults]) is kept apart for --daemon."""
+        path = tmp_path / "searches.toml"
+        path.write_text(
+            '[defaults]\nschedule = "@daily"\n'
+            '[profiles.a]\nyear = "2020"\n'
+            '[profiles.b]\nyear = "2021"\nschedule = "*/30 * * * *"\n',
+            encoding="utf-8",
+        )
+
+        assert load_profiles(path) == [
+            SearchProfile("a", {"year": "2020"}, "@daily"),
+            SearchProfile("b", {"year": "2021"}, "*/30 * * * *"),
+        ]
+
+    def test_yaml_profiles(self, tmp_path):
+        """YAML files should load the same layout."""
+        pytest.importorskip("yaml")
+        path = tmp_path / "searches.yaml"
+        path.write_text("defaults: {}\nprofiles:\n  a:\n    price: 1000-2000\n", encoding="utf-8")
+
+        assert load_profiles(path) == [SearchProfile("a", {"price": "1000-2000"})]
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "not = [valid",
+            'year = "2020"',
+            "[profiles]",
+            '[profiles."../etc"]\nyear = "1"',
+            'profiles = { a = "2020" }',
+            'defaults = "x"\n[profiles.a]\nyear = "1"',
+            "[profiles.a]\nschedule = 5",
+        ],
+        ids=[
+            "syntax",
+            "no-profiles",
+            "empty",
+            "bad-name",
+            "not-a-table",
+            "bad-defaults",
+            "bad-schedule",
+        ],
+    )
+    def test_invalid_files_raise_value_error(self, tmp_path, text):
+        """Malformed profile files should raise ValueError naming the file."""
+        path = tmp_path / "searches.toml"
+        path.write_text(text, encoding="utf-8")
+
+        with pytest.raises(ValueError, match="searches.toml"):
+            load_profiles(path)
+
+
+@pytest.mark.unit
+class TestRunBatch:
+    """Test running several profiles through one fetcher."""
+
+    def test_dedupes_across_profiles_with_one_client(self, tmp_path):
+        """Listings found by an earlier profile should not be written again."""
+        feeds = {
+            "a": create_feed_html([make_listing(1), make_listing(2)]),
+            "b": create_feed_html([make_listing(2), make_listing(3)]),
+        }
+        fetcher = MagicMock(spec=Fetcher)
+        views = {}
+
+        def for_search(params):
+            view = MagicMock(spec=Fetcher)
+            view.fetch_page.return_value = feeds[params["name"]]
+            views[params["name"]] = view
+            return view
+
+        fetcher.for_search.side_effect = for_search
+        profiles = [SearchProfile(name, {"name": name}) for name in feeds]
+
+        results = run_batch(
+            fetcher,
+            profiles,
+            lambda profile: CsvWriter(tmp_path / f"{profile.name}.csv"),
+            record_dir=tmp_path / "pages",
+        )
+
+        assert [(r.profile.name, r.written, r.stats.duplicates) for r in results] == [
+            ("a", 2, 0),
+            ("b", 1, 1),
+        ]
+        assert all(r.path.exists() for r in results)
+        assert (tmp_path / "pages" / "b" / "page_0001.html.gz").exists()
+        fetcher.close.assert_not_called()
+
+    def test_writer_closed_when_profile_fails(self, tmp_path):
+        """An exception mid-profile should still close that profile's writer."""
+        fetcher = MagicMock(spec=Fetcher)
+        fetcher.for_search.return_value.fetch_page.side_effect = KeyboardInterrupt
+        writer = MagicMock()
+
+        with pytest.raises(KeyboardInterrupt):
+            run_batch(fetcher, [SearchProfile("a", {})], lambda profile: writer)
+
+        writer.close.assert_called_once()
+
+    def test_results_collected_before_interrupt(self, tmp_path):
+        """Profiles finished before an interrupt, and the partial one, stay in ``results``."""
+        fetcher = MagicMock(spec=Fetcher)
+        view = fetcher.for_search.return_value
+        view.fetch_page.side_effect = [create_feed_html([make_listing(1)]), KeyboardInterrupt]
+        results = []
+
+        with pytest.raises(KeyboardInterrupt):
+            run_batch(
+                fetcher,
+                [SearchProfile("a", {}), SearchProfile("b", {})],
+                lambda profile: CsvWriter(tmp_path / f"{profile.name}.csv"),
+                max_pages=1,
+                results=results,
+            )
+
+        assert [(r.profile.name, r.written) for r in results] == [("a", 1), ("b", 0)]
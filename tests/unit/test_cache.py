@@ -0,0 +1,223 @@
+"""Unit tests for the on-disk response cache."""
+
+import asyncio
+import random
+
+import httpx
+import pytest
+import respx
+
+from yad2_scraper.cache import ResponseCache, normalize_url
+from yad2_scraper.fetcher import AsyncFetcher, Fetcher
+from yad2_scraper.ratelimit import FakeClock, RateLimiter
+
+URL = "https://www.yad2.co.il/vehicles/cars?year=2020-2023&page=1"
+
+
+@pytest.mark.unit
+class TestNormalizeUrl:
+    """Test cache key normalization."""
+
+    def test_query_order_and_host_case_ignored(self):
+        """Equivalent URLs should normalize to the same key."""
+        assert normalize_url("https://WWW.Yad2.co.il/cars?b=2&a=1") == normalize_url(
+            "https://www.yad2.co.il/cars?a=1&b=2"
+        )
+
+    def test_commas_stay_literal(self):
+        """Commas in values should not be percent-encoded."""
+        assert "engineType=1101,1102" in normalize_url("https://x/cars?engineType=1101,1102")
+
+
+@pytest.mark.unit
+class TestResponseCache:
+    """Test storage, TTL and eviction."""
+
+    def test_miss_then_hit(self, tmp_path):
+        """A stored page should be returned fresh within the TTL."""
+        cache = ResponseCache(tmp_path, ttl=60, clock=FakeClock(1000.0))
+        assert cache.get(URL) is None
+
+        cache.put(URL, "<html>שלום</html>", etag='"v1"')
+        entry = cache.get(URL)
+
+        assert entry is not None
+        assert entry.fresh
+        assert entry.text == "<html>שלום</html>"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_bodies_are_compressed(self, tmp_path):
+        """Bodies should be stored gzip-compressed."""
+        cache = ResponseCache(tmp_path, ttl=60)
+        cache.put(URL, "x" * 10_000)
+        (body,) = tmp_path.glob("*.html.gz")
+        assert body.read_bytes()[:2] == b"\x1f\x8b"
+        assert body.stat().st_size < 1000
+
+    def test_entry_goes_stale_after_ttl(self, tmp_path):
+        """Entries past the TTL should come back stale with their validators."""
+        clock = FakeClock(1000.0)
+        cache = ResponseCache(tmp_path, ttl=60, clock=clock)
+        cache.put(URL, "old", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        clock.advance(61)
+
+        entry = cache.get(URL)
+        assert entry is not None
+        assert not entry.fresh
+        assert entry.conditional_headers() == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+        }
+
+    def test_refresh_restarts_ttl(self, tmp_path):
+        """refresh() should make a stale entry fresh again."""
+        clock = FakeClock(1000.0)
+        cache = ResponseCache(tmp_path, ttl=60, clock=clock)
+        cache.put(URL, "body")
+        clock.advance(120)
+        cache.refresh(URL)
+
+        entry = cache.get(URL)
+        assert entry is not None
+        assert entry.fresh
+        assert cache.revalidated == 1
+
+    def test_lru_eviction_respects_size_cap(self, tmp_path):
+        """The least recently used entries should be evicted past max_bytes."""
+        clock = FakeClock(1000.0)
+        cache = ResponseCache(tmp_path, ttl=3600, max_bytes=2500, clock=clock)
+        urls = [f"https://x/cars?page={i}" for i in range(3)]
+        for url in urls:
+            # Random hex so gzip can't shrink it much below 1KB
+            cache.put(url, random.Random(url).randbytes(1000).hex())
+            clock.advance(1)
+        assert cache.get(urls[0]) is None  # evicted once the third entry went in
+
+        clock.advance(1)
+        cache.get(urls[1])  # touch: now most recently used
+        clock.advance(1)
+        cache.put("https://x/cars?page=9", "y" * 10)
+        assert cache.get(urls[1]) is not None
+
+    def test_puts_only_rescan_to_evict(self, tmp_path, monkeypatch):
+        """The directory should be scanned once up front, then only when over the cap."""
+        cache = ResponseCache(tmp_path, ttl=3600, max_bytes=2500)
+        scans = []
+        bodies = ResponseCache._bodies
+        monkeypatch.setattr(ResponseCache, "_bodies", lambda self: scans.append(1) or bodies(self))
+
+        for i in range(3):
+            cache.put(URL, random.Random(i).randbytes(1000).hex())  # same entry, replaced
+        assert len(scans) == 1
+        cache.put("https://x/cars?page=2", random.Random(9).randbytes(1000).hex())
+        cache.put("https://x/cars?page=3", random.Random(8).randbytes(1000).hex())
+        assert len(scans) == 2  # the third body pushed it over 2500 bytes
+        assert cache.get(URL) is None
+
+    def test_refresh_of_evicted_entry_is_a_no_op(self, tmp_path):
+        """An entry evicted between get() and the 304 shouldn't make refresh() raise."""
+        cache = ResponseCache(tmp_path, ttl=60)
+        cache.put(URL, "body")
+        for path in tmp_path.iterdir():
+            path.unlink()
+
+        cache.refresh(URL)
+        assert cache.revalidated == 0
+        assert cache.get(URL) is None
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        """Unreadable entries should be treated as misses."""
+        cache = ResponseCache(tmp_path, ttl=60)
+        cache.put(URL, "body")
+        (body,) = tmp_path.glob("*.html.gz")
+        body.write_bytes(b"not gzip")
+        assert cache.get(URL) is None
+
+
+@pytest.mark.unit
+class TestFetcherCache:
+    """Test cache integration in Fetcher and AsyncFetcher."""
+
+    @respx.mock
+    def test_fresh_hit_skips_network_and_limiter(self, tmp_path):
+        """A fresh hit should neither send a request nor wait for a token."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(return_value=httpx.Response(200, text="<html>1</html>"))
+        clock = FakeClock()
+        cache = ResponseCache(tmp_path, ttl=60)
+
+        fetcher = Fetcher(limiter=RateLimiter(0.2, clock=clock), cache=cache)
+        assert fetcher.fetch_page(1) == "<html>1</html>"
+        assert fetcher.fetch_page(1) == "<html>1</html>"
+
+        assert route.call_count == 1
+        assert clock.sleeps == []
+
+    @respx.mock
+    def test_stale_entry_revalidates_with_304(self, tmp_path):
+        """A stale entry should be revalidated and reused on 304."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=[
+                httpx.Response(200, text="<html>v1</html>", headers={"ETag": '"v1"'}),
+                httpx.Response(304),
+            ]
+        )
+        clock = FakeClock(1000.0)
+        cache = ResponseCache(tmp_path, ttl=60, clock=clock)
+        fetcher = Fetcher(limiter=RateLimiter(1.0, clock=FakeClock()), cache=cache)
+
+        fetcher.fetch_page(1)
+        clock.advance(61)
+        assert fetcher.fetch_page(1) == "<html>v1</html>"
+
+        assert route.calls.last.request.headers["If-None-Match"] == '"v1"'
+        assert cache.revalidated == 1
+
+    @respx.mock
+    def test_stale_entry_replaced_on_200(self, tmp_path):
+        """A changed page should replace the stale cache entry."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=[
+                httpx.Response(200, text="v1", headers={"Last-Modified": "yesterday"}),
+                httpx.Response(200, text="v2"),
+            ]
+        )
+        clock = FakeClock(1000.0)
+        cache = ResponseCache(tmp_path, ttl=60, clock=clock)
+        fetcher = Fetcher(limiter=RateLimiter(1.0, clock=FakeClock()), cache=cache)
+
+        fetcher.fetch_page(1)
+        clock.advance(61)
+        assert fetcher.fetch_page(1) == "v2"
+        assert route.calls.last.request.headers["If-Modified-Since"] == "yesterday"
+        assert cache.get(str(route.calls.last.request.url)).text == "v2"
+
+    @respx.mock
+    def test_async_fetcher_uses_cache(self, tmp_path):
+        """AsyncFetcher should serve fresh hits and revalidate stale ones."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=[
+                httpx.Response(200, text="v1", headers={"ETag": '"v1"'}),
+                httpx.Response(304),
+            ]
+        )
+        clock = FakeClock(1000.0)
+        cache = ResponseCache(tmp_path, ttl=60, clock=clock)
+        limiter_clock = FakeClock()
+
+        async def go():
+            async with AsyncFetcher(
+                limiter=RateLimiter(1.0, clock=limiter_clock), cache=cache
+            ) as fetcher:
+                first = await fetcher.fetch_page(1)
+                hit = await fetcher.fetch_page(1)
+                clock.advance(61)
+                revalidated = await fetcher.fetch_page(1)
+                return first, hit, revalidated
+
+        assert asyncio.run(go()) == ("v1", "v1", "v1")
+        assert route.call_count == 2
+        assert cache.revalidated == 1
@@ -0,0 +1,65 @@
+"""Unit tests for row fingerprints and change classification."""
+
+import pytest
+
+from yad2_scraper.changes import ChangeSet, PriceChange, change_kind, fingerprint
+from yad2_scraper.models import CarListing
+
+
+def _fp(**kwargs):
+    (values,) = CarListing.rows([CarListing(**kwargs)])
+    return fingerprint(values)
+
+
+@pytest.mark.unit
+class TestFingerprint:
+    """Test per-row fingerprints."""
+
+    def test_stable_and_field_sensitive(self):
+        """Equal rows hash equal; any tracked field change alters the hash."""
+        assert _fp(token="a", price=1) == _fp(token="a", price=1)
+        assert _fp(token="a", price=1) != _fp(token="a", price=2)
+        assert _fp(token="a", area="x") != _fp(token="a", area="y")
+
+    def test_ignores_feed_priority(self):
+        """A listing moving in the feed ranking isn't a change to the car."""
+        assert _fp(token="a", priority="1") == _fp(token="a", priority="9")
+
+    def test_ignores_detail_fields(self):
+        """An enriched row should hash the same as its feed row."""
+        assert _fp(token="a", monthly_payment="1500", listing_source="x") == _fp(token="a")
+
+    def test_fits_sqlite_integer(self):
+        """Fingerprints are signed 64-bit ints."""
+        assert -(2**63) <= _fp(token="a") < 2**63
+
+
+@pytest.mark.unit
+class TestChangeKind:
+    """Test classifying a row against the stored row it replaces."""
+
+    @pytest.mark.parametrize(
+        ("before", "fp", "price", "kind"),
+        [
+            (None, 1, 100, "new"),
+            ((1, 100), 1, 100, None),
+            ((1, 100), 2, 90, "price"),
+            ((1, 100), 2, 100, "updated"),
+        ],
+    )
+    def test_kinds(self, before, fp, price, kind):
+        assert change_kind(before, fp, price) == kind
+
+    def test_rows_without_fingerprint_only_report_price_changes(self):
+        """Legacy rows (no fingerprint) shouldn't all show up as updated."""
+        assert change_kind((None, 100), 1, 100) is None
+        assert change_kind((None, 100), 2, 80) == "price"
+
+    def test_delta_unknown_when_price_missing(self):
+        """A price appearing or disappearing has no numeric delta."""
+        assert PriceChange("b", 100, 80).delta == -20
+        assert PriceChange("a", None, 100).delta is None
+
+    def test_empty_change_set_is_falsy(self):
+        assert not ChangeSet()
+        assert ChangeSet(returned=["a"])
@@ -0,0 +1,90 @@
+"""Unit tests for resumable scrape checkpoints."""
+
+import json
+
+import pytest
+
+from yad2_scraper.checkpoint import Checkpoint
+
+
+def _checkpoint(tmp_path, **kwargs):
+    return Checkpoint(
+        path=tmp_path / "checkpoint.json",
+        params={"year": "2020-2023"},
+        output_path=str(tmp_path / "out.csv"),
+        **kwargs,
+    )
+
+
+@pytest.mark.unit
+class TestCheckpoint:
+    """Test checkpoint persistence."""
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """A saved checkpoint should load back identically."""
+        checkpoint = _checkpoint(
+            tmp_path,
+            output_format="sqlite",
+            total_pages=10,
+            completed_pages={1, 2, 4},
+            seen_tokens={"a", "b"},
+        )
+        checkpoint.save()
+
+        loaded = Checkpoint.load(checkpoint.path)
+        assert loaded == checkpoint
+
+    def test_save_replaces_atomically(self, tmp_path):
+        """Saving should leave exactly one file behind, with no temp files."""
+        checkpoint = _checkpoint(tmp_path)
+        checkpoint.save()
+        checkpoint.mark_done(1, 5)
+        checkpoint.save()
+
+        assert [p.name for p in tmp_path.iterdir()] == ["checkpoint.json"]
+        assert json.loads(checkpoint.path.read_text())["completed_pages"] == [1]
+
+    def test_failed_save_keeps_previous_file(self, tmp_path, monkeypatch):
+        """If writing fails, the old checkpoint should be untouched."""
+        checkpoint = _checkpoint(tmp_path, completed_pages={1})
+        checkpoint.save()
+
+        def boom(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("yad2_scraper.checkpoint.os.replace", boom)
+        checkpoint.mark_done(2, 5)
+        with pytest.raises(OSError):
+            checkpoint.save()
+
+        assert Checkpoint.load(checkpoint.path).completed_pages == {1}
+        assert [p.name for p in tmp_path.iterdir()] == ["checkpoint.json"]
+
+    def test_next_page_is_first_gap(self, tmp_path):
+        """next_page should be the lowest page number not yet completed."""
+        assert _checkpoint(tmp_path).next_page == 1
+        assert _checkpoint(tmp_path, completed_pages={1, 2, 4}).next_page == 3
+
+    def test_mark_done_keeps_known_total(self, tmp_path):
+        """mark_done with no total should not clear a known total_pages."""
+        checkpoint = _checkpoint(tmp_path, total_pages=7)
+        checkpoint.mark_done(3, None)
+        assert checkpoint.total_pages == 7
+        assert 3 in checkpoint.completed_pages
+
+    def test_load_corrupt_raises_value_error(self, tmp_path):
+        """Unreadable checkpoints should raise ValueError."""
+        path = tmp_path / "checkpoint.json"
+        path.write_text("{not json")
+        with pytest.raises(ValueError, match="Corrupt checkpoint"):
+            Checkpoint.load(path)
+
+        path.write_text("{}")
+        with pytest.raises(ValueError, match="Corrupt checkpoint"):
+            Checkpoint.load(path)
+
+    def test_load_defaults_to_csv_format(self, tmp_path):
+        """Checkpoints written before formats existed should resume as CSV."""
+        path = tmp_path / "checkpoint.json"
+        path.write_text(json.dumps({"params": {}, "output_path": "out.csv"}))
+        assert Checkpoint.load(path).output_format == "csv"
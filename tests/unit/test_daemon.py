@@ -0,0 +1,144 @@
+"""Tests for the --daemon scheduler loop."""
+
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from tests.fixtures.sample_data import create_feed_html, make_listing
+from yad2_scraper.batch import SearchProfile
+from yad2_scraper.config import NEWEST_FIRST_PARAMS
+from yad2_scraper.daemon import Job, run_daemon, run_job
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.fetcher import Fetcher
+from yad2_scraper.incremental import TokenIndex
+from yad2_scraper.schedule import CronSchedule
+
+
+class _Clock:
+    """datetime.now stand-in advanced by the patched sleep."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+def _job(tmp_path, name, schedule):
+    index = TokenIndex(tmp_path / f"{name}.json.gz")
+    return Job(SearchProfile(name, {"name": name}), CronSchedule.parse(schedule), index)
+
+
+def _fetcher(feeds):
+    """Fetcher whose views serve one feed per profile; the views are kept in ``.views``."""
+    fetcher = MagicMock(spec=Fetcher)
+    fetcher.views = []
+
+    def for_search(params):
+        view = MagicMock(spec=Fetcher)
+        view.fetch_page.side_effect = lambda page: feeds[params["name"]]
+        fetcher.views.append(view)
+        return view
+
+    fetcher.for_search.side_effect = for_search
+    return fetcher
+
+
+@pytest.mark.unit
+class TestRunJob:
+    """Test one incremental run of a profile."""
+
+    def test_run_is_incremental_and_saves_index(self, tmp_path):
+        """Runs page newest first and record every listing in the profile's index."""
+        job = _job(tmp_path, "a", "@hourly")
+        fetcher = _fetcher({"a": create_feed_html([make_listing(1), make_listing(2)])})
+
+        pipeline = run_job(fetcher, job, CsvWriter(tmp_path / "a.csv"))
+
+        params = fetcher.for_search.call_args.args[0]
+        assert params == {"name": "a", **NEWEST_FIRST_PARAMS}
+        assert pipeline.sink.written == 2
+        assert (job.runs, job.written) == (1, 2)
+        assert set(TokenIndex.load(job.index.path).fingerprints) == {"synthetic-1", "synthetic-2"}
+
+    def test_network_error_ends_only_the_run(self, tmp_path):
+        job = _job(tmp_path, "a", "@hourly")
+        fetcher = MagicMock(spec=Fetcher)
+        fetcher.for_search.return_value.fetch_page.side_effect = httpx.ConnectError("down")
+        writer = MagicMock()
+        writer.written = 0
+
+        run_job(fetcher, job, writer)
+
+        writer.close.assert_called_once()
+        assert job.index.path.exists()
+        assert job.runs == 1
+
+
+@pytest.mark.unit
+class TestRunDaemon:
+    """Test the scheduling loop with a fake clock."""
+
+    def test_runs_jobs_when_due_over_one_fetcher(self, tmp_path):
+        clock = _Clock(datetime(2024, 3, 13, 10, 50))
+        jobs = [_job(tmp_path, "hourly", "0 * * * *"), _job(tmp_path, "half", "*/30 * * * *")]
+        fetcher = _fetcher(
+            {
+                "hourly": create_feed_html([make_listing(1)]),
+                "half": create_feed_html([make_listing(2)]),
+            }
+        )
+        started = []
+
+        def open_writer(profile):
+            started.append((profile.name, clock()))
+            return CsvWriter(tmp_path / f"{profile.name}_{len(started)}.csv")
+
+        with patch("yad2_scraper.daemon.time.sleep", side_effect=clock.sleep):
+            run_daemon(fetcher, jobs, open_writer, clock=clock, max_runs=4)
+
+        assert started == [
+            ("hourly", datetime(2024, 3, 13, 11, 0)),
+            ("half", datetime(2024, 3, 13, 11, 0)),
+            ("half", datetime(2024, 3, 13, 11, 30)),
+            ("hourly", datetime(2024, 3, 13, 12, 0)),
+        ]
+        assert [job.runs for job in jobs] == [2, 2]
+        fetcher.close.assert_not_called()
+
+    def test_index_stays_loaded_between_runs(self, tmp_path):
+        """A second run stops sooner: the first run's listings are already known."""
+        clock = _Clock(datetime(2024, 3, 13, 10, 59))
+        job = _job(tmp_path, "a", "* * * * *")
+        fetcher = _fetcher({"a": create_feed_html([make_listing(1)], pages=5)})
+
+        def open_writer(profile):
+            return CsvWriter(tmp_path / "a.csv")
+
+        with patch("yad2_scraper.daemon.time.sleep", side_effect=clock.sleep):
+            run_daemon(fetcher, [job], open_writer, stop_after=2, clock=clock, max_runs=2)
+
+        assert [view.fetch_page.call_count for view in fetcher.views] == [3, 2]
+        assert len(job.index) == 1
+
+    def test_missed_slots_are_skipped(self, tmp_path):
+        """A run that overruns the next slot doesn't queue catch-up runs."""
+        clock = _Clock(datetime(2024, 3, 13, 10, 59))
+        job = _job(tmp_path, "a", "* * * * *")
+        fetcher = _fetcher({"a": create_feed_html([make_listing(1)])})
+        started = []
+
+        def open_writer(profile):
+            started.append(clock())
+            clock.sleep(150)  # the run takes 2.5 minutes
+            return CsvWriter(tmp_path / "a.csv")
+
+        with patch("yad2_scraper.daemon.time.sleep", side_effect=clock.sleep):
+            run_daemon(fetcher, [job], open_writer, clock=clock, max_runs=2)
+
+        assert started == [datetime(2024, 3, 13, 11, 0), datetime(2024, 3, 13, 11, 3)]
@@ -0,0 +1,102 @@
+"""Unit tests for the pluggable __NEXT_DATA__ JSON backends."""
+
+import json
+
+import pytest
+
+from tests.fixtures.sample_data import (
+    NEXT_DATA_WITH_ALL_ARRAYS,
+    SAMPLE_HTML_MALFORMED_JSON,
+    create_html_with_next_data,
+)
+from yad2_scraper import decoding
+from yad2_scraper.decoding import BACKENDS, JsonBackend, SchemaMismatchError, set_backend
+from yad2_scraper.parser import extract_feed_data, extract_next_data, parse_listings
+
+NOISY_NEXT_DATA = {
+    "props": {
+        "pageProps": {
+            "dehydratedState": {
+                "queries": [
+                    {"queryKey": ["user"], "state": {"data": [1, {"deep": [None] * 50}]}},
+                    *NEXT_DATA_WITH_ALL_ARRAYS["props"]["pageProps"]["dehydratedState"]["queries"],
+                ]
+            },
+            "translations": {f"key{i}": "value" * 20 for i in range(200)},
+        },
+        "__N_SSP": True,
+    },
+    "page": "/vehicles/cars",
+    "buildId": "abc",
+}
+
+
+@pytest.fixture(params=["json", "orjson", "msgspec"])
+def backend(request):
+    """Run the test once per installed backend, restoring the default after."""
+    if request.param not in BACKENDS:
+        pytest.skip(f"{request.param} is not installed")
+    previous = set_backend(request.param)
+    yield BACKENDS[request.param]
+    set_backend(previous.name)
+
+
+@pytest.mark.unit
+class TestBackends:
+    """Every backend should parse pages exactly like the stdlib."""
+
+    def test_parse_matches_stdlib(self, backend):
+        html = create_html_with_next_data(NOISY_NEXT_DATA)
+        expected = json.loads(json.dumps(NOISY_NEXT_DATA))
+        assert extract_next_data(html) == expected
+        assert extract_next_data(html.encode()) == expected
+        result = parse_listings(html)
+        assert len(result.listings) == 5
+        assert (
+            result.total_pages
+            == NEXT_DATA_WITH_ALL_ARRAYS["props"]["pageProps"]["dehydratedState"]["queries"][0][
+                "state"
+            ]["data"]["pagination"]["pages"]
+        )
+
+    def test_feed_data_only(self, backend):
+        """extract_feed_data should return the feed query's state.data."""
+        html = create_html_with_next_data(NOISY_NEXT_DATA)
+        queries = NOISY_NEXT_DATA["props"]["pageProps"]["dehydratedState"]["queries"]
+        assert extract_feed_data(html) == queries[1]["state"]["data"]
+
+    def test_no_feed_query(self, backend):
+        """Pages without a feed query should give None, not an error."""
+        html = create_html_with_next_data({"props": {"pageProps": {}}})
+        assert extract_feed_data(html) is None
+        assert parse_listings(html).listings == []
+
+    def test_malformed_json_is_json_decode_error(self, backend):
+        """Decode errors should surface as json.JSONDecodeError whatever the backend."""
+        with pytest.raises(json.JSONDecodeError):
+            extract_next_data(SAMPLE_HTML_MALFORMED_JSON)
+        with pytest.raises(json.JSONDecodeError):
+            parse_listings(SAMPLE_HTML_MALFORMED_JSON)
+
+
+@pytest.mark.unit
+class TestBackendSelection:
+    """Test choosing between installed backends."""
+
+    def test_default_is_first_installed(self):
+        expected = next(name for name in ("msgspec", "orjson", "json") if name in BACKENDS)
+        assert decoding.get_backend().name == expected
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError, match="not available"):
+            set_backend("simdjson")
+
+    def test_schema_mismatch_falls_back_to_full_tree(self, monkeypatch):
+        """A typed decoder that can't handle the shape should defer to loads()."""
+
+        def loads_feed(blob):
+            raise SchemaMismatchError("unexpected shape")
+
+        monkeypatch.setattr(decoding, "_backend", JsonBackend("typed", json.loads, loads_feed))
+        html = create_html_with_next_data(NOISY_NEXT_DATA)
+        assert len(parse_listings(html).listings) == 5
@@ -0,0 +1,185 @@
+"""Unit tests for detail-page enrichment and its cache."""
+
+import gzip
+import threading
+
+import httpx
+import pytest
+import respx
+
+from tests.fixtures.sample_data import create_detail_html, create_feed_html, make_listing
+from yad2_scraper.config import DETAIL_URL
+from yad2_scraper.enrich import DetailCache, Enricher
+from yad2_scraper.fetcher import Fetcher
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.parser import parse_listings
+from yad2_scraper.ratelimit import FakeClock, RateLimiter
+
+
+def _detail(item, monthly="1500"):
+    """Detail page for a feed item, with the financing the feed left out."""
+    detail = {**item, "metaData": {**item["metaData"], "financingInfo": {}}}
+    detail["metaData"]["financingInfo"]["monthlyPayment"] = monthly
+    return create_detail_html(detail)
+
+
+def _listings(items):
+    return parse_listings(create_feed_html(items)).listings
+
+
+def _enricher(tmp_path, clock=None, **kwargs):
+    fetcher = Fetcher(limiter=RateLimiter(1.0, clock=FakeClock()))
+    cache = DetailCache(tmp_path / "detail_cache.json.gz")
+    return Enricher(fetcher, cache, clock=clock or FakeClock(), **kwargs)
+
+
+@pytest.mark.unit
+class TestDetailCache:
+    """Test persisting detail fields between runs."""
+
+    def test_round_trip(self, tmp_path):
+        cache = DetailCache(tmp_path / "detail.json.gz")
+        cache.put("a", 7, {"monthly_payment": "1500"})
+        cache.save()
+
+        loaded = DetailCache.load(cache.path)
+        assert len(loaded) == 1
+        assert loaded.get("a", 7) == {"monthly_payment": "1500"}
+        assert loaded.get("a", 8) is None  # the listing changed since
+        assert loaded.get("b", 7) is None
+
+    def test_missing_file_is_empty(self, tmp_path):
+        assert len(DetailCache.load(tmp_path / "nope.json.gz")) == 0
+
+    @pytest.mark.parametrize("content", [b"not gzip", gzip.compress(b'{"a": 1}')])
+    def test_corrupt_file_raises(self, tmp_path, content):
+        path = tmp_path / "detail.json.gz"
+        path.write_bytes(content)
+        with pytest.raises(ValueError, match="Corrupt detail cache"):
+            DetailCache.load(path)
+
+
+@pytest.mark.unit
+class TestEnricher:
+    """Test fetching, caching and skipping detail pages."""
+
+    @respx.mock
+    def test_fills_fields_and_reuses_cache(self, tmp_path):
+        items = [make_listing(i) for i in range(3)]
+        routes = [
+            respx.get(DETAIL_URL.format(token=item["token"])).mock(
+                return_value=httpx.Response(200, text=_detail(item))
+            )
+            for item in items
+        ]
+        with _enricher(tmp_path) as enricher:
+            listings = _listings(items)
+            enricher.enrich(listings)
+            assert [listing.monthly_payment for listing in listings] == ["1500"] * 3
+
+            # A later page repeating unchanged listings is filled from the cache
+            again = _listings(items)
+            enricher.enrich(again)
+            assert [listing.monthly_payment for listing in again] == ["1500"] * 3
+
+        assert [route.call_count for route in routes] == [1, 1, 1]
+        assert (enricher.fetched, enricher.cached) == (3, 3)
+        assert len(DetailCache.load(enricher.cache.path)) == 3
+
+    @respx.mock
+    def test_changed_listing_is_refetched(self, tmp_path):
+        item = make_listing(0)
+        route = respx.get(DETAIL_URL.format(token=item["token"])).mock(
+            side_effect=[
+                httpx.Response(200, text=_detail(item, monthly="1500")),
+                httpx.Response(200, text=_detail(item, monthly="900")),
+            ]
+        )
+        with _enricher(tmp_path) as enricher:
+            enricher.enrich(_listings([item]))
+            changed = _listings([{**item, "price": "19000"}])
+            enricher.enrich(changed)
+
+        assert route.call_count == 2
+        assert changed[0].monthly_payment == "900"
+
+    @respx.mock
+    def test_select_limits_fetched_listings(self, tmp_path):
+        items = [make_listing(i) for i in range(2)]
+        route = respx.get(url__startswith=DETAIL_URL.format(token="")).mock(
+            return_value=httpx.Response(200, text=_detail(items[1]))
+        )
+
+        def select(listing):
+            return listing.token == items[1]["token"]
+
+        with _enricher(tmp_path, select=select) as enricher:
+            listings = _listings(items)
+            enricher.enrich(listings)
+
+        assert route.call_count == 1
+        assert [listing.monthly_payment for listing in listings] == ["", "1500"]
+
+    @respx.mock
+    def test_failed_detail_page_leaves_listing_as_is(self, tmp_path):
+        item = make_listing(0)
+        respx.get(DETAIL_URL.format(token=item["token"])).mock(
+            return_value=httpx.Response(200, text=create_feed_html([]))
+        )
+        METRICS.reset()
+        with _enricher(tmp_path) as enricher:
+            listings = _listings([item])
+            enricher.enrich(listings)
+
+        assert listings[0].monthly_payment == ""
+        assert (enricher.fetched, enricher.failed) == (0, 1)
+        assert METRICS.counters["enrich.failed"] == 1
+        assert len(enricher.cache) == 0  # tried again next run
+        METRICS.reset()
+
+    @respx.mock
+    def test_time_budget_skips_the_rest(self, tmp_path):
+        clock = FakeClock()
+        route = respx.get(url__startswith=DETAIL_URL.format(token="")).mock(
+            return_value=httpx.Response(200, text="")
+        )
+        with _enricher(tmp_path, clock=clock, time_budget=60) as enricher:
+            clock.advance(60)
+            enricher.enrich(_listings([make_listing(i) for i in range(4)]))
+
+        assert route.call_count == 0
+        assert enricher.skipped == 4
+
+    @respx.mock
+    def test_bot_redirect_stops_enrichment(self, tmp_path):
+        respx.get(url__startswith=DETAIL_URL.format(token="")).mock(
+            return_value=httpx.Response(302, headers={"location": "/bot-check"})
+        )
+        with _enricher(tmp_path, concurrency=1) as enricher:
+            enricher.enrich(_listings([make_listing(0)]))
+            requests = len(respx.calls)
+            enricher.enrich(_listings([make_listing(1)]))
+
+        assert enricher.skipped == 2
+        assert len(respx.calls) == requests  # nothing sent after the block
+
+    def test_close_waits_for_running_fetches(self, tmp_path):
+        """The fetcher's client must outlive detail requests already in flight."""
+        enricher = _enricher(tmp_path)
+        started, release = threading.Event(), threading.Event()
+        enricher._pool.submit(lambda: (started.set(), release.wait(5)))
+        started.wait(5)
+
+        closer = threading.Thread(target=enricher.close)
+        closer.start()
+        closer.join(0.1)
+        assert closer.is_alive()
+
+        release.set()
+        closer.join(5)
+        assert not closer.is_alive()
+        enricher.fetcher.close()
+
+    def test_concurrency_must_be_positive(self, tmp_path):
+        with pytest.raises(ValueError, match="concurrency"):
+            _enricher(tmp_path, concurrency=0)
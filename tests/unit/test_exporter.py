@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pytest
 
-from yad2_scraper.exporter import export_csv
+from yad2_scraper.exporter import CsvWriter, TokenDeduper, export_csv
 from yad2_scraper.models import CarListing
 
 
@@ -106,8 +106,8 @@ class TestDeduplication:
         monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
 
         # Create listing with empty token
-        listing_no_token = CarListing(token="", price="10000")
-        listing_with_token = CarListing(token="valid-123", price="20000")
+        listing_no_token = CarListing(token="", price=10000)
+        listing_with_token = CarListing(token="valid-123", price=20000)
 
         filepath = export_csv([listing_no_token, listing_with_token])
 
@@ -211,3 +211,90 @@ class TestEdgeCases:
         filepath = export_csv([listing])
 
         assert isinstance(filepath, Path)
+
+
+@pytest.mark.unit
+class TestTokenDeduper:
+    """Test the run-wide token deduper."""
+
+    def test_filter_drops_seen_and_empty_tokens(self):
+        """Should keep first occurrences only and drop token-less listings."""
+        deduper = TokenDeduper()
+        first = deduper.filter([CarListing(token="a"), CarListing(token=""), CarListing(token="b")])
+        second = deduper.filter([CarListing(token="b"), CarListing(token="c")])
+
+        assert [listing.token for listing in first] == ["a", "b"]
+        assert [listing.token for listing in second] == ["c"]
+        assert deduper.dropped == 2
+
+    def test_seeded_tokens_are_skipped(self):
+        """Tokens passed in up front should count as already seen."""
+        deduper = TokenDeduper(["a"])
+        assert deduper.filter([CarListing(token="a")]) == []
+
+
+@pytest.mark.unit
+class TestCsvWriter:
+    """Test the streaming CSV writer."""
+
+    def test_rows_visible_before_close(self, tmp_path):
+        """Each batch should be flushed so a crash keeps rows already written."""
+        path = tmp_path / "out.csv"
+        writer = CsvWriter(path)
+        writer.write([CarListing(token="a")])
+
+        with open(path, encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        assert [row[0] for row in rows] == ["token", "a"]
+        writer.close()
+
+    def test_appends_batches_with_single_header(self, tmp_path):
+        """Multiple batches should share one header row."""
+        path = tmp_path / "out.csv"
+        with CsvWriter(path) as writer:
+            writer.write([CarListing(token="a")])
+            writer.write([CarListing(token="b"), CarListing(token="c")])
+
+        with open(path, encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        assert [row[0] for row in rows] == ["token", "a", "b", "c"]
+        assert writer.written == 3
+
+    def test_reopening_appends_without_header_or_bom(self, tmp_path):
+        """Reopening an existing file should continue it, not restart it."""
+        path = tmp_path / "out.csv"
+        with CsvWriter(path) as writer:
+            writer.write([CarListing(token="a")])
+        with CsvWriter(path) as writer:
+            writer.write([CarListing(token="b")])
+
+        raw = path.read_bytes()
+        assert raw.count(b"\xef\xbb\xbf") == 1
+        with open(path, encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        assert [row[0] for row in rows] == ["token", "a", "b"]
+
+    def test_written_cells_match_csv_row(self, tmp_path, sample_listing_minimal):
+        """Bulk-written rows should read back exactly as csv_row renders them."""
+        listing = CarListing.from_raw(sample_listing_minimal, "private")
+        path = tmp_path / "out.csv"
+        with CsvWriter(path) as writer:
+            writer.write([listing])
+
+        with open(path, encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        assert rows[1] == listing.csv_row()
+
+    def test_empty_batch_does_not_create_file(self, tmp_path):
+        """Nothing should touch the disk until there is something to write."""
+        path = tmp_path / "out.csv"
+        with CsvWriter(path) as writer:
+            assert writer.write([]) == 0
+        assert not path.exists()
+
+    def test_default_path_is_timestamped(self, tmp_path, monkeypatch):
+        """Without a path the writer should use a timestamped file in OUTPUT_DIR."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        writer = CsvWriter()
+        assert writer.path.parent == tmp_path
+        assert writer.path.name.startswith("yad2_cars_")
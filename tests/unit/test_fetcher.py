@@ -1,12 +1,15 @@
 """Unit tests for HTTP client and error handling (Issue 2)."""
 
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, patch
 
 import httpx
 import pytest
 import respx
 
-from yad2_scraper.fetcher import BotDetectedError, Fetcher
+from yad2_scraper.config import MAX_REQUESTS_PER_SECOND
+from yad2_scraper.fetcher import AsyncFetcher, BotDetectedError, Fetcher
+from yad2_scraper.ratelimit import FakeClock, RateLimiter
 
 
 @pytest.mark.unit
@@ -77,8 +80,23 @@ class TestFetcherBasics:
         request = route.calls.last.request
         assert "page=5" in str(request.url)
 
+    @respx.mock
+    def test_for_search_shares_client_and_limiter(self):
+        """A search view should change only the params, not the connection."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(return_value=httpx.Response(200, text="<html></html>"))
+
+        fetcher = Fetcher()
+        view = fetcher.for_search({"year": "2010-2012"})
+        view.fetch_page(1)
+
+        assert view._client is fetcher._client
+        assert view.limiter is fetcher.limiter
+        assert route.calls.last.request.url.params["year"] == "2010-2012"
+        assert fetcher.params["year"] != "2010-2012"
 
-@patch("yad2_scraper.fetcher.time.sleep")
+
+@patch("yad2_scraper.ratelimit.time.sleep")
 @pytest.mark.unit
 class TestBotDetection:
     """Test bot detection and retry logic."""
@@ -132,7 +150,7 @@ class TestBotDetection:
             route.calls.clear()
 
 
-@patch("yad2_scraper.fetcher.time.sleep")
+@patch("yad2_scraper.ratelimit.time.sleep")
 @pytest.mark.unit
 class TestRateLimiting:
     """Test rate limiting and delays."""
@@ -211,3 +229,210 @@ class TestFetcherHeaders:
         # Check key headers exist
         assert "user-agent" in headers
         assert "accept-language" in headers
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+async def _collect(fetcher, pages):
+    return [item async for item in fetcher.fetch_pages(pages)]
+
+
+@patch("asyncio.sleep", new_callable=AsyncMock)
+@pytest.mark.unit
+class TestAsyncFetcher:
+    """Test concurrent fetching with AsyncFetcher."""
+
+    @respx.mock
+    def test_fetch_page_200_success(self, _mock_sleep):
+        """Should return HTML text for a 200 response."""
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(200, text="<html>async</html>")
+        )
+
+        async def go():
+            async with AsyncFetcher() as fetcher:
+                return await fetcher.fetch_page(1)
+
+        assert _run(go()) == "<html>async</html>"
+
+    @respx.mock
+    def test_fetch_pages_yields_every_page(self, _mock_sleep):
+        """Should yield (page, html) for every requested page."""
+
+        def page_html(request):
+            return httpx.Response(200, text=f"page-{request.url.params['page']}")
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(side_effect=page_html)
+
+        async def go():
+            async with AsyncFetcher(concurrency=3) as fetcher:
+                return await _collect(fetcher, range(2, 7))
+
+        results = dict(_run(go()))
+        assert results == {page: f"page-{page}" for page in range(2, 7)}
+
+    @respx.mock
+    def test_request_starts_are_paced_globally(self, mock_sleep):
+        """Request starts should be spaced by 1/requests_per_second across workers."""
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(200, text="ok")
+        )
+
+        async def go():
+            async with AsyncFetcher(concurrency=4, requests_per_second=0.5) as fetcher:
+                await _collect(fetcher, range(1, 5))
+
+        _run(go())
+
+        delays = sorted(call.args[0] for call in mock_sleep.call_args_list)
+        assert len(delays) == 3  # first request goes immediately
+        for expected, delay in zip((2.0, 4.0, 6.0), delays, strict=True):
+            assert delay == pytest.approx(expected, abs=0.5)
+
+    @respx.mock
+    def test_redirect_backs_off_then_succeeds(self, mock_sleep):
+        """A bot redirect should pause and retry the page."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(
+            side_effect=[
+                httpx.Response(302, headers={"location": "/bot-check"}),
+                httpx.Response(200, text="ok"),
+            ]
+        )
+
+        async def go():
+            async with AsyncFetcher() as fetcher:
+                return await fetcher.fetch_page(1)
+
+        assert _run(go()) == "ok"
+        assert route.call_count == 2
+        assert mock_sleep.call_args.args[0] == pytest.approx(10.0, abs=0.5)
+
+    @respx.mock
+    def test_fetch_pages_waits_for_slow_consumer(self, _mock_sleep):
+        """Fetching should pause once 2 x concurrency pages are unconsumed."""
+        route = respx.get("https://www.yad2.co.il/vehicles/cars")
+        route.mock(return_value=httpx.Response(200, text="<html></html>"))
+
+        async def go():
+            async with AsyncFetcher(concurrency=1) as fetcher:
+                pages = fetcher.fetch_pages(range(1, 11))
+                await anext(pages)
+                for _ in range(5):
+                    await asyncio.sleep(0)
+                started = route.call_count
+                rest = [item async for item in pages]
+                return started, len(rest)
+
+        started, remaining = _run(go())
+        assert started <= 2
+        assert remaining == 9
+
+    @respx.mock
+    def test_exhausted_retries_raise_from_fetch_pages(self, _mock_sleep):
+        """BotDetectedError should propagate out of fetch_pages."""
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(302, headers={"location": "/bot-check"})
+        )
+
+        async def go():
+            async with AsyncFetcher(concurrency=2) as fetcher:
+                await _collect(fetcher, [2, 3])
+
+        with pytest.raises(BotDetectedError, match="Bot detection after"):
+            _run(go())
+
+    @respx.mock
+    def test_http_error_raises(self, _mock_sleep):
+        """Unexpected statuses should raise HTTPStatusError."""
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(500, text="boom")
+        )
+
+        async def go():
+            async with AsyncFetcher() as fetcher:
+                await fetcher.fetch_page(1)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            _run(go())
+
+    def test_rate_is_clamped_to_politeness_limit(self, _mock_sleep):
+        """Requested rates above MAX_REQUESTS_PER_SECOND should be clamped."""
+        fetcher = AsyncFetcher(requests_per_second=100.0)
+        assert fetcher.limiter.rate == MAX_REQUESTS_PER_SECOND
+        _run(fetcher.aclose())
+
+    def test_invalid_settings_raise(self, _mock_sleep):
+        """Non-positive concurrency or rate should be rejected."""
+        with pytest.raises(ValueError):
+            AsyncFetcher(concurrency=0)
+        with pytest.raises(ValueError):
+            AsyncFetcher(requests_per_second=0)
+
+
+@pytest.mark.unit
+class TestAsyncFetcherConcurrency:
+    """Test that AsyncFetcher bounds in-flight requests."""
+
+    @respx.mock
+    def test_in_flight_requests_bounded(self, monkeypatch):
+        """No more than `concurrency` requests should be in flight at once."""
+        monkeypatch.setattr("yad2_scraper.fetcher.MAX_REQUESTS_PER_SECOND", 1000.0)
+        in_flight = 0
+        peak = 0
+
+        async def slow_response(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, text="ok")
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(side_effect=slow_response)
+
+        async def go():
+            async with AsyncFetcher(concurrency=3, requests_per_second=1000.0) as fetcher:
+                return await _collect(fetcher, range(1, 11))
+
+        assert len(_run(go())) == 10
+        assert 1 < peak <= 3
+
+
+@pytest.mark.unit
+class TestFetcherRateLimiter:
+    """Test Fetcher pacing through an injected RateLimiter."""
+
+    @respx.mock
+    def test_request_time_counts_toward_delay(self):
+        """Time spent waiting on the network should shorten the next sleep."""
+        clock = FakeClock()
+
+        def slow_response(request):
+            clock.advance(2.5)
+            return httpx.Response(200, text="<html></html>")
+
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(side_effect=slow_response)
+
+        fetcher = Fetcher(limiter=RateLimiter(1 / 3, clock=clock))
+        fetcher.fetch_page(1)
+        fetcher.fetch_page(2)
+
+        assert clock.sleeps == [pytest.approx(0.5)]
+
+    @respx.mock
+    def test_bot_backoff_goes_through_limiter(self):
+        """Backoff after a redirect should pause the shared limiter."""
+        clock = FakeClock()
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=[
+                httpx.Response(302, headers={"location": "/bot-check"}),
+                httpx.Response(200, text="ok"),
+            ]
+        )
+
+        fetcher = Fetcher(limiter=RateLimiter(1.0, clock=clock))
+        assert fetcher.fetch_page(1) == "ok"
+        assert clock.sleeps == [pytest.approx(10.0)]
@@ -0,0 +1,74 @@
+"""Unit tests for the token index and incremental early stop."""
+
+import gzip
+
+import pytest
+
+from yad2_scraper.incremental import EarlyStop, TokenIndex
+from yad2_scraper.models import CarListing
+
+
+def _page(*tokens, price=100):
+    return [CarListing(token=t, price=price) for t in tokens]
+
+
+@pytest.mark.unit
+class TestTokenIndex:
+    """Test persisting the known-listing index."""
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """A saved index should load back with the same fingerprints."""
+        index = TokenIndex(tmp_path / "idx.json.gz", {"a": 1, "b": -2})
+        index.save()
+        loaded = TokenIndex.load(index.path)
+        assert loaded.fingerprints == {"a": 1, "b": -2}
+        assert len(loaded) == 2
+        assert list(tmp_path.iterdir()) == [index.path]
+
+    def test_missing_file_is_empty_index(self, tmp_path):
+        """The first incremental run starts with nothing known."""
+        assert len(TokenIndex.load(tmp_path / "missing.json.gz")) == 0
+
+    @pytest.mark.parametrize("content", [b"not gzip", gzip.compress(b"[1, 2]")])
+    def test_corrupt_file_raises_value_error(self, tmp_path, content):
+        """An unreadable index should raise ValueError, not start over silently."""
+        path = tmp_path / "idx.json.gz"
+        path.write_bytes(content)
+        with pytest.raises(ValueError, match="Corrupt token index"):
+            TokenIndex.load(path)
+
+
+@pytest.mark.unit
+class TestEarlyStop:
+    """Test stale-page detection."""
+
+    def test_stops_after_consecutive_stale_pages(self, tmp_path):
+        """Only an unbroken run of fully known pages should trigger the stop."""
+        stop = EarlyStop(TokenIndex(tmp_path / "idx"), stop_after=2)
+        stop.observe(_page("a", "b"))
+        stop.observe(_page("c"))
+        stop.stale_streak = 0
+
+        assert stop.observe(_page("a", "b")) is True
+        assert not stop.should_stop
+        assert stop.observe(_page("c")) is True
+        assert stop.should_stop
+
+    def test_new_or_changed_listing_resets_streak(self, tmp_path):
+        """A page with a new token or a changed listing isn't stale."""
+        stop = EarlyStop(TokenIndex(tmp_path / "idx"), stop_after=1)
+        stop.observe(_page("a"))
+        assert stop.observe(_page("a", price=90)) is False
+        assert stop.observe(_page("a", "z", price=90)) is False
+        assert stop.observe(_page("a", "z", price=90)) is True
+
+    def test_observed_listings_recorded_in_index(self, tmp_path):
+        """Every listing with a token should end up in the index."""
+        index = TokenIndex(tmp_path / "idx")
+        EarlyStop(index).observe(_page("a", "", "b"))
+        assert set(index.fingerprints) == {"a", "b"}
+
+    def test_rejects_non_positive_stop_after(self, tmp_path):
+        """stop_after below one would stop before looking at anything."""
+        with pytest.raises(ValueError):
+            EarlyStop(TokenIndex(tmp_path / "idx"), stop_after=0)
@@ -0,0 +1,175 @@
+"""Unit tests for stage timings, counters and request tracing."""
+
+import asyncio
+import gzip
+import json
+
+import httpx
+import pytest
+import respx
+
+from tests.fixtures.sample_data import SAMPLE_HTML_VALID
+from yad2_scraper.config import TIMING_BUCKETS
+from yad2_scraper.fetcher import Fetcher
+from yad2_scraper.metrics import METRICS, Metrics, RequestTrace, Timing
+from yad2_scraper.parser import parse_listings
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    yield METRICS
+    METRICS.reset()
+
+
+@pytest.mark.unit
+class TestTiming:
+    """Test the fixed-bucket histogram."""
+
+    def test_observations_land_in_buckets(self):
+        timing = Timing()
+        for seconds in (0.0005, 0.003, 0.003, 100.0):
+            timing.observe(seconds)
+
+        assert (timing.count, timing.min, timing.max) == (4, 0.0005, 100.0)
+        assert timing.mean == pytest.approx(100.0065 / 4)
+        buckets = timing.as_dict()["buckets"]
+        assert buckets[str(TIMING_BUCKETS[0])] == 1
+        assert buckets[str(TIMING_BUCKETS[1])] == 2
+        assert buckets["+Inf"] == 1
+
+    def test_empty_timing(self):
+        assert Timing().as_dict()["min"] == 0.0
+        assert Timing().mean == 0.0
+
+
+@pytest.mark.unit
+class TestMetrics:
+    """Test the registry, summary table and JSON dump."""
+
+    def test_timer_records_even_on_error(self):
+        metrics = Metrics()
+        with pytest.raises(RuntimeError), metrics.timer("stage"):
+            raise RuntimeError
+        assert metrics.timings["stage"].count == 1
+
+    def test_summary_orders_by_total_with_share(self):
+        metrics = Metrics()
+        metrics.observe("parse", 0.5)
+        metrics.observe("fetch", 3.0)
+        metrics.count("pages", 2)
+
+        lines = metrics.summary(wall=4.0).splitlines()
+
+        assert lines[1].startswith("fetch") and "75.0%" in lines[1]
+        assert lines[2].startswith("parse") and "500.0ms" in lines[2]
+        assert lines[3].split() == ["pages", "2"]
+
+    def test_write_json(self, tmp_path):
+        metrics = Metrics()
+        metrics.observe("write", 0.01)
+        path = tmp_path / "run" / "metrics.json"
+
+        metrics.write_json(path, 1.5, output=tmp_path)
+
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        assert payload["wall_seconds"] == 1.5
+        assert payload["timings"]["write"]["count"] == 1
+        assert payload["output"] == str(tmp_path)
+
+    def test_merge_adds_other_timings(self):
+        """Timings recorded elsewhere should add to (or create) the local ones."""
+        metrics, worker = Metrics(), Metrics()
+        metrics.observe("parse", 0.5)
+        worker.observe("parse", 0.003)
+        worker.observe("parse.decode", 0.001)
+
+        metrics.merge(worker.timings)
+
+        assert (metrics.timings["parse"].count, metrics.timings["parse"].min) == (2, 0.003)
+        assert metrics.timings["parse"].total == pytest.approx(0.503)
+        assert sum(metrics.timings["parse"].buckets) == 2
+        assert metrics.timings["parse.decode"].count == 1
+
+    def test_empty_registry_is_falsy(self):
+        metrics = Metrics()
+        assert not metrics
+        metrics.count("x")
+        assert metrics
+        metrics.reset()
+        assert not metrics
+
+
+@pytest.mark.unit
+class TestRequestTrace:
+    """Test splitting httpx trace events into phases."""
+
+    EVENTS = [
+        "connection.connect_tcp.started",
+        "connection.connect_tcp.complete",
+        "connection.start_tls.started",
+        "connection.start_tls.complete",
+        "http2.send_request_headers.started",
+        "http2.send_request_headers.complete",
+        "http2.receive_response_headers.started",
+        "http2.receive_response_headers.complete",
+        "http2.receive_response_body.started",
+        "http2.receive_response_body.complete",
+    ]
+
+    def test_new_connection_records_every_phase(self):
+        metrics = Metrics()
+        trace = RequestTrace(metrics)
+        for event in self.EVENTS:
+            trace(event, {})
+        assert {name: t.count for name, t in metrics.timings.items()} == {
+            "fetch.connect": 1,
+            "fetch.ttfb": 1,
+            "fetch.body": 1,
+        }
+
+    def test_reused_connection_has_no_connect_phase(self):
+        metrics = Metrics()
+        trace = RequestTrace(metrics)
+        for event in self.EVENTS[4:]:
+            asyncio.run(trace.atrace(event, {}))
+        assert "fetch.connect" not in metrics.timings
+        assert metrics.timings["fetch.ttfb"].count == 1
+
+    def test_failed_events_are_ignored(self):
+        metrics = Metrics()
+        RequestTrace(metrics)("connection.connect_tcp.failed", {})
+        assert not metrics
+
+
+@pytest.mark.unit
+class TestInstrumentedStages:
+    """The fetch and parse paths should feed the global registry."""
+
+    @respx.mock
+    def test_fetch_page_records_timings_and_bytes(self, metrics):
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(200, text="<html>ok</html>")
+        )
+        with Fetcher() as fetcher:
+            fetcher.fetch_page(1)
+
+        assert metrics.timings["fetch_page"].count == 1
+        assert metrics.timings["fetch.sleep"].count == 1
+        assert metrics.counters == {"fetch.requests": 1, "fetch.bytes": 15}
+
+    @respx.mock
+    def test_fetch_bytes_counts_compressed_size(self, metrics):
+        """A gzipped body should count as the bytes sent, not its decoded size."""
+        body = gzip.compress(b"<html>" + b"ok" * 5000 + b"</html>")
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            return_value=httpx.Response(200, content=body, headers={"content-encoding": "gzip"})
+        )
+        with Fetcher() as fetcher:
+            assert len(fetcher.fetch_page(1)) > 10_000
+
+        assert metrics.counters["fetch.bytes"] == len(body)
+
+    def test_parse_listings_records_stages(self, metrics):
+        parse_listings(SAMPLE_HTML_VALID)
+        assert {"parse_listings", "parse.decode", "parse.from_raw"} <= set(metrics.timings)
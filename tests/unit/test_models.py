@@ -1,8 +1,20 @@
 """Unit tests for CarListing model and field extraction (Issues 3-9, 12)."""
 
+import json
+from dataclasses import dataclass
+from typing import Optional
+
 import pytest
 
-from yad2_scraper.models import CarListing
+from yad2_scraper.models import (
+    FIELD_SPEC,
+    INT_FIELDS,
+    Apply,
+    CarListing,
+    Text,
+    compile_extractor,
+    int_fields,
+)
 
 
 @pytest.mark.unit
@@ -67,12 +79,12 @@ class TestIssue4YearField:
     def test_year_from_vehicle_dates_year_of_production(self, sample_listing_complete):
         """Year should be extracted from vehicleDates.yearOfProduction."""
         listing = CarListing.from_raw(sample_listing_complete, "commercial")
-        assert listing.year == "2021"
+        assert listing.year == 2021
 
     def test_year_missing_vehicle_dates(self, sample_listing_minimal):
-        """Year should be empty string when vehicleDates missing."""
+        """Year should be None when vehicleDates missing."""
         listing = CarListing.from_raw(sample_listing_minimal, "private")
-        assert listing.year == ""
+        assert listing.year is None
 
 
 @pytest.mark.unit
@@ -182,13 +194,13 @@ class TestIssue12MissingFields:
 
         # Should not crash and should have some basic data
         assert listing.token == "test-minimal-001"
-        assert listing.price == "25000"
+        assert listing.price == 25000
         assert listing.manufacturer == "טויוטה"
         assert listing.model == "Corolla"
 
-        # Missing fields should be empty strings
+        # Missing fields should be empty strings (None for numbers)
         assert listing.sub_model == ""
-        assert listing.year == ""
+        assert listing.year is None
         assert listing.engine_type == ""
 
     def test_none_sub_model_handled(self, sample_listing_no_sub_model):
@@ -252,6 +264,24 @@ class TestCSVSerialization:
         assert header[0] == "token"
         assert row[0] == listing.token
 
+    def test_rows_yields_values_in_header_order(self, sample_listing_complete):
+        """rows() should yield one raw value tuple per listing, in header order."""
+        a = CarListing.from_raw(sample_listing_complete, "commercial")
+        b = CarListing(token="b")
+        rows = list(CarListing.rows([a, b]))
+        assert [len(row) for row in rows] == [31, 31]
+        assert rows[0] == tuple(getattr(a, name) for name in CarListing.csv_header())
+        assert rows[1][0] == "b"
+        assert rows[1][CarListing.csv_header().index("price")] is None
+
+    def test_csv_row_numbers_as_text_and_none_as_empty(self, sample_listing_minimal):
+        """Numeric fields should export as digits, missing ones as empty cells."""
+        listing = CarListing.from_raw(sample_listing_minimal, "private")
+        row = dict(zip(CarListing.csv_header(), listing.csv_row(), strict=True))
+        assert row["price"] == "25000"
+        assert row["year"] == ""
+        assert row["engine_volume_cc"] == ""
+
 
 @pytest.mark.unit
 class TestAdType:
@@ -285,9 +315,123 @@ class TestBasicFields:
     def test_price_extraction(self, sample_listing_complete):
         """Price should be extracted correctly."""
         listing = CarListing.from_raw(sample_listing_complete, "commercial")
-        assert listing.price == "45000"
+        assert listing.price == 45000
 
     def test_priority_extraction(self, sample_listing_complete):
         """Priority should be extracted correctly."""
         listing = CarListing.from_raw(sample_listing_complete, "commercial")
         assert listing.priority == "5"
+
+
+@pytest.mark.unit
+class TestFieldSpec:
+    """Test the declarative field spec and its compiled extractor."""
+
+    def test_financing_fields_from_metadata(self):
+        """Payment fields should come from metaData.financingInfo."""
+        raw = {"metaData": {"financingInfo": {"monthlyPayment": 1500, "balance": None}}}
+        listing = CarListing.from_raw(raw, "commercial")
+        assert listing.monthly_payment == "1500"
+        assert listing.balance == ""
+        assert listing.advance_payment == ""
+
+    def test_null_metadata_does_not_crash(self):
+        """metaData: null should leave every metadata-derived field empty."""
+        listing = CarListing.from_raw({"token": "t", "metaData": None}, "private")
+        assert listing.monthly_payment == ""
+        assert listing.image_count == "0"
+        assert listing.commitments == ""
+
+    def test_text_field_accepts_bare_scalar(self):
+        """A Text source should use a plain value as the text, and no id."""
+        listing = CarListing.from_raw({"engineType": "חשמלי"}, "private")
+        assert listing.engine_type == "חשמלי"
+        assert listing.engine_type_id == ""
+
+    def test_path_through_non_dict_is_empty(self):
+        """A key path hitting a non-dict midway should yield an empty string."""
+        listing = CarListing.from_raw({"address": "תל אביב"}, "private")
+        assert listing.area == ""
+
+    def test_commitments_joined_by_text(self):
+        """Commitments should be joined using their 'text' when present."""
+        raw = {"metaData": {"commitments": [{"text": "אחריות"}, "טסט"]}}
+        assert CarListing.from_raw(raw, "private").commitments == "אחריות, טסט"
+
+    def test_spec_must_cover_every_field(self):
+        """Compiling a spec that misses or invents fields should fail loudly."""
+        spec = dict(FIELD_SPEC)
+        del spec["price"]
+        spec["mileage"] = ("kilometers",)
+        with pytest.raises(ValueError, match=r"missing \['price'\], unknown \['mileage'\]"):
+            compile_extractor(spec, CarListing.csv_header())
+
+    def test_compiled_extractor_calls_constructor_positionally(self):
+        """A compiled spec should feed the target's fields in declaration order."""
+        extract = compile_extractor(
+            {"name": Text("maker"), "year": ("dates", "year"), "n": Apply(str, ("dates",))},
+            ["name", "ad_type", "year", "n"],
+        )
+        raw = {"maker": {"text": "Kia"}, "dates": {"year": 2020}}
+        assert extract(lambda *args: args, raw, "private") == (
+            "Kia",
+            "private",
+            "2020",
+            "{'year': 2020}",
+        )
+
+
+@pytest.mark.unit
+class TestCompactRepresentation:
+    """Test the slotted, typed and interned CarListing."""
+
+    def test_numeric_fields_are_ints(self, sample_listing_complete):
+        """Price, year, hand number and engine volume should be parsed to ints."""
+        listing = CarListing.from_raw(sample_listing_complete, "commercial")
+        assert (listing.price, listing.year, listing.hand_number, listing.engine_volume_cc) == (
+            45000,
+            2021,
+            1,
+            1200,
+        )
+
+    @pytest.mark.parametrize("price", ["", None, "לא צוין", "45,000", [1]])
+    def test_malformed_numbers_become_none(self, price):
+        """Values that aren't whole numbers should be None, not raise."""
+        assert CarListing.from_raw({"price": price}, "private").price is None
+
+    def test_category_strings_are_interned(self, sample_listing_complete):
+        """Listings from separate payloads should share interned category strings."""
+        other = json.loads(json.dumps(sample_listing_complete))
+        a = CarListing.from_raw(sample_listing_complete, "commercial")
+        b = CarListing.from_raw(other, "commercial")
+        assert a.manufacturer is b.manufacturer
+        assert a.area is b.area
+        assert a.manufacturer_id is b.manufacturer_id
+
+    def test_no_instance_dict(self):
+        """Instances should be slotted."""
+        listing = CarListing()
+        assert not hasattr(listing, "__dict__")
+        with pytest.raises(AttributeError):
+            listing.mileage = 1  # type: ignore[attr-defined]
+
+
+@dataclass
+class _Annotated:
+    plain: int = 0
+    optional: Optional[int] = None  # noqa: UP045 - the spelling under test
+    union: None | int = None
+    text: str = ""
+    maybe_text: str | None = None
+
+
+@pytest.mark.unit
+class TestIntFields:
+    """Integer columns should be found from resolved types, not annotation strings."""
+
+    def test_car_listing_int_fields(self):
+        assert {"year", "engine_volume_cc", "hand_number", "price"} == INT_FIELDS
+
+    def test_any_spelling_of_optional_int(self):
+        assert int_fields(_Annotated) == {"plain", "optional", "union"}
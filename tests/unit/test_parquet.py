@@ -0,0 +1,105 @@
+"""Unit tests for the Parquet output backend."""
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from tests.fixtures.sample_data import make_listing  # noqa: E402
+from yad2_scraper.exporter import CsvWriter, open_writer  # noqa: E402
+from yad2_scraper.models import CarListing  # noqa: E402
+from yad2_scraper.parquet import ParquetWriter, listing_schema  # noqa: E402
+
+
+def _listings(n):
+    return [CarListing.from_raw(make_listing(i), "private") for i in range(n)]
+
+
+@pytest.mark.unit
+class TestListingSchema:
+    """Test the Arrow schema derived from CarListing."""
+
+    def test_columns_follow_csv_header(self):
+        """Parquet columns should be the CSV columns, in the same order."""
+        assert listing_schema().names == CarListing.csv_header()
+
+    def test_column_types(self):
+        """Numbers should be int64 and category strings dictionary-encoded."""
+        schema = listing_schema()
+        assert schema.field("price").type == pa.int64()
+        assert schema.field("year").type == pa.int64()
+        assert pa.types.is_dictionary(schema.field("manufacturer").type)
+        assert schema.field("token").type == pa.string()
+
+
+@pytest.mark.unit
+class TestParquetWriter:
+    """Test row-group batching and round-tripping."""
+
+    def test_round_trip_preserves_typed_values(self, tmp_path):
+        """Reading the file back should give the listings' values, None as null."""
+        listings = _listings(3) + [CarListing(token="bare")]
+        path = tmp_path / "out.parquet"
+        with ParquetWriter(path) as writer:
+            assert writer.write(listings) == 4
+
+        table = pq.read_table(path)
+        assert table.column("token").to_pylist() == [item.token for item in listings]
+        assert table.column("price").to_pylist() == [item.price for item in listings]
+        assert table.column("manufacturer").to_pylist()[0] == listings[0].manufacturer
+        assert table.column("year").to_pylist()[-1] is None
+
+    def test_rows_grouped_by_row_group_size(self, tmp_path):
+        """Full groups are written as they fill; the remainder on close."""
+        path = tmp_path / "out.parquet"
+        with ParquetWriter(path, row_group_size=4) as writer:
+            writer.write(_listings(3))
+            writer.write(_listings(7))
+            assert writer.written == 10
+
+        metadata = pq.ParquetFile(path).metadata
+        assert [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)] == [
+            4,
+            4,
+            2,
+        ]
+
+    def test_category_columns_use_dictionary_encoding(self, tmp_path):
+        """Low-cardinality columns should be stored with dictionary pages."""
+        path = tmp_path / "out.parquet"
+        with ParquetWriter(path) as writer:
+            writer.write(_listings(50))
+
+        row_group = pq.ParquetFile(path).metadata.row_group(0)
+        columns = {row_group.column(i).path_in_schema: row_group.column(i) for i in range(31)}
+        assert columns["manufacturer"].has_dictionary_page
+        assert not columns["token"].has_dictionary_page
+
+    def test_nothing_written_creates_no_file(self, tmp_path):
+        """Closing an unused writer should leave the disk untouched."""
+        path = tmp_path / "out.parquet"
+        ParquetWriter(path).close()
+        assert not path.exists()
+
+    def test_rejects_empty_row_groups(self, tmp_path):
+        """A row group size below one is a programming error."""
+        with pytest.raises(ValueError):
+            ParquetWriter(tmp_path / "out.parquet", row_group_size=0)
+
+
+@pytest.mark.unit
+class TestOpenWriter:
+    """Test choosing a writer by format name."""
+
+    def test_formats(self, tmp_path, monkeypatch):
+        """Each format should get its writer and a matching default suffix."""
+        monkeypatch.setattr("yad2_scraper.exporter.OUTPUT_DIR", str(tmp_path))
+        assert isinstance(open_writer("csv"), CsvWriter)
+        writer = open_writer("parquet")
+        assert isinstance(writer, ParquetWriter)
+        assert writer.path.suffix == ".parquet"
+
+    def test_unknown_format(self):
+        """An unsupported format name should be rejected."""
+        with pytest.raises(ValueError, match="xlsx"):
+            open_writer("xlsx")
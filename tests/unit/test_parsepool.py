@@ -0,0 +1,94 @@
+"""Unit tests for the worker-pool parse stage."""
+
+import asyncio
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tests.fixtures.sample_data import (
+    SAMPLE_HTML_MALFORMED_JSON,
+    create_feed_html,
+    make_listing,
+)
+from yad2_scraper import parsepool
+from yad2_scraper.metrics import METRICS
+from yad2_scraper.parsepool import ParsePool, expand, parse_compact
+from yad2_scraper.parser import parse_listings
+
+PAGE = create_feed_html([make_listing(i) for i in range(5)], pages=7)
+
+
+@pytest.mark.unit
+class TestCompactPages:
+    """Test flattening a parsed page to tuples and back."""
+
+    def test_round_trip_matches_in_process_parse(self):
+        """expand(parse_compact(html)) should equal parse_listings(html)."""
+        assert expand(parse_compact(PAGE)) == parse_listings(PAGE)
+
+    def test_compact_page_is_plain_tuples(self):
+        """Workers should return builtin types only, which pickle cheaply."""
+        total_pages, total_results, rows = parse_compact(PAGE)
+        assert (total_pages, len(rows)) == (7, 5)
+        assert all(type(row) is tuple for row in rows)
+
+    def test_expand_reinterns_categories(self):
+        """Rows unpickled from a worker should share interned category strings again."""
+        listing = expand(pickle.loads(pickle.dumps(parse_compact(PAGE)))).listings[0]
+        copy = listing.manufacturer[:1] + listing.manufacturer[1:]
+        assert listing.manufacturer is sys.intern(copy)
+
+
+@pytest.mark.unit
+class TestParsePool:
+    """Test parsing through real worker processes."""
+
+    def test_parse_in_worker_process(self):
+        """A page parsed in the pool should match an in-process parse."""
+
+        async def go():
+            with ParsePool(1) as pool:
+                return await pool.parse(PAGE)
+
+        assert asyncio.run(go()) == parse_listings(PAGE)
+
+    def test_worker_timings_merged_into_metrics(self):
+        """parse.* timings recorded in the worker process should reach METRICS."""
+        METRICS.reset()
+
+        async def go():
+            with ParsePool(1) as pool:
+                await pool.parse(PAGE)
+                await pool.parse(PAGE)
+
+        asyncio.run(go())
+        assert METRICS.timings["parse_listings"].count == 2
+        assert METRICS.timings["parse.decode"].count == 2
+        METRICS.reset()
+
+    def test_parse_error_is_value_error(self):
+        """Unparseable pages should raise ValueError, as parse_listings does."""
+
+        async def go():
+            with ParsePool(1) as pool:
+                await pool.parse(SAMPLE_HTML_MALFORMED_JSON)
+
+        with pytest.raises(ValueError):
+            asyncio.run(go())
+
+    def test_rejects_zero_workers(self):
+        with pytest.raises(ValueError, match="workers"):
+            ParsePool(0)
+
+    def test_default_queue_depth(self):
+        """Without max_pending, two pages per worker may wait."""
+        with ParsePool(3) as pool:
+            assert pool.max_pending == 6
+
+    def test_threads_on_free_threaded_build(self, monkeypatch):
+        """With the GIL disabled, threads parallelise and need no pickling."""
+        monkeypatch.setattr(parsepool.sys, "_is_gil_enabled", lambda: False, raising=False)
+        with ParsePool(2) as pool:
+            assert isinstance(pool._executor, ThreadPoolExecutor)
@@ -4,7 +4,15 @@ import json
 
 import pytest
 
-from yad2_scraper.parser import _find_feed_query, extract_next_data, parse_listings
+from tests.fixtures.sample_data import LISTING_COMPLETE, create_detail_html
+from yad2_scraper.parser import (
+    _extract_with_soup,
+    _find_feed_query,
+    _scan_next_data,
+    extract_next_data,
+    parse_detail,
+    parse_listings,
+)
 
 
 @pytest.mark.unit
@@ -89,6 +97,61 @@ class TestExtractNextData:
         assert isinstance(data, dict)
 
 
+@pytest.mark.unit
+class TestFastNextDataScan:
+    """Test the regex scan that bypasses BeautifulSoup."""
+
+    def test_scan_returns_only_script_body(self):
+        """Should return exactly the JSON between the script tags."""
+        html = '<html><script id="__NEXT_DATA__" type="application/json">{"a": 1}</script></html>'
+        assert _scan_next_data(html) == '{"a": 1}'
+
+    def test_scan_handles_attribute_order_and_quoting(self):
+        """Should find the tag whatever the attribute order or quote style."""
+        for tag in (
+            "<script type='application/json' id='__NEXT_DATA__'>",
+            '<SCRIPT nonce="abc" id="__NEXT_DATA__" type="application/json">',
+            "<script id=__NEXT_DATA__>",
+        ):
+            assert _scan_next_data(f'<body>{tag}{{"a": 1}}</script></body>') == '{"a": 1}'
+
+    def test_scan_accepts_bytes(self, sample_html_valid):
+        """Should scan raw bytes without decoding the whole page."""
+        blob = _scan_next_data(sample_html_valid.encode())
+        assert isinstance(blob, bytes)
+        assert json.loads(blob)["props"]["pageProps"]
+
+    def test_scan_ignores_similar_ids(self):
+        """Should not match other ids that merely contain __NEXT_DATA__."""
+        html = '<script data-id="__NEXT_DATA__">{}</script><script id="__NEXT_DATA__x">{}</script>'
+        assert _scan_next_data(html) is None
+
+    def test_scan_returns_none_for_empty_script(self):
+        """Should leave empty script bodies to the fallback."""
+        assert _scan_next_data('<script id="__NEXT_DATA__"> </script>') is None
+
+    def test_extract_next_data_accepts_bytes(self, sample_html_valid):
+        """extract_next_data should parse bytes the same as text."""
+        assert extract_next_data(sample_html_valid.encode()) == extract_next_data(sample_html_valid)
+
+    def test_fast_path_matches_soup(self, sample_html_valid):
+        """Fast scan and BeautifulSoup should decode the same document."""
+        assert extract_next_data(sample_html_valid) == _extract_with_soup(sample_html_valid)
+
+    def test_falls_back_to_soup_when_scan_misses(self):
+        """Tags the regex can't handle should still be found via BeautifulSoup."""
+        html = '<script data-x=">" id="__NEXT_DATA__">{"ok": true}</script>'
+        assert _scan_next_data(html) is None
+        assert extract_next_data(html) == {"ok": True}
+
+    def test_falls_back_to_soup_when_scanned_slice_does_not_decode(self, sample_html_valid):
+        """A slice the scan found but the decoder rejects should go to BeautifulSoup."""
+        html = '<!-- <script id="__NEXT_DATA__">{"stale": --> ' + sample_html_valid
+        assert _scan_next_data(html) is not None
+        assert extract_next_data(html) == _extract_with_soup(sample_html_valid)
+        assert len(parse_listings(html).listings) == len(parse_listings(sample_html_valid).listings)
+
+
 @pytest.mark.unit
 class TestFindFeedQuery:
     """Test _find_feed_query helper function."""
@@ -263,3 +326,30 @@ class TestParseListingsIntegration:
         # Verify pagination
         assert result.total_pages > 0
         assert result.total_results > 0
+
+
+@pytest.mark.unit
+class TestParseDetail:
+    """Test reading the feed-missing fields from a listing's detail page."""
+
+    def test_returns_non_empty_detail_fields(self):
+        item = {
+            **LISTING_COMPLETE,
+            "listingSource": "web",
+            "metaData": {
+                "financingInfo": {"advancePayment": 5000, "monthlyPayment": 1200},
+                "commitments": [{"text": "ללא תאונות"}],
+            },
+        }
+        fields = parse_detail(create_detail_html(item), item["token"])
+
+        assert fields == {
+            "listing_source": "web",
+            "advance_payment": "5000",
+            "monthly_payment": "1200",
+            "commitments": "ללא תאונות",
+        }
+
+    def test_other_token_raises(self):
+        with pytest.raises(ValueError, match="no data for listing"):
+            parse_detail(create_detail_html(LISTING_COMPLETE), "someone-else")
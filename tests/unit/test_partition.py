@@ -0,0 +1,175 @@
+"""Tests for splitting a search into small sub-queries."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.fixtures.sample_data import create_search_html, make_inventory
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.fetcher import AsyncFetcher, Fetcher
+from yad2_scraper.partition import (
+    parse_range,
+    plan_partitions,
+    plan_partitions_async,
+    run_partitions,
+    run_partitions_concurrent,
+    split_params,
+)
+
+SEARCH = {"year": "2020-2023", "price": "20000-60000", "gearBox": "102"}
+
+
+def _fake_fetcher(inventory, calls, cls=Fetcher):
+    """Fetcher whose search views answer from ``inventory`` and log (params, page)."""
+    fetcher = MagicMock(spec=cls)
+
+    def for_search(params):
+        view = MagicMock(spec=cls)
+
+        def fetch_page(page):
+            calls.append((params, page))
+            return create_search_html(inventory, {**params, "page": page})
+
+        if cls is AsyncFetcher:
+
+            async def fetch_pages(pages):
+                for page in pages:
+                    yield page, fetch_page(page)
+
+            async def fetch_page_async(page):
+                return fetch_page(page)
+
+            view.fetch_page = fetch_page_async
+            view.fetch_pages = fetch_pages
+            view.concurrency = 2
+            view.limiter = MagicMock(rate=1.0)
+        else:
+            view.fetch_page.side_effect = fetch_page
+        return view
+
+    fetcher.for_search.side_effect = for_search
+    return fetcher
+
+
+@pytest.mark.unit
+class TestSplitParams:
+    """Test range parsing and halving."""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            ("2020-2023", (2020, 2023)),
+            ("5-5", (5, 5)),
+            ("2023-2020", None),
+            ("x-1", None),
+            ("7", None),
+        ],
+    )
+    def test_parse_range(self, value, expected):
+        assert parse_range(value) == expected
+
+    def test_year_is_split_first(self):
+        """The year range should be halved while it spans more than one year."""
+        assert split_params(SEARCH) == (
+            {**SEARCH, "year": "2020-2021"},
+            {**SEARCH, "year": "2022-2023"},
+        )
+
+    def test_price_is_split_once_year_is_single(self):
+        """A single-year search should be split on price instead."""
+        low, high = split_params({**SEARCH, "year": "2021-2021"})
+        assert (low["price"], high["price"]) == ("20000-40000", "40001-60000")
+
+    def test_nothing_left_to_split(self):
+        """Single year and a narrow price band (or no ranges at all) can't be split."""
+        assert split_params({"year": "2021-2021", "price": "20000-20500"}) is None
+        assert split_params({"gearBox": "102"}) is None
+
+
+@pytest.mark.unit
+class TestPlanPartitions:
+    """Test recursive planning against a fake search backend."""
+
+    def test_leaves_cover_search_under_target(self):
+        """Every leaf should be under the target, and together hold every listing."""
+        inventory = make_inventory(300)
+        calls = []
+
+        partitions = plan_partitions(_fake_fetcher(inventory, calls), SEARCH, max_results=50)
+
+        assert all(p.total_results <= 50 for p in partitions)
+        assert sum(p.total_results for p in partitions) == 300
+        assert {page for _, page in calls} == {1}
+
+    def test_small_search_is_one_partition(self):
+        """A search already under the target shouldn't be split."""
+        calls = []
+        partitions = plan_partitions(_fake_fetcher(make_inventory(30), calls), SEARCH)
+        assert [p.params for p in partitions] == [SEARCH]
+        assert len(calls) == 1
+
+    def test_empty_halves_are_dropped(self):
+        """Sub-queries with no results should not become partitions."""
+        inventory = [
+            listing
+            for listing in make_inventory(200)
+            if listing["vehicleDates"]["yearOfProduction"] < 2022
+        ]
+        partitions = plan_partitions(_fake_fetcher(inventory, []), SEARCH, max_results=50)
+        assert all(p.params["year"] < "2022" for p in partitions)
+
+    def test_unsplittable_search_is_kept(self, caplog):
+        """A search too big but with nothing to split should be scraped as is."""
+        params = {"year": "2020-2020", "price": "20000-20100"}
+        inventory = [
+            {**listing, "vehicleDates": {"yearOfProduction": 2020}, "price": "20000"}
+            for listing in make_inventory(60)
+        ]
+        partitions = plan_partitions(_fake_fetcher(inventory, []), params, max_results=50)
+        assert [p.total_results for p in partitions] == [60]
+        assert "no range left to split" in caplog.text
+
+    def test_async_plan_matches_sync_plan(self):
+        """Concurrent probing should produce the same leaves in the same order."""
+        inventory = make_inventory(300)
+        sync = plan_partitions(_fake_fetcher(inventory, []), SEARCH, max_results=50)
+        fetcher = _fake_fetcher(inventory, [], AsyncFetcher)
+        concurrent = asyncio.run(plan_partitions_async(fetcher, SEARCH, max_results=50))
+        assert [p.params for p in concurrent] == [p.params for p in sync]
+
+
+@pytest.mark.unit
+class TestRunPartitions:
+    """Test scraping the planned sub-queries into one output."""
+
+    def test_merges_every_listing_once(self, tmp_path):
+        """All listings should be written once, without refetching any page 1."""
+        inventory = make_inventory(300)
+        calls = []
+        fetcher = _fake_fetcher(inventory, calls)
+        partitions = plan_partitions(fetcher, SEARCH, max_results=100)
+        planned = len(calls)
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipelines = run_partitions(fetcher, partitions, writer)
+
+        assert writer.written == 300
+        assert all(pipeline.complete for pipeline in pipelines)
+        assert all(page > 1 for _, page in calls[planned:])
+
+    def test_concurrent_run_merges_every_listing_once(self, tmp_path):
+        """Running the sub-queries concurrently should give the same result."""
+        inventory = make_inventory(300)
+        calls = []
+        fetcher = _fake_fetcher(inventory, calls, AsyncFetcher)
+
+        async def go(writer):
+            partitions = await plan_partitions_async(fetcher, SEARCH, max_results=100)
+            return await run_partitions_concurrent(fetcher, partitions, writer)
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipelines = asyncio.run(go(writer))
+
+        assert writer.written == 300
+        assert all(pipeline.complete for pipeline in pipelines)
@@ -0,0 +1,278 @@
+"""Unit tests for the streaming parse → dedupe → write pipeline."""
+
+import asyncio
+import csv
+import gzip
+from unittest.mock import MagicMock
+
+import pytest
+
+from tests.fixtures.sample_data import create_html_with_next_data
+from yad2_scraper.archive import PageArchive
+from yad2_scraper.exporter import CsvWriter
+from yad2_scraper.fetcher import AsyncFetcher, BotDetectedError
+from yad2_scraper.parser import parse_listings
+from yad2_scraper.pipeline import Pipeline, run_concurrent, run_replay
+
+
+def _page(tokens, pages=3):
+    return create_html_with_next_data(
+        {
+            "props": {
+                "pageProps": {
+                    "dehydratedState": {
+                        "queries": [
+                            {
+                                "queryKey": ["feed", "vehicles", "search"],
+                                "state": {
+                                    "data": {
+                                        "commercial": [{"token": t} for t in tokens],
+                                        "pagination": {"pages": pages, "total": 30},
+                                    }
+                                },
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+    )
+
+
+@pytest.mark.unit
+class TestPipeline:
+    """Test page-at-a-time processing."""
+
+    def test_process_writes_each_page_immediately(self, tmp_path):
+        """Rows should be on disk as soon as their page is processed."""
+        path = tmp_path / "out.csv"
+        with CsvWriter(path) as writer:
+            pipeline = Pipeline(writer)
+            pipeline.process(1, _page(["a", "b"]))
+
+            with open(path, encoding="utf-8-sig") as f:
+                assert len(list(csv.reader(f))) == 3
+
+    def test_process_dedupes_across_pages(self, tmp_path):
+        """A token repeated on a later page should only be written once."""
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            pipeline.process(1, _page(["a", "b"]))
+            pipeline.process(2, _page(["b", "c"]))
+
+        assert writer.written == 3
+        assert pipeline.stats.listings == 3
+        assert pipeline.stats.duplicates == 1
+        assert pipeline.stats.pages == 2
+
+    def test_process_learns_pagination_once(self, tmp_path):
+        """total_pages should come from the first page that reports it."""
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            pipeline.process(1, _page(["a"], pages=3))
+            pipeline.process(2, _page(["b"], pages=7))
+
+        assert pipeline.stats.total_pages == 3
+        assert pipeline.stats.total_results == 30
+
+    def test_enricher_sees_new_listings_before_write(self, tmp_path):
+        """Only listings that survive dedupe should be enriched, before being written."""
+        enricher = MagicMock()
+        enricher.enrich.side_effect = lambda listings: [
+            setattr(listing, "monthly_payment", "1500") for listing in listings
+        ]
+        path = tmp_path / "out.csv"
+        with CsvWriter(path) as writer:
+            pipeline = Pipeline(writer, enricher=enricher)
+            pipeline.process(1, _page(["a", "b"]))
+            pipeline.process(2, _page(["b", "c"]))
+
+        batches = [[x.token for x in call.args[0]] for call in enricher.enrich.call_args_list]
+        assert batches == [["a", "b"], ["c"]]
+        with open(path, encoding="utf-8-sig") as f:
+            assert {row["monthly_payment"] for row in csv.DictReader(f)} == {"1500"}
+
+    def test_process_parse_error_writes_nothing(self, tmp_path):
+        """A page without __NEXT_DATA__ should raise and leave the sink untouched."""
+        path = tmp_path / "out.csv"
+        with CsvWriter(path) as writer:
+            pipeline = Pipeline(writer)
+            with pytest.raises(ValueError):
+                pipeline.process(1, "<html>challenge</html>")
+        assert not path.exists()
+
+    def test_process_accepts_bytes(self, tmp_path):
+        """Raw response bytes should be processed like text."""
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            pipeline.process(1, _page(["a"]).encode())
+        assert writer.written == 1
+        assert pipeline.stats.pages == 1
+
+
+@pytest.mark.unit
+class TestCompleteness:
+    """Test whether a run covered the whole search."""
+
+    def test_complete_once_every_page_processed(self, tmp_path):
+        """complete should flip only after pages 1..total are all processed."""
+        pipeline = Pipeline(CsvWriter(tmp_path / "out.csv"))
+        assert not pipeline.complete
+        pipeline.process(1, _page(["a"], pages=2))
+        assert not pipeline.complete
+        with pytest.raises(ValueError):
+            pipeline.process(2, "<html></html>")
+        assert not pipeline.complete
+        pipeline.process(2, _page(["b"], pages=2))
+        assert pipeline.complete
+
+
+@pytest.mark.unit
+class TestRecordReplay:
+    """Test archiving raw bodies and replaying them through a pipeline."""
+
+    def test_recorder_saves_raw_body_before_parsing(self, tmp_path):
+        """Even a page that fails to parse should be recorded."""
+        archive = PageArchive(tmp_path / "rec")
+        pipeline = Pipeline(CsvWriter(tmp_path / "out.csv"), recorder=archive)
+
+        pipeline.process(1, _page(["a"]))
+        with pytest.raises(ValueError):
+            pipeline.process(2, "<html></html>")
+
+        assert archive.pages() == [1, 2]
+        assert archive.load(1) == _page(["a"]).encode()
+
+    def test_replay_reproduces_recorded_output(self, tmp_path):
+        """Replaying an archive should write the same rows as the live run."""
+        archive = PageArchive(tmp_path / "rec")
+        with CsvWriter(tmp_path / "live.csv") as live:
+            recording = Pipeline(live, recorder=archive)
+            recording.process(1, _page(["a", "b"]))
+            recording.process(2, _page(["b", "c"]))
+
+        with CsvWriter(tmp_path / "replay.csv") as replayed:
+            pipeline = Pipeline(replayed)
+            run_replay(archive, pipeline)
+
+        assert pipeline.stats.pages == 2
+        assert pipeline.stats.duplicates == 1
+        live_text = (tmp_path / "live.csv").read_text(encoding="utf-8-sig")
+        assert (tmp_path / "replay.csv").read_text(encoding="utf-8-sig") == live_text
+
+    def test_replay_skips_unparseable_pages(self, tmp_path):
+        """A broken archived page is logged and the rest still replayed."""
+        archive = PageArchive(tmp_path / "rec")
+        archive.save(1, "<html></html>")
+        archive.save(2, _page(["a"]))
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            run_replay(archive, pipeline)
+
+        assert pipeline.stats.pages == 1
+        assert writer.written == 1
+
+    @pytest.mark.parametrize("damage", [b"not gzip", gzip.compress(b"x" * 100)[:20]])
+    def test_replay_skips_unreadable_pages(self, tmp_path, damage):
+        """A corrupt or truncated archive file is logged and the rest still replayed."""
+        archive = PageArchive(tmp_path / "rec")
+        archive.save(1, _page(["a"]))
+        archive.save(2, _page(["b"]))
+        archive.path_for(1).write_bytes(damage)
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            run_replay(archive, Pipeline(writer))
+
+        assert writer.written == 1
+
+    def test_replay_honours_max_pages(self, tmp_path):
+        archive = PageArchive(tmp_path / "rec")
+        for page, token in enumerate("abc", start=1):
+            archive.save(page, _page([token]))
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            run_replay(archive, pipeline, max_pages=2)
+
+        assert pipeline.pages_done == {1, 2}
+
+
+class _SlowPool:
+    """ParsePool stand-in that parses in-process and records queue depth."""
+
+    def __init__(self, max_pending):
+        self.max_pending = max_pending
+        self.active = 0
+        self.peak = 0
+
+    async def parse(self, html):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0)
+        self.active -= 1
+        return parse_listings(html)
+
+
+def _async_fetcher(bodies, fail_after=None):
+    fetcher = MagicMock(spec=AsyncFetcher)
+    fetcher.concurrency = 2
+    fetcher.limiter = MagicMock(rate=1.0)
+    pulled = []
+
+    async def fetch_page(page):
+        return bodies[page]
+
+    async def fetch_pages(pages):
+        for page in pages:
+            if fail_after is not None and len(pulled) == fail_after:
+                raise BotDetectedError("blocked")
+            pulled.append(page)
+            yield page, bodies[page]
+
+    fetcher.fetch_page = fetch_page
+    fetcher.fetch_pages = fetch_pages
+    return fetcher, pulled
+
+
+@pytest.mark.unit
+class TestParseStage:
+    """Test run_concurrent handing pages to a parse pool."""
+
+    def test_pool_parses_every_page_with_bounded_queue(self, tmp_path):
+        """All pages should be written while at most max_pending wait for parsing."""
+        bodies = {page: _page([f"p{page}-a", f"p{page}-b"], pages=8) for page in range(1, 9)}
+        fetcher, _ = _async_fetcher(bodies)
+        pool = _SlowPool(max_pending=2)
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            asyncio.run(run_concurrent(fetcher, pipeline, parse_pool=pool))
+
+        assert writer.written == 16
+        assert pipeline.complete
+        assert pool.peak <= 2
+
+    def test_unparseable_page_is_skipped(self, tmp_path):
+        """A page the pool can't parse should be logged and skipped."""
+        bodies = {1: _page(["a"]), 2: "<html>blocked</html>", 3: _page(["c"])}
+        fetcher, _ = _async_fetcher(bodies)
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            asyncio.run(run_concurrent(fetcher, pipeline, parse_pool=_SlowPool(2)))
+
+        assert writer.written == 2
+        assert pipeline.processed == {1, 3}
+
+    def test_pages_fetched_before_bot_detection_are_kept(self, tmp_path):
+        """Pages already queued for parsing should still be written."""
+        bodies = {page: _page([f"t{page}"], pages=6) for page in range(1, 7)}
+        fetcher, pulled = _async_fetcher(bodies, fail_after=3)
+
+        with CsvWriter(tmp_path / "out.csv") as writer:
+            pipeline = Pipeline(writer)
+            asyncio.run(run_concurrent(fetcher, pipeline, parse_pool=_SlowPool(4)))
+
+        assert pulled == [2, 3, 4]
+        assert pipeline.processed == {1, 2, 3, 4}
@@ -0,0 +1,185 @@
+"""Unit tests for the Prometheus endpoint and textfile exporter."""
+
+import time
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import httpx
+import pytest
+import respx
+
+from yad2_scraper.config import BACKOFF_BASE, TIMING_BUCKETS
+from yad2_scraper.fetcher import Fetcher
+from yad2_scraper.metrics import METRICS, Metrics
+from yad2_scraper.prometheus import (
+    CONTENT_TYPE,
+    MetricsServer,
+    TextfileExporter,
+    parse_listen,
+    render,
+)
+
+
+@pytest.fixture
+def metrics():
+    METRICS.reset()
+    yield METRICS
+    METRICS.reset()
+
+
+def _sample() -> Metrics:
+    metrics = Metrics()
+    metrics.count("pages", 3)
+    metrics.count("fetch.backoff_seconds", 2.5)
+    metrics.gauge("rate_limiter.queue_depth", lambda: 4)
+    for seconds in (0.002, 0.003, 100.0):
+        metrics.observe("fetch_page", seconds)
+    return metrics
+
+
+@pytest.mark.unit
+class TestRender:
+    """Test the text exposition format."""
+
+    def test_counters_and_gauges(self):
+        text = render(_sample())
+
+        assert "# TYPE yad2_pages_total counter\nyad2_pages_total 3\n" in text
+        assert "yad2_fetch_backoff_seconds_total 2.5\n" in text
+        assert "# HELP yad2_rate_limiter_queue_depth Callers waiting on the rate limiter" in text
+        assert (
+            "# TYPE yad2_rate_limiter_queue_depth gauge\nyad2_rate_limiter_queue_depth 4\n" in text
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        lines = render(_sample()).splitlines()
+        name = "yad2_stage_duration_seconds"
+        buckets = [line for line in lines if line.startswith(f'{name}_bucket{{stage="fetch_page"')]
+
+        assert f"# TYPE {name} histogram" in lines
+        assert len(buckets) == len(TIMING_BUCKETS) + 1
+        assert buckets[0].endswith(" 0")  # nothing <= 1ms
+        assert buckets[1] == f'{name}_bucket{{stage="fetch_page",le="{TIMING_BUCKETS[1]}"}} 2'
+        assert buckets[-1] == f'{name}_bucket{{stage="fetch_page",le="+Inf"}} 3'
+        assert f'{name}_count{{stage="fetch_page"}} 3' in lines
+        assert any(line.startswith(f'{name}_sum{{stage="fetch_page"}} 100.00') for line in lines)
+
+    def test_empty_registry(self):
+        assert render(Metrics()) == "\n"
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [(float("inf"), "+Inf"), (float("-inf"), "-Inf"), (float("nan"), "NaN")],
+    )
+    def test_non_finite_gauges(self, value, expected):
+        """Non-finite readings should use the exposition format's spellings, not raise."""
+        metrics = Metrics()
+        metrics.gauge("limiter.rate", lambda: value)
+        assert f"yad2_limiter_rate {expected}\n" in render(metrics)
+
+
+@pytest.mark.unit
+class TestParseListen:
+    """Test --metrics-listen values."""
+
+    @pytest.mark.parametrize(
+        ("value", "expected"),
+        [
+            ("9108", ("127.0.0.1", 9108)),
+            ("0.0.0.0:9108", ("0.0.0.0", 9108)),
+            (":0", ("127.0.0.1", 0)),
+        ],
+    )
+    def test_valid(self, value, expected):
+        assert parse_listen(value) == expected
+
+    @pytest.mark.parametrize("value", ["", "host:", "host:port", "99999", "-1"])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError, match="HOST:"):
+            parse_listen(value)
+
+
+@pytest.mark.unit
+class TestMetricsServer:
+    """Scrape the endpoint in-process on an ephemeral port."""
+
+    def test_serves_metrics(self):
+        with MetricsServer("127.0.0.1", 0, _sample()) as server:
+            url = f"http://127.0.0.1:{server.port}/metrics"
+            with urllib.request.urlopen(url) as resp:
+                body = resp.read().decode()
+                content_type = resp.headers["Content-Type"]
+
+        assert server.port > 0
+        assert content_type == CONTENT_TYPE
+        assert "yad2_pages_total 3" in body
+
+    def test_reflects_live_values(self):
+        metrics = Metrics()
+        with MetricsServer("127.0.0.1", 0, metrics) as server:
+            url = f"http://127.0.0.1:{server.port}/"
+            metrics.count("listings", 7)
+            with urllib.request.urlopen(url) as resp:
+                assert "yad2_listings_total 7" in resp.read().decode()
+
+    def test_unknown_path_is_404(self):
+        with MetricsServer("127.0.0.1", 0, Metrics()) as server:
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(f"http://127.0.0.1:{server.port}/other")
+            excinfo.value.close()
+        assert excinfo.value.code == 404
+
+
+@pytest.mark.unit
+class TestTextfileExporter:
+    """Test the node_exporter textfile output."""
+
+    def test_writes_on_close(self, tmp_path):
+        path = tmp_path / "collector" / "yad2.prom"
+        metrics = Metrics()
+        with TextfileExporter(path, interval=60, metrics=metrics):
+            metrics.count("pages")
+
+        assert path.read_text(encoding="utf-8") == render(metrics)
+        assert list(path.parent.iterdir()) == [path]  # no temp files left behind
+        assert path.stat().st_mode & 0o777 == 0o644
+
+    def test_rewrites_periodically(self, tmp_path):
+        path = tmp_path / "yad2.prom"
+        metrics = _sample()
+        with patch.object(TextfileExporter, "write", autospec=True) as write:
+            exporter = TextfileExporter(path, interval=0.001, metrics=metrics)
+            while write.call_count < 2:
+                time.sleep(0.001)
+            exporter.close()
+        assert write.call_count >= 3  # at least two ticks plus the final write
+
+
+@pytest.mark.unit
+class TestFetcherMetrics:
+    """The fetchers should publish limiter state, redirects and backoff."""
+
+    def test_limiter_gauges(self, metrics):
+        with Fetcher() as fetcher:
+            gauges = metrics.gauge_values()
+            assert gauges["rate_limiter.rate"] == fetcher.limiter.rate
+            assert gauges["rate_limiter.queue_depth"] == 0
+            assert gauges["rate_limiter.tokens"] == fetcher.limiter.tokens
+
+    @respx.mock
+    @patch("yad2_scraper.ratelimit.time.sleep")
+    def test_redirects_and_backoff_are_counted(self, _mock_sleep, metrics):
+        respx.get("https://www.yad2.co.il/vehicles/cars").mock(
+            side_effect=[
+                httpx.Response(302, headers={"location": "/bot-check"}),
+                httpx.Response(302, headers={"location": "/bot-check"}),
+                httpx.Response(200, text="<html>ok</html>"),
+            ]
+        )
+        with Fetcher() as fetcher:
+            fetcher.fetch_page(1)
+
+        assert metrics.counters["fetch.redirects"] == 2
+        assert metrics.counters["fetch.backoff_seconds"] == BACKOFF_BASE * (1 + 2)
+        assert "yad2_fetch_redirects_total 2" in render(metrics)
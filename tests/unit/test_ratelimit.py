@@ -0,0 +1,136 @@
+"""Unit tests for the token-bucket rate limiter."""
+
+import asyncio
+import random
+
+import pytest
+
+from yad2_scraper.ratelimit import FakeClock, RateLimiter
+
+
+@pytest.mark.unit
+class TestTokenBucket:
+    """Test token-bucket pacing with a fake clock."""
+
+    def test_first_request_is_immediate(self):
+        """A fresh limiter should not delay the first request."""
+        clock = FakeClock()
+        limiter = RateLimiter(0.5, clock=clock)
+        assert limiter.acquire() == 0
+        assert clock.sleeps == []
+
+    def test_back_to_back_requests_are_spaced(self):
+        """Consecutive requests should be 1/rate seconds apart."""
+        clock = FakeClock()
+        limiter = RateLimiter(0.5, clock=clock)
+        for _ in range(4):
+            limiter.acquire()
+        assert clock.sleeps == [2.0, 2.0, 2.0]
+        assert clock.now == 6.0
+
+    def test_elapsed_time_counts_toward_delay(self):
+        """Time spent on the network should shorten the next wait."""
+        clock = FakeClock()
+        limiter = RateLimiter(0.5, clock=clock)
+        limiter.acquire()
+        clock.advance(1.5)  # request took 1.5s
+        assert limiter.acquire() == pytest.approx(0.5)
+        clock.advance(5.0)  # slow request, longer than the interval
+        assert limiter.acquire() == 0
+
+    def test_burst_allows_immediate_requests(self):
+        """Up to `burst` requests should go out without waiting after idling."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, burst=3, clock=clock)
+        assert [limiter.acquire() for _ in range(3)] == [0, 0, 0]
+        assert limiter.acquire() == pytest.approx(1.0)
+
+    def test_idle_time_does_not_bank_beyond_burst(self):
+        """A long idle period should not let more than `burst` requests through."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, burst=2, clock=clock)
+        limiter.acquire()
+        clock.advance(100.0)
+        assert [limiter.acquire() for _ in range(3)] == [0, 0, pytest.approx(1.0)]
+
+    def test_jitter_stays_within_range(self):
+        """Jittered gaps should stay between the base interval and interval + jitter."""
+        clock = FakeClock()
+        limiter = RateLimiter(1 / 3, jitter=4.0, clock=clock, rng=random.Random(42))
+        limiter.acquire()
+        gaps = [limiter.acquire() for _ in range(50)]
+        assert all(3.0 <= gap <= 7.0 for gap in gaps)
+        assert max(gaps) - min(gaps) > 1.0
+
+    def test_from_delay_range(self):
+        """from_delay_range should map DELAY_MIN/DELAY_MAX to rate and jitter."""
+        limiter = RateLimiter.from_delay_range(3.0, 7.0)
+        assert limiter.rate == pytest.approx(1 / 3)
+        assert limiter.jitter == 4.0
+
+    def test_penalize_holds_back_next_request(self):
+        """penalize() should delay the next request by at least the penalty."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, clock=clock)
+        limiter.acquire()
+        limiter.penalize(10.0)
+        assert limiter.acquire() == pytest.approx(10.0)
+
+    def test_penalize_before_first_request(self):
+        """penalize() should work on a limiter that hasn't issued anything yet."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, clock=clock)
+        limiter.penalize(5.0)
+        assert limiter.acquire() == pytest.approx(5.0)
+
+
+@pytest.mark.unit
+class TestObservability:
+    """Test rate and queue depth reporting."""
+
+    def test_tokens_reflect_bucket_level(self):
+        """tokens should drop on acquire and refill over time."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, burst=2, clock=clock)
+        assert limiter.tokens == 2
+        limiter.acquire()
+        assert limiter.tokens == pytest.approx(1.0)
+        clock.advance(0.5)
+        assert limiter.tokens == pytest.approx(1.5)
+
+    def test_rate_can_be_changed(self):
+        """Changing rate should change the spacing of later requests."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, clock=clock)
+        limiter.acquire()
+        limiter.rate = 0.25
+        limiter.acquire()
+        assert limiter.acquire() == pytest.approx(4.0)
+
+    def test_queue_depth_counts_async_waiters(self):
+        """queue_depth should count tasks currently waiting for a token."""
+        clock = FakeClock()
+        limiter = RateLimiter(1.0, clock=clock)
+        observed = []
+
+        async def worker():
+            await limiter.acquire_async()
+            await asyncio.sleep(0)
+            observed.append(limiter.queue_depth)
+
+        async def go():
+            await asyncio.gather(*(worker() for _ in range(4)))
+
+        asyncio.run(go())
+        assert observed[0] == 3  # first task ran while three others were queued
+        assert limiter.queue_depth == 0
+        assert clock.now == pytest.approx(3.0)
+
+    def test_invalid_settings_raise(self):
+        """Invalid rate, burst or jitter should be rejected."""
+        with pytest.raises(ValueError):
+            RateLimiter(0)
+        with pytest.raises(ValueError):
+            RateLimiter(1.0, burst=0.5)
+        with pytest.raises(ValueError):
+            RateLimiter(1.0, jitter=-1)
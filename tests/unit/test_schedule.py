@@ -0,0 +1,69 @@
+"""Unit tests for cron schedules."""
+
+from datetime import datetime
+
+import pytest
+
+from yad2_scraper.schedule import CronSchedule
+
+# 2024-03-13 is a Wednesday
+NOW = datetime(2024, 3, 13, 10, 17, 42)
+
+
+@pytest.mark.unit
+class TestCronSchedule:
+    """Test parsing expressions and finding the next run."""
+
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            ("* * * * *", datetime(2024, 3, 13, 10, 18)),
+            ("*/15 * * * *", datetime(2024, 3, 13, 10, 30)),
+            ("0 * * * *", datetime(2024, 3, 13, 11, 0)),
+            ("@hourly", datetime(2024, 3, 13, 11, 0)),
+            ("30 6,18 * * *", datetime(2024, 3, 13, 18, 30)),
+            ("0 9-17/4 * * *", datetime(2024, 3, 13, 13, 0)),
+            ("@daily", datetime(2024, 3, 14, 0, 0)),
+            ("0 8 * * 1-5", datetime(2024, 3, 14, 8, 0)),
+            ("0 8 * * 0", datetime(2024, 3, 17, 8, 0)),
+            ("0 8 * * 7", datetime(2024, 3, 17, 8, 0)),
+            ("0 0 1 * *", datetime(2024, 4, 1, 0, 0)),
+            ("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)),
+        ],
+    )
+    def test_next_after(self, expression, expected):
+        assert CronSchedule.parse(expression).next_after(NOW) == expected
+
+    def test_next_after_is_strictly_later(self):
+        schedule = CronSchedule.parse("0 * * * *")
+        on_the_hour = datetime(2024, 3, 13, 11, 0)
+        assert schedule.next_after(on_the_hour) == datetime(2024, 3, 13, 12, 0)
+
+    def test_restricted_day_fields_match_either(self):
+        """As in cron, the 1st of the month or any Friday."""
+        schedule = CronSchedule.parse("0 0 1 * 5")
+        assert schedule.next_after(NOW) == datetime(2024, 3, 15, 0, 0)
+        assert schedule.next_after(datetime(2024, 3, 29, 12, 0)) == datetime(2024, 4, 1, 0, 0)
+
+    @pytest.mark.parametrize(
+        "expression",
+        [
+            "",
+            "* * * *",
+            "60 * * * *",
+            "* 24 * * *",
+            "* * 0 * *",
+            "*/0 * * * *",
+            "5-1 * * * *",
+            "a * * * *",
+            "1,,2 * * * *",
+            "@yearly-ish",
+            "0 0 31 2 *",
+        ],
+    )
+    def test_invalid_expressions(self, expression):
+        with pytest.raises(ValueError):
+            CronSchedule.parse(expression)
+
+    def test_str_is_the_expression(self):
+        assert str(CronSchedule.parse("@weekly")) == "@weekly"
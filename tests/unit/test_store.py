@@ -0,0 +1,233 @@
+"""Unit tests for the SQLite listing store."""
+
+import sqlite3
+
+import pytest
+
+from yad2_scraper.models import CarListing
+from yad2_scraper.ratelimit import FakeClock
+from yad2_scraper.store import INDEXED_COLUMNS, SqliteStore
+
+DAY = 86_400.0
+
+
+def _rows(path, query="SELECT token, price, first_seen, last_seen FROM listings ORDER BY token"):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(query).fetchall()
+
+
+@pytest.mark.unit
+class TestSqliteStore:
+    """Test upserts, timestamps and database setup."""
+
+    def test_creates_table_indexes_and_wal(self, tmp_path):
+        """Opening should create the schema, the query indexes and switch to WAL."""
+        path = tmp_path / "cars.db"
+        with SqliteStore(path) as store:
+            conn = store.open()
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+
+        indexes = {
+            row[0] for row in _rows(path, "SELECT name FROM sqlite_master WHERE type='index'")
+        }
+        assert {f"idx_listings_{name}" for name in INDEXED_COLUMNS} <= indexes
+        info = _rows(path, "PRAGMA table_info(listings)")
+        assert {name for _, name, decl, *_ in info if decl == "INTEGER"} >= {
+            "year",
+            "engine_volume_cc",
+            "hand_number",
+            "price",
+        }
+        columns = [row[1] for row in info]
+        assert columns == [
+            *CarListing.csv_header(),
+            "first_seen",
+            "last_seen",
+            "fingerprint",
+            "removed_at",
+        ]
+
+    def test_typed_columns(self, tmp_path):
+        """Numbers should be stored as integers and missing values as NULL."""
+        path = tmp_path / "cars.db"
+        with SqliteStore(path) as store:
+            store.write([CarListing(token="a", price=45000, manufacturer="קיה")])
+
+        assert _rows(path, "SELECT price, typeof(price), year, manufacturer FROM listings") == [
+            (45000, "integer", None, "קיה")
+        ]
+
+    def test_upsert_updates_in_place(self, tmp_path):
+        """A token seen again should update its row, keep first_seen and bump last_seen."""
+        path = tmp_path / "cars.db"
+        clock = FakeClock(0.0)
+        with SqliteStore(path, clock=clock) as store:
+            store.write([CarListing(token="a", price=100), CarListing(token="b", price=200)])
+
+        clock.advance(DAY)
+        with SqliteStore(path, clock=clock) as store:
+            assert store.write([CarListing(token="a", price=90)]) == 1
+
+        assert _rows(path) == [
+            ("a", 90, "1970-01-01T00:00:00+00:00", "1970-01-02T00:00:00+00:00"),
+            ("b", 200, "1970-01-01T00:00:00+00:00", "1970-01-01T00:00:00+00:00"),
+        ]
+
+    def test_unchanged_row_only_touched(self, tmp_path):
+        """A row with the same fingerprint should get last_seen and priority, nothing else."""
+        path = tmp_path / "cars.db"
+        clock = FakeClock(0.0)
+        with SqliteStore(path, clock=clock) as store:
+            store.write([CarListing(token="a", price=100, priority="1")])
+
+        clock.advance(DAY)
+        with SqliteStore(path, clock=clock) as store:
+            store.write([CarListing(token="a", price=100, priority="7")])
+
+        query = "SELECT price, priority, first_seen, last_seen FROM listings"
+        assert _rows(path, query) == [
+            (100, "7", "1970-01-01T00:00:00+00:00", "1970-01-02T00:00:00+00:00")
+        ]
+        assert not store.changes
+        assert _history(path) == [("a", "new", None, 100, None)]
+
+    def test_blank_detail_fields_keep_stored_values(self, tmp_path):
+        """A run without --enrich shouldn't erase detail fields an earlier run stored."""
+        path = tmp_path / "cars.db"
+        with SqliteStore(path) as store:
+            store.write([CarListing(token="a", monthly_payment="1500", balance="9000")])
+            store.write([CarListing(token="a", monthly_payment="1400")])
+
+        query = "SELECT monthly_payment, balance FROM listings"
+        assert _rows(path, query) == [("1400", "9000")]
+        assert _history(path) == [("a", "new", None, None, None)]
+
+    def test_failed_batch_is_rolled_back(self, tmp_path):
+        """A batch that fails midway should leave no partial rows behind."""
+        path = tmp_path / "cars.db"
+        with SqliteStore(path) as store:
+            store.write([CarListing(token="a")])
+            with pytest.raises(sqlite3.Error):
+                store.write([CarListing(token="b"), CarListing(token="c", price=object())])
+            assert store.written == 1
+
+        assert [row[0] for row in _rows(path)] == ["a"]
+
+    def test_empty_batch_does_not_create_database(self, tmp_path):
+        """Nothing should touch the disk until there is something to write."""
+        path = tmp_path / "cars.db"
+        with SqliteStore(path) as store:
+            assert store.write([]) == 0
+        assert not path.exists()
+
+    def test_close_logs_new_and_total(self, tmp_path, caplog):
+        """Closing should report how many listings were new this run."""
+        path = tmp_path / "cars.db"
+        with SqliteStore(path) as store:
+            store.write([CarListing(token="a")])
+        with caplog.at_level("INFO", logger="yad2_scraper.store"), SqliteStore(path) as store:
+            store.write([CarListing(token="a"), CarListing(token="b")])
+        assert "2 listings upserted, 1 new, 2 total" in caplog.text
+
+
+def _history(path):
+    return _rows(
+        path,
+        "SELECT token, change, old_price, new_price, price_delta FROM history ORDER BY token",
+    )
+
+
+@pytest.mark.unit
+class TestChangeHistory:
+    """Test change detection across runs in the store."""
+
+    def _run(self, path, listings, complete=True):
+        with SqliteStore(path) as store:
+            store.write(listings)
+            store.complete = complete
+        return store.changes
+
+    def test_first_run_records_everything_as_new(self, tmp_path):
+        """With no previous snapshot every listing is new."""
+        path = tmp_path / "cars.db"
+        changes = self._run(path, [CarListing(token="a", price=100)])
+        assert changes.new == ["a"]
+        assert _history(path) == [("a", "new", None, 100, None)]
+
+    def test_second_run_records_price_changes_and_removals(self, tmp_path):
+        """Price deltas and vanished listings should be appended to history."""
+        path = tmp_path / "cars.db"
+        self._run(path, [CarListing(token="a", price=100), CarListing(token="b", price=200)])
+        self._run(path, [CarListing(token="a", price=95), CarListing(token="c", price=300)])
+
+        assert _history(path) == [
+            ("a", "new", None, 100, None),
+            ("a", "price", 100, 95, -5),
+            ("b", "new", None, 200, None),
+            ("b", "removed", 200, None, None),
+            ("c", "new", None, 300, None),
+        ]
+        assert _rows(path, "SELECT token FROM listings WHERE removed_at IS NOT NULL") == [("b",)]
+
+    def test_incomplete_run_records_no_removals(self, tmp_path):
+        """Listings not fetched by a partial run must not be marked removed."""
+        path = tmp_path / "cars.db"
+        self._run(path, [CarListing(token="a"), CarListing(token="b")])
+        changes = self._run(path, [CarListing(token="a")], complete=False)
+        assert changes.removed == []
+        assert _rows(path, "SELECT COUNT(*) FROM listings WHERE removed_at IS NOT NULL") == [(0,)]
+
+    def test_relisted_token_is_returned(self, tmp_path):
+        """A removed listing that reappears is reported returned and reactivated."""
+        path = tmp_path / "cars.db"
+        self._run(path, [CarListing(token="a", price=100)])
+        self._run(path, [CarListing(token="b")])
+        changes = self._run(path, [CarListing(token="a", price=90), CarListing(token="b")])
+        assert (changes.new, changes.returned) == ([], ["a"])
+        assert ("a", "returned", 100, 90, -10) in _history(path)
+        assert _rows(path, "SELECT COUNT(*) FROM listings WHERE removed_at IS NOT NULL") == [(0,)]
+
+    def test_history_is_written_with_each_page(self, tmp_path):
+        """A page's changes should be committed with its rows, before close."""
+        path = tmp_path / "cars.db"
+        self._run(path, [CarListing(token="a", price=100)])
+        with SqliteStore(path) as store:
+            store.write([CarListing(token="a", price=95)])
+            store.write([CarListing(token="b", price=200)])
+            assert _history(path) == [
+                ("a", "new", None, 100, None),
+                ("a", "price", 100, 95, -5),
+                ("b", "new", None, 200, None),
+            ]
+            assert len(store.changes.price_changes) == len(store.changes.new) == 1
+
+    def test_repeated_token_within_a_run_is_not_reported_twice(self, tmp_path):
+        """A listing seen again on a later page compares against this run's row."""
+        path = tmp_path / "cars.db"
+        with SqliteStore(path) as store:
+            store.write([CarListing(token="a", price=100)])
+            store.write([CarListing(token="a", price=100)])
+        assert store.changes.new == ["a"]
+        assert _history(path) == [("a", "new", None, 100, None)]
+
+    def test_migrates_database_without_fingerprints(self, tmp_path):
+        """A store created before change tracking should gain the new columns."""
+        path = tmp_path / "cars.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TABLE listings (token TEXT PRIMARY KEY, price INTEGER, "
+                + ", ".join(
+                    f"{name} TEXT" for name in CarListing.csv_header()[1:] if name != "price"
+                )
+                + ", first_seen TEXT NOT NULL, last_seen TEXT NOT NULL)"
+            )
+            conn.execute(
+                "INSERT INTO listings (token, price, first_seen, last_seen) VALUES ('a', 100, 'x', 'x')"
+            )
+        conn.close()
+
+        changes = self._run(path, [CarListing(token="a", price=100)])
+
+        assert not changes
+        assert _rows(path, "SELECT COUNT(*) FROM listings WHERE fingerprint IS NOT NULL") == [(1,)]